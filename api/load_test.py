@@ -0,0 +1,153 @@
+# load_test.py
+# Client de charge pour l'API JSON (api/server.py) : connexions persistantes concurrentes,
+# mélange de réservations et de recherches de disponibilité, latences p50/p99 et débit.
+#
+# Exemple (serveur lancé à part avec python -m api.server --port 8080) :
+#   python -m api.load_test --port 8080 --connections 32 --requests 20000 --vehicles 2000 --customers 1000
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ApiConnection:
+    """Une connexion HTTP/1.1 persistante vers l'API."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def open(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, Any]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self._writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode("latin-1")
+                           + body)
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while True:
+            header = await self._reader.readline()
+            if header in (b"\r\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self._reader.readexactly(length)) if length else None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def prepare_fleet(host: str, port: int, vehicles: int, customers: int) -> Tuple[List[int], List[int]]:
+    """Crée la flotte et les clients de test via l'API, puis retourne leurs IDs."""
+    connection = ApiConnection(host, port)
+    await connection.open()
+    # Plaques, permis et emails doivent être uniques : un préfixe par lancement permet de relancer sur le même serveur
+    tag = uuid.uuid4().hex[:6].upper()
+    try:
+        categories = ("Véhicule", "Camion", "Moto", "Bus")
+        vehicle_ids = []
+        for i in range(vehicles):
+            status, vehicle = await connection.request("POST", "/vehicles", {
+                "brand": "Renault", "model": "Clio", "license_plate": f"LT-{tag}-{i:06d}", "daily_rate": 30.0 + i % 70,
+                "category": categories[i % len(categories)], "state": "disponible"})
+            vehicle_ids.append(vehicle["id"])
+        customer_ids = []
+        for i in range(customers):
+            status, customer = await connection.request("POST", "/customers", {
+                "first_name": "Client", "last_name": f"Charge{i}", "age": 30 + i % 40,
+                "driver_license_number": f"LT{tag}{i:07d}", "email": f"charge{i}.{tag.lower()}@example.com"})
+            customer_ids.append(customer["id"])
+        return vehicle_ids, customer_ids
+    finally:
+        await connection.close()
+
+
+async def run_load(host: str, port: int, connections: int, requests: int, booking_ratio: float,
+                   vehicle_ids: List[int], customer_ids: List[int], seed: int) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {"booking": [], "availability": []}
+    statuses: Dict[int, int] = {}
+    remaining = [requests]
+    first_day = datetime.date.today()
+
+    async def client(number: int):
+        rng = random.Random(seed + number)
+        connection = ApiConnection(host, port)
+        await connection.open()
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = first_day + datetime.timedelta(days=rng.randint(0, 365))
+                end = start + datetime.timedelta(days=rng.randint(0, 6))
+                began = time.perf_counter()
+                if rng.random() < booking_ratio:
+                    kind = "booking"
+                    status, _ = await connection.request("POST", "/rentals", {
+                        "customer_id": rng.choice(customer_ids), "vehicle_id": rng.choice(vehicle_ids),
+                        "start_date": start.isoformat(), "end_date": end.isoformat()})
+                else:
+                    kind = "availability"
+                    status, _ = await connection.request(
+                        "GET", f"/availability?start={start.isoformat()}&end={end.isoformat()}&limit=20")
+                latencies[kind].append(time.perf_counter() - began)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            await connection.close()
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(connections)))
+    elapsed = time.perf_counter() - began
+    return {"elapsed": elapsed, "latencies": latencies, "statuses": statuses}
+
+
+def report(result: Dict[str, Any]):
+    total = sum(result["statuses"].values())
+    print(f"{total} requêtes en {result['elapsed']:.2f} s : {total / result['elapsed']:.0f} req/s")
+    print(f"{'type':>13} {'nombre':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    for kind, values in result["latencies"].items():
+        values = sorted(values)
+        if values:
+            print(f"{kind:>13} {len(values):>8} {percentile(values, 0.5) * 1000:>9.2f} "
+                  f"{percentile(values, 0.99) * 1000:>9.2f} {values[-1] * 1000:>9.2f}")
+    print("codes HTTP : " + ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items())))
+
+
+async def main_async(args: argparse.Namespace):
+    vehicle_ids, customer_ids = await prepare_fleet(args.host, args.port, args.vehicles, args.customers)
+    result = await run_load(args.host, args.port, args.connections, args.requests, args.booking_ratio,
+                            vehicle_ids, customer_ids, args.seed)
+    report(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API de location")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--connections", type=int, default=32, help="connexions persistantes simultanées")
+    parser.add_argument("--requests", type=int, default=10000, help="nombre total de requêtes")
+    parser.add_argument("--booking-ratio", type=float, default=0.8, help="part des réservations (le reste : disponibilités)")
+    parser.add_argument("--vehicles", type=int, default=1000, help="véhicules créés avant le test")
+    parser.add_argument("--customers", type=int, default=500, help="clients créés avant le test")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+# server.py
+# API JSON au-dessus de CarRentalSystem : serveur HTTP/1.1 asyncio, bibliothèque standard uniquement.
+#
+# Exemple : python -m api.server --port 8080
+#
+# Points d'entrée :
+#   GET  /vehicles[?offset=&limit=&sort=&desc=1&category=&state=&search=]   GET /vehicles/{id}   POST /vehicles
+#   GET  /customers[?offset=&limit=&sort=&desc=1&search=]                   GET /customers/{id}  POST /customers
+#        (listes paginées : limit vaut DEFAULT_PAGE_SIZE par défaut, au plus MAX_PAGE_SIZE)
+#   GET  /availability?start=AAAA-MM-JJ&end=AAAA-MM-JJ[&category=&max_rate=&customer_id=&limit=]
+#   POST /rentals        {"customer_id", "vehicle_id", "start_date", "end_date"}
+#   GET  /rentals/{id}
+#   POST /rentals/{id}/end   {"return_date"}
+#
+# Les connexions sont persistantes (keep-alive). Les réservations concurrentes sont regroupées
+# par BookingBatcher en un seul appel à create_rentals_batch, dans leur ordre d'arrivée : entre deux
+# réservations qui se chevauchent, la première arrivée l'emporte. Les autres appels au système
+# s'exécutent dans un pool de threads pour ne jamais bloquer la boucle asyncio.
+import argparse
+import asyncio
+import datetime
+import functools
+import json
+import re
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.car_rental_system import CarRentalSystem
+from core.search_index import DuplicateError
+from models.vehicle import Vehicle
+from models.customer import Customer
+from models.rental import Rental
+
+MAX_BODY_BYTES = 1 << 20
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+IDLE_TIMEOUT = 30.0  # Secondes d'inactivité avant de fermer une connexion persistante
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+BookingRequest = Tuple[int, int, datetime.date, datetime.date]
+BookingResult = Tuple[Optional[Rental], Optional[str]]
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# --- Représentation JSON des modèles ---
+
+def vehicle_to_dict(vehicle: Vehicle) -> Dict[str, Any]:
+    return {"id": vehicle.id, "brand": vehicle.brand, "model": vehicle.model, "license_plate": vehicle.license_plate,
+            "daily_rate": vehicle.daily_rate, "category": vehicle.category, "state": vehicle.state,
+            "status": vehicle.status}
+
+
+def customer_to_dict(customer: Customer) -> Dict[str, Any]:
+    return {"id": customer.id, "first_name": customer.first_name, "last_name": customer.last_name,
+            "age": customer.age, "driver_license_number": customer.driver_license_number, "email": customer.email}
+
+
+def rental_to_dict(rental: Rental) -> Dict[str, Any]:
+    return {"id": rental.id, "customer_id": rental.customer.id, "vehicle_id": rental.vehicle.id,
+            "start_date": rental.start_date.isoformat(), "end_date": rental.end_date.isoformat(),
+            "status": rental.status, "total_cost": rental.get_total_cost(),
+            "actual_return_date": rental.actual_return_date.isoformat() if rental.actual_return_date else None,
+            "penalty_amount": rental.penalty_amount}
+
+
+# --- Lecture des paramètres ---
+
+def _date(value: Any, name: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"Paramètre '{name}' invalide : date attendue au format AAAA-MM-JJ.")
+
+
+def _int(value: Any, name: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"Paramètre '{name}' invalide : entier attendu.")
+
+
+def _float(value: Any, name: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"Paramètre '{name}' invalide : nombre attendu.")
+
+
+def _field(body: Dict[str, Any], name: str) -> Any:
+    if name not in body:
+        raise HttpError(400, f"Champ '{name}' manquant.")
+    return body[name]
+
+
+def _text(body: Dict[str, Any], name: str) -> str:
+    value = _field(body, name)
+    if not isinstance(value, str):
+        raise HttpError(400, f"Champ '{name}' invalide : texte attendu.")
+    return value
+
+
+def _listing(query: Dict[str, str], filter_names: Tuple[str, ...]) -> Tuple[int, int, str, bool, Dict[str, str]]:
+    """Arguments de list_vehicles / list_customers lus dans la chaîne de requête."""
+    offset = _int(query.get("offset", 0), "offset")
+    limit = _int(query.get("limit", DEFAULT_PAGE_SIZE), "limit")
+    if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HttpError(400, f"Pagination invalide : offset >= 0 et 1 <= limit <= {MAX_PAGE_SIZE}.")
+    filters = {name: query[name] for name in filter_names if name in query}
+    return offset, limit, query.get("sort", "id"), query.get("desc", "0") not in ("0", "false", ""), filters
+
+
+# --- Micro-batching des réservations ---
+
+class BookingBatcher:
+    """
+    Regroupe les demandes de réservation concurrentes en un seul appel à create_rentals_batch.
+    Une seule passe est en cours à la fois : pendant qu'elle s'exécute, les nouvelles demandes
+    s'accumulent dans la file et partent ensemble dans la passe suivante (au plus max_batch).
+    max_delay > 0 attend en plus un court instant avant chaque passe pour grossir les lots.
+    Entre deux demandes d'un même lot qui se chevauchent, la première arrivée l'emporte, comme si
+    elles avaient été traitées une à une (create_rentals_batch avec arrival_order=True).
+    """
+
+    def __init__(self, system: CarRentalSystem, executor: ThreadPoolExecutor, max_batch: int = 256,
+                 max_delay: float = 0.0):
+        self.system = system
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._executor = executor
+        self._queue: "asyncio.Queue[Tuple[BookingRequest, asyncio.Future]]" = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, request: BookingRequest) -> BookingResult:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            if self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+            while len(pending) < self.max_batch and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, functools.partial(self.system.create_rentals_batch,
+                                                      [request for request, _ in pending], arrival_order=True))
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.requests += len(pending)
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def close(self):
+        self._task.cancel()
+
+
+# --- Serveur ---
+
+class RentalApiServer:
+    """Serveur HTTP/1.1 minimal (JSON, keep-alive) qui expose un CarRentalSystem."""
+
+    def __init__(self, system: CarRentalSystem, workers: int = 8, max_batch: int = 256, max_delay: float = 0.0):
+        self.system = system
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rentacar-api")
+        self._batcher: Optional[BookingBatcher] = None
+        self._routes: List[Tuple[str, "re.Pattern[str]", Callable]] = [
+            ("GET", re.compile(r"/vehicles"), self.list_vehicles),
+            ("POST", re.compile(r"/vehicles"), self.add_vehicle),
+            ("GET", re.compile(r"/vehicles/(\d+)"), self.get_vehicle),
+            ("GET", re.compile(r"/customers"), self.list_customers),
+            ("POST", re.compile(r"/customers"), self.add_customer),
+            ("GET", re.compile(r"/customers/(\d+)"), self.get_customer),
+            ("GET", re.compile(r"/availability"), self.availability),
+            ("POST", re.compile(r"/rentals"), self.create_rental),
+            ("GET", re.compile(r"/rentals/(\d+)"), self.get_rental),
+            ("POST", re.compile(r"/rentals/(\d+)/end"), self.end_rental),
+        ]
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        self._batcher = BookingBatcher(self.system, self._executor, self.max_batch, self.max_delay)
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _call(self, function: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), IDLE_TIMEOUT)
+                except HttpError as e:
+                    writer.write(self._response(e.status, {"error": e.message}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, payload = await self._dispatch(method, target, body)
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bytes, bool]]:
+        line = await reader.readline()
+        if not line:
+            return None  # Connexion fermée par le client
+        parts = line.decode("latin-1").rstrip("\r\n").split(" ")
+        if len(parts) != 3:
+            raise HttpError(400, "Ligne de requête HTTP invalide.")
+        method, target, version = parts
+        headers: Dict[str, str] = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "transfer-encoding" in headers:
+            raise HttpError(400, "Transfer-Encoding non supporté : indiquer Content-Length.")
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(400, "En-tête Content-Length invalide.")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Corps de requête trop volumineux.")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, target, body, keep_alive
+
+    @staticmethod
+    def _response(status: int, payload: Any, keep_alive: bool) -> bytes:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        path = url.path.rstrip("/") or "/"
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HttpError(400, "Le corps de la requête doit être un objet JSON.")
+                return await handler(query, data, *match.groups())
+            except HttpError as e:
+                return e.status, {"error": e.message}
+            except DuplicateError as e:  # Plaque, permis ou email déjà attribué
+                return 409, {"error": str(e)}
+            except ValueError as e:  # JSON invalide ou validations des modèles
+                return 400, {"error": str(e)}
+            except Exception as e:
+                return 500, {"error": f"Erreur inattendue : {e}"}
+        if allowed:
+            return 405, {"error": f"Méthode {method} non autorisée sur {path}."}
+        return 404, {"error": f"Ressource inconnue : {path}."}
+
+    # --- Points d'entrée ---
+
+    async def list_vehicles(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        page = await self._call(self.system.list_vehicles, *_listing(query, ("category", "state", "search")))
+        return 200, [vehicle_to_dict(vehicle) for vehicle in page.items]
+
+    async def get_vehicle(self, query: Dict[str, str], body: Dict[str, Any], vehicle_id: str) -> Tuple[int, Any]:
+        vehicle = self.system.find_vehicle(int(vehicle_id))
+        if vehicle is None:
+            raise HttpError(404, f"Véhicule avec ID {vehicle_id} non trouvé.")
+        return 200, vehicle_to_dict(vehicle)
+
+    async def add_vehicle(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        vehicle = await self._call(self.system.add_vehicle, _text(body, "brand"), _text(body, "model"),
+                                   _text(body, "license_plate"), _float(_field(body, "daily_rate"), "daily_rate"),
+                                   _text(body, "category"), _text(body, "state"))
+        return 201, vehicle_to_dict(vehicle)
+
+    async def list_customers(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        page = await self._call(self.system.list_customers, *_listing(query, ("search",)))
+        return 200, [customer_to_dict(customer) for customer in page.items]
+
+    async def get_customer(self, query: Dict[str, str], body: Dict[str, Any], customer_id: str) -> Tuple[int, Any]:
+        customer = self.system.find_customer(int(customer_id))
+        if customer is None:
+            raise HttpError(404, f"Client avec ID {customer_id} non trouvé.")
+        return 200, customer_to_dict(customer)
+
+    async def add_customer(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        customer = await self._call(self.system.add_customer, _text(body, "first_name"), _text(body, "last_name"),
+                                    _int(_field(body, "age"), "age"), _text(body, "driver_license_number"),
+                                    _text(body, "email"))
+        return 201, customer_to_dict(customer)
+
+    async def availability(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        start_date = _date(query.get("start"), "start")
+        end_date = _date(query.get("end"), "end")
+        max_rate = _float(query["max_rate"], "max_rate") if "max_rate" in query else None
+        customer_id = _int(query["customer_id"], "customer_id") if "customer_id" in query else None
+        limit = _int(query["limit"], "limit") if "limit" in query else None
+        vehicles = await self._call(self.system.find_available, start_date, end_date, query.get("category"),
+                                    max_rate, customer_id, limit)
+        return 200, [vehicle_to_dict(vehicle) for vehicle in vehicles]
+
+    async def create_rental(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        request = (_int(_field(body, "customer_id"), "customer_id"), _int(_field(body, "vehicle_id"), "vehicle_id"),
+                   _date(_field(body, "start_date"), "start_date"), _date(_field(body, "end_date"), "end_date"))
+        rental, error = await self._batcher.submit(request)
+        if error:
+            return 409, {"error": error}
+        return 201, rental_to_dict(rental)
+
+    async def get_rental(self, query: Dict[str, str], body: Dict[str, Any], rental_id: str) -> Tuple[int, Any]:
+        rental = await self._call(self.system.find_rental, int(rental_id))
+        if rental is None:
+            raise HttpError(404, f"Location ID {rental_id} non trouvée.")
+        return 200, rental_to_dict(rental)
+
+    async def end_rental(self, query: Dict[str, str], body: Dict[str, Any], rental_id: str) -> Tuple[int, Any]:
+        return_date = _date(_field(body, "return_date"), "return_date")
+        rental = await self._call(self.system.find_rental, int(rental_id))
+        if rental is None:
+            raise HttpError(404, f"Location ID {rental_id} non trouvée.")
+        if return_date < rental.start_date:
+            raise HttpError(400, "La date de retour ne peut pas être antérieure à la date de début de location.")
+        final_cost = await self._call(self.system.end_rental, rental.id, return_date)
+        if final_cost is None:
+            raise HttpError(409, f"La location ID {rental_id} n'est pas active et ne peut pas être terminée.")
+        return 200, rental_to_dict(rental)
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.close()
+        self._executor.shutdown(wait=False)
+
+
+async def serve(system: CarRentalSystem, host: str, port: int, started: Optional[threading.Event] = None, **options):
+    api = RentalApiServer(system, **options)
+    server = await api.start(host, port)
+    if started is not None:
+        started.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+
+def start_in_thread(system: CarRentalSystem, host: str, port: int, **options) -> threading.Thread:
+    """Sert l'API dans un thread dédié (sa propre boucle asyncio), à côté de Streamlit par exemple."""
+    started = threading.Event()
+    thread = threading.Thread(target=lambda: asyncio.run(serve(system, host, port, started, **options)),
+                              name="rentacar-api", daemon=True)
+    thread.start()
+    started.wait(timeout=5)
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON de location de véhicules")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="threads pour les appels au système")
+    parser.add_argument("--max-batch", type=int, default=256, help="réservations au plus par passe")
+    parser.add_argument("--max-delay", type=float, default=0.0, help="attente (s) avant chaque passe de réservations")
+    args = parser.parse_args()
+
+    from core.system_factory import create_rental_system
+    system = create_rental_system()
+    print(f"API de location sur http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(system, args.host, args.port, workers=args.workers, max_batch=args.max_batch,
+                          max_delay=args.max_delay))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        system.storage.close()
+
+
+if __name__ == "__main__":
+    main()
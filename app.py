@@ -1,16 +1,9 @@
 import streamlit as st 
-from core.car_rental_system import CarRentalSystem
+from shared_system import get_agency_network
 
-# Initialisation du système de location de voitures dans la session Streamlit
-# Ceci permet de maintenir l'état du système (véhicules, clients, locations)
-# lorsque l'utilisateur navigue entre les pages.
-if 'car_rental_system' not in st.session_state:
-    st.session_state.car_rental_system = CarRentalSystem()
-    st.session_state.car_rental_system.add_vehicle("Toyota", "Corolla", "AB-123-CD", 50.0,"Voiture","available")
-    st.session_state.car_rental_system.add_vehicle("Renault", "Clio", "EF-456-GH", 40.0, "Voiture","available")
-    st.session_state.car_rental_system.add_vehicle("Yamaha", "MT-07", "WF-002-LD", 40.0, "Moto","available")
-    st.session_state.car_rental_system.add_customer("Alice", "Dupont", 28, "AD12345", "alice@example.com")
-    st.session_state.car_rental_system.add_customer("Bob", "Martin", 22, "BM67890","charlie@exemple.com")
+# Le réseau d'agences (un système de location par agence) est une ressource unique du processus,
+# partagée par toutes les sessions et conservée lorsque l'utilisateur navigue entre les pages.
+# Stockage (RENTACAR_DB, RENTACAR_JOURNAL) et données de démonstration : voir shared_system.py.
 
 
 st.set_page_config(
@@ -30,6 +23,7 @@ Utilisez la barre latérale pour naviguer entre les différentes sections :
 - **Nouvelle Location** : Enregistrer une nouvelle location.
 - **Locations en cours** : Gérer et terminer les locations actives.
 - **Rapports** : Consulter les véhicules disponibles, le chiffre d'affaires, etc.
+- **Performance** : Mesurer la durée des opérations et des pages, profiler un affichage.
 
 ---
 """)
@@ -40,7 +34,8 @@ st.info("Sélectionnez une page dans le menu de gauche pour commencer.")
 
 
 # ajout ici d'un petit résumé ou des statistiques globales si vous le souhaitez
-rental_system = st.session_state.car_rental_system
+# Totaux de toutes les agences (RENTACAR_AGENCIES), interrogées en parallèle
+rental_system = get_agency_network()
 st.subheader("Statistiques Rapides")
 col1, col2, col3 = st.columns(3)
 with col1:
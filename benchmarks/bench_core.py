@@ -0,0 +1,238 @@
+# bench_core.py
+# Microbenchmarks des chemins principaux de CarRentalSystem (réservation, recherche, retour, facturation)
+# pour plusieurs volumes de locations, sur des données synthétiques reproductibles (graine fixe).
+#
+# Exemples :
+#   python -m benchmarks.bench_core --sizes 1000 100000 1000000 --output resultats.json
+#   python -m benchmarks.bench_core --compare reference.json resultats.json --threshold 0.25
+#
+# En mode comparaison, toute opération plus lente que la référence de plus de `threshold`
+# (en proportion) et d'au moins `min-delta-us` microsecondes est signalée et le code de sortie
+# vaut 1. Chaque exécution signale aussi les opérations censées rester en temps constant
+# dont le coût grandit avec le volume.
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy  # noqa: F401 -- chargé d'avance : son import ne doit pas compter dans les opérations en lot
+
+from core.car_rental_system import CarRentalSystem
+from models.rental import Rental
+
+FIRST_DAY = datetime.date(2024, 1, 1)
+CATEGORIES = ("Véhicule", "Camion", "Moto", "Bus")
+
+# Opérations dont le coût par appel ne doit pas dépendre du nombre de locations
+CONSTANT_TIME = ("create_rental", "find_rental", "end_rental", "calculate_total_revenue",
+                 "calculate_final_cost_on_return")
+
+
+def build_system(rental_count: int, seed: int) -> Tuple[CarRentalSystem, List[int]]:
+    """
+    Système avec rental_count locations : 80 % terminées (quelques retards), 20 % en cours.
+    Retourne le système et la liste des IDs de véhicules.
+    """
+    rng = random.Random(seed)
+    system = CarRentalSystem()
+    vehicle_count = max(20, rental_count // 50)
+    customer_count = max(10, rental_count // 100)
+    vehicle_ids = [system.add_vehicle("Renault", "Clio", f"BM-{i:07d}", 30.0 + i % 70,
+                                      CATEGORIES[i % len(CATEGORIES)], "disponible").id
+                   for i in range(vehicle_count)]
+    customer_ids = [system.add_customer("Client", f"N{i}", 30 + i % 40, f"B{i:07d}", f"bench{i}@example.com").id
+                    for i in range(customer_count)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for offset in range(0, rental_count, 100000):
+            requests = []
+            for i in range(offset, min(offset + 100000, rental_count)):
+                start = FIRST_DAY + datetime.timedelta(days=(i // vehicle_count) * 5)
+                requests.append((rng.choice(customer_ids), vehicle_ids[i % vehicle_count],
+                                 start, start + datetime.timedelta(days=rng.randint(0, 3))))
+            for rental, _ in system.create_rentals_batch(requests):
+                if rental is not None and rng.random() < 0.8:
+                    system.end_rental(rental.id, rental.end_date + datetime.timedelta(days=rng.choice((0, 0, 0, 1))))
+    return system, vehicle_ids
+
+
+def timed(operation: Callable[[], None], calls: int, rounds: int = 3) -> float:
+    """Durée moyenne d'un appel en microsecondes, meilleure de `rounds` séries de `calls` appels."""
+    best = float("inf")
+    for _ in range(rounds):
+        began = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        best = min(best, time.perf_counter() - began)
+    return best / calls * 1e6
+
+
+def run_size(rental_count: int, seed: int) -> Dict[str, Dict[str, float]]:
+    began = time.perf_counter()
+    system, vehicle_ids = build_system(rental_count, seed)
+    setup_seconds = time.perf_counter() - began
+    rng = random.Random(seed + 1)
+    rental_ids = [rental.id for rental in system.rentals]
+    customer_id = next(iter(system.customers))
+    results: Dict[str, Dict[str, float]] = {}
+
+    def record(name: str, per_op_us: float, calls: int):
+        results[name] = {"per_op_us": round(per_op_us, 3), "calls": calls}
+
+    # create_rental / end_rental : périodes libres, bien après l'historique
+    calls = 1000
+    future = FIRST_DAY + datetime.timedelta(days=365 * 100)
+    slots = iter(range(10 ** 9))
+    created: List[Rental] = []
+
+    def create():
+        slot = next(slots)
+        start = future + datetime.timedelta(days=(slot // len(vehicle_ids)) * 5)
+        rental, _ = system.create_rental(customer_id, vehicle_ids[slot % len(vehicle_ids)], start,
+                                         start + datetime.timedelta(days=2))
+        created.append(rental)
+    record("create_rental", timed(create, calls), calls)
+
+    to_end = iter(created)
+
+    def end():
+        rental = next(to_end)
+        system.end_rental(rental.id, rental.end_date)
+    with contextlib.redirect_stdout(io.StringIO()):
+        record("end_rental", timed(end, calls), calls)
+
+    # Clôture en lot : 1000 autres locations terminées en un appel, coût rapporté à un retour
+    created.clear()
+    for _ in range(calls):
+        create()
+    batch = [(rental.id, rental.end_date) for rental in created]
+    with contextlib.redirect_stdout(io.StringIO()):
+        record("end_rentals_batch (par retour)",
+               timed(lambda: system.end_rentals_batch(batch), 1, rounds=1) / len(batch), 1)
+
+    calls = 10000
+    lookups = [rng.choice(rental_ids) for _ in range(calls)]
+    lookup = iter(lookups * 3)
+    record("find_rental", timed(lambda: system.find_rental(next(lookup)), calls), calls)
+
+    calls = 10
+    record("get_available_vehicles", timed(system.get_available_vehicles, calls), calls)
+    record("get_current_rentals", timed(system.get_current_rentals, calls), calls)
+
+    calls = 10000
+    record("calculate_total_revenue", timed(system.calculate_total_revenue, calls), calls)
+    # Chiffre d'affaires d'une période (trimestre au milieu de l'historique), une catégorie
+    quarter_start = FIRST_DAY + datetime.timedelta(days=len(rental_ids) // len(vehicle_ids) * 5 // 2)
+    quarter_end = quarter_start + datetime.timedelta(days=90)
+    record("revenue_between", timed(lambda: system.revenue_between(quarter_start, quarter_end, "Camion"), calls), calls)
+
+    # Facturation d'un retour : sur des locations détachées, pour ne pas modifier le système
+    sample = [system.find_rental(rental_id) for rental_id in lookups[:100]]
+    detached = [Rental(rental.customer, rental.vehicle, rental.start_date, rental.end_date) for rental in sample]
+    returns = iter([(rental, rental.end_date + datetime.timedelta(days=i % 3)) for i, rental in enumerate(detached)] * 300)
+
+    def bill():
+        rental, return_date = next(returns)
+        rental.calculate_final_cost_on_return(return_date)
+    record("calculate_final_cost_on_return", timed(bill, calls), calls)
+
+    # Devis en masse : 1000 couples (véhicule, période) par appel, coût rapporté à un devis
+    quote_requests = [(rng.choice(vehicle_ids), future, future + datetime.timedelta(days=rng.randint(0, 14)))
+                      for _ in range(1000)]
+    record("quote_many (par devis)", timed(lambda: system.quote_many(quote_requests), 10) / len(quote_requests), 10)
+
+    results["_setup"] = {"seconds": round(setup_seconds, 2), "rentals": len(system.rentals)}
+    return results
+
+
+def print_run(run: Dict[str, Dict[str, Dict[str, float]]]):
+    sizes = list(run)
+    operations = [name for name in run[sizes[0]] if not name.startswith("_")]
+    print(f"{'opération (µs/appel)':>32} " + " ".join(f"{size:>12}" for size in sizes))
+    for name in operations:
+        print(f"{name:>32} " + " ".join(f"{run[size][name]['per_op_us']:>12.2f}" for size in sizes))
+
+
+def scaling_warnings(run: Dict[str, Dict[str, Dict[str, float]]], limit: float) -> List[str]:
+    """Opérations en temps constant dont le coût grandit de plus de `limit` fois entre le plus petit et le plus grand volume."""
+    sizes = sorted(run, key=int)
+    if len(sizes) < 2:
+        return []
+    smallest, largest = run[sizes[0]], run[sizes[-1]]
+    warnings = []
+    for name in CONSTANT_TIME:
+        ratio = largest[name]["per_op_us"] / max(smallest[name]["per_op_us"], 1e-9)
+        if ratio > limit:
+            warnings.append(f"{name} : x{ratio:.1f} entre {sizes[0]} et {sizes[-1]} locations")
+    return warnings
+
+
+def compare(reference: dict, current: dict, threshold: float, min_delta_us: float = 0.5) -> List[str]:
+    """
+    Régressions de current par rapport à reference : plus de threshold (0.25 = 25 %) plus lent,
+    et au moins min_delta_us microsecondes de plus (les écarts sur les opérations très courtes sont du bruit).
+    """
+    regressions = []
+    print(f"{'volume':>9} {'opération':>32} {'référence':>11} {'actuel':>11} {'écart':>8}")
+    for size, operations in current["results"].items():
+        for name, measure in operations.items():
+            if name.startswith("_") or name not in reference["results"].get(size, {}):
+                continue
+            before = reference["results"][size][name]["per_op_us"]
+            after = measure["per_op_us"]
+            change = (after - before) / before if before else 0.0
+            flag = " <-- régression" if change > threshold and after - before >= min_delta_us else ""
+            print(f"{size:>9} {name:>32} {before:>11.2f} {after:>11.2f} {change:>+8.0%}{flag}")
+            if flag:
+                regressions.append(f"{name} ({size} locations) : {before:.2f} -> {after:.2f} µs ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks de CarRentalSystem")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="fichier JSON où enregistrer les résultats")
+    parser.add_argument("--compare", nargs=2, metavar=("REFERENCE", "ACTUEL"),
+                        help="compare deux fichiers de résultats au lieu de lancer les mesures")
+    parser.add_argument("--threshold", type=float, default=0.25, help="ralentissement toléré en comparaison")
+    parser.add_argument("--min-delta-us", type=float, default=0.5, help="écart absolu minimum signalé en comparaison")
+    parser.add_argument("--scaling-limit", type=float, default=10.0,
+                        help="croissance tolérée du coût des opérations en temps constant")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as reference_file, \
+                open(args.compare[1], encoding="utf-8") as current_file:
+            regressions = compare(json.load(reference_file), json.load(current_file), args.threshold,
+                                  args.min_delta_us)
+        for regression in regressions:
+            print(f"RÉGRESSION : {regression}")
+        sys.exit(1 if regressions else 0)
+
+    run = {}
+    for size in args.sizes:
+        print(f"... {size} locations", file=sys.stderr)
+        run[str(size)] = run_size(size, args.seed)
+    print_run(run)
+    warnings = scaling_warnings(run, args.scaling_limit)
+    for warning in warnings:
+        print(f"CROISSANCE ANORMALE : {warning}")
+    if args.output:
+        document = {
+            "meta": {"date": datetime.datetime.now().isoformat(timespec="seconds"), "seed": args.seed,
+                     "python": platform.python_version(), "machine": platform.machine()},
+            "results": run,
+        }
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(document, output, indent=2, ensure_ascii=False)
+    sys.exit(1 if warnings else 0)
+
+
+if __name__ == "__main__":
+    main()
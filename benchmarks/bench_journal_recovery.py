@@ -0,0 +1,69 @@
+# bench_journal_recovery.py
+# Mesure le temps de redémarrage d'un CarRentalSystem sur JournalStorage
+# en fonction de la longueur du journal, avec et sans instantané.
+#
+# Exemple : python -m benchmarks.bench_journal_recovery --lengths 10000 100000
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from core.car_rental_system import CarRentalSystem
+from core.journal_storage import JournalStorage
+
+
+def build_journal(directory: str, operations: int, snapshot_every: int, seed: int = 42):
+    """Écrit un journal d'environ `operations` lignes (création + fin de location, ajouts)."""
+    rng = random.Random(seed)
+    system = CarRentalSystem(JournalStorage(directory, fsync_every=10000, snapshot_every=snapshot_every))
+    vehicles = [system.add_vehicle("Renault", "Clio", f"AA-{i:05d}", 40.0 + i % 50, "Véhicule", "disponible")
+                for i in range(max(10, operations // 200))]
+    customers = [system.add_customer("Client", f"N{i}", 30, f"P{i:06d}", f"client{i}@example.com")
+                 for i in range(max(10, operations // 100))]
+    next_free = {vehicle.id: datetime.date(2024, 1, 1) for vehicle in vehicles}
+    written = len(vehicles) + len(customers)
+    with contextlib.redirect_stdout(io.StringIO()):
+        while written < operations:
+            vehicle = rng.choice(vehicles)
+            start = next_free[vehicle.id]
+            end = start + datetime.timedelta(days=rng.randint(1, 7))
+            rental, _ = system.create_rental(rng.choice(customers).id, vehicle.id, start, end)
+            system.end_rental(rental.id, end + datetime.timedelta(days=rng.choice((0, 0, 0, 1))))
+            next_free[vehicle.id] = end + datetime.timedelta(days=2)
+            written += 4  # création : location + véhicule ; fin : location + véhicule
+    system.storage.close()
+
+
+def measure_recovery(directory: str) -> float:
+    start = time.perf_counter()
+    system = CarRentalSystem(JournalStorage(directory))
+    elapsed = time.perf_counter() - start
+    system.storage.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de reprise selon la longueur du journal")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10000, 100000, 400000])
+    parser.add_argument("--snapshot-every", type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'lignes':>10} {'instantané':>11} {'reprise (s)':>12}")
+    for length in args.lengths:
+        for snapshot_every in (length * 10, args.snapshot_every):
+            directory = tempfile.mkdtemp(prefix="journal-bench-")
+            try:
+                build_journal(directory, length, snapshot_every)
+                label = "non" if snapshot_every > length else f"/{snapshot_every}"
+                print(f"{length:>10} {label:>11} {measure_recovery(directory):>12.3f}")
+            finally:
+                shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
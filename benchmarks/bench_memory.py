@@ -0,0 +1,122 @@
+# bench_memory.py
+# Mesure l'empreinte mémoire des modèles : octets par objet (Vehicle, Customer, Rental)
+# et RSS du processus après création d'un grand nombre de locations dans un CarRentalSystem.
+#
+# Exemple : python -m benchmarks.bench_memory --rentals 1000000
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import resource
+import time
+import tracemalloc
+
+from core.car_rental_system import CarRentalSystem
+from models.vehicle import Vehicle
+from models.customer import Customer
+from models.rental import Rental
+
+CATEGORIES = ("Véhicule", "Bus", "Moto", "Camion")
+
+
+def _fresh(text: str) -> str:
+    """Copie d'une chaîne, comme une valeur lue dans un fichier importé ou une base (non partagée)."""
+    return "".join(list(text))
+
+
+def _vehicle(i: int) -> Vehicle:
+    return Vehicle(_fresh("Renault"), _fresh("Clio"), f"AA-{i:07d}", 40.0 + i % 50,
+                   _fresh(CATEGORIES[i % len(CATEGORIES)]), _fresh("disponible"))
+
+
+def _customer(i: int) -> Customer:
+    return Customer("Client", f"N{i}", 30 + i % 40, f"P{i:07d}", f"client{i}@example.com")
+
+
+def rss_bytes() -> int:
+    """RSS courant du processus (Linux), à défaut le pic mesuré par getrusage."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def bytes_per_object(build, count: int) -> float:
+    """Mémoire allouée par objet construit (tracemalloc), objets référencés gardés en vie pendant la mesure."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [build(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # La liste qui contient les objets n'est pas comptée
+    allocated -= objects.__sizeof__()
+    return allocated / count
+
+
+def measure_objects(count: int):
+    vehicles = [_vehicle(i) for i in range(100)]
+    customers = [_customer(i) for i in range(100)]
+    start = datetime.date(2024, 1, 1)
+
+    def build_rental(i: int) -> Rental:
+        rental = Rental(customers[i % 100], vehicles[i % 100], start + datetime.timedelta(days=i % 365),
+                        start + datetime.timedelta(days=i % 365 + 3))
+        customers[i % 100].add_rental_to_history(rental.id)
+        return rental
+
+    print(f"{'objet':>10} {'octets/objet':>13}")
+    print(f"{'Vehicle':>10} {bytes_per_object(_vehicle, count):>13.0f}")
+    print(f"{'Customer':>10} {bytes_per_object(_customer, count):>13.0f}")
+    print(f"{'Rental':>10} {bytes_per_object(build_rental, count):>13.0f}  (historique client et dates compris)")
+
+
+def measure_system(rental_count: int):
+    baseline = rss_bytes()
+    started = time.perf_counter()
+    system = CarRentalSystem()
+    vehicle_count = max(1, rental_count // 50)
+    customer_count = max(1, rental_count // 100)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vehicle_ids = [system.add_vehicle("Renault", "Clio", f"AA-{i:07d}", 40.0 + i % 50,
+                                          CATEGORIES[i % len(CATEGORIES)], "disponible").id
+                       for i in range(vehicle_count)]
+        customer_ids = [system.add_customer("Client", f"N{i}", 30 + i % 40, f"P{i:07d}",
+                                            f"client{i}@example.com").id
+                        for i in range(customer_count)]
+        first_day = datetime.date(2024, 1, 1)
+        chunk = 100000
+        for offset in range(0, rental_count, chunk):
+            requests = []
+            for i in range(offset, min(offset + chunk, rental_count)):
+                slot = i // vehicle_count
+                start = first_day + datetime.timedelta(days=slot * 4)
+                requests.append((customer_ids[i % customer_count], vehicle_ids[i % vehicle_count],
+                                 start, start + datetime.timedelta(days=2)))
+            system.create_rentals_batch(requests)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    used = rss_bytes() - baseline
+    print(f"{len(system.rentals)} locations, {vehicle_count} véhicules, {customer_count} clients "
+          f"créés en {elapsed:.1f} s")
+    print(f"RSS total : {rss_bytes() / 2**20:.0f} Mio (dont {used / 2**20:.0f} Mio pour le système, "
+          f"{used / max(1, len(system.rentals)):.0f} octets par location)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Empreinte mémoire des modèles et du système")
+    parser.add_argument("--objects", type=int, default=100000, help="objets construits pour la mesure par objet")
+    parser.add_argument("--rentals", type=int, default=1000000, help="locations créées pour la mesure du RSS")
+    args = parser.parse_args()
+    measure_objects(args.objects)
+    measure_system(args.rentals)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bench_snapshot.py
+# Compare l'instantané binaire en colonnes (core/snapshot.py) à l'instantané JSON lignes du journal
+# (JournalStorage) : durée d'écriture, taille du fichier et démarrage à froid (relecture du fichier,
+# puis premières requêtes : chiffre d'affaires, une location de l'historique, historique d'un client).
+#
+# Exemple : python -m benchmarks.bench_snapshot --rentals 1000000
+import argparse
+import datetime
+import gc
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Tuple
+
+from benchmarks.bench_core import build_system
+from core.car_rental_system import CarRentalSystem
+from core.journal_storage import JournalStorage, SNAPSHOT_PREFIX
+from core.snapshot import load_snapshot, save_snapshot
+
+
+def timed(operation: Callable[[], object]) -> Tuple[float, object]:
+    gc.collect()
+    start = time.perf_counter()
+    result = operation()
+    return time.perf_counter() - start, result
+
+
+def save_json(system: CarRentalSystem, directory: str) -> int:
+    """Instantané complet au format du journal (une ligne JSON par entité), relu par JournalStorage."""
+    path = os.path.join(directory, f"{SNAPSHOT_PREFIX}{1:08d}.jsonl")
+    JournalStorage._write_snapshot(path, JournalStorage._snapshot_records(system))
+    return os.path.getsize(path)
+
+
+def first_queries(system: CarRentalSystem, rental_id: int, customer_id: int):
+    system.calculate_total_revenue()
+    system.revenue_between(datetime.date(2024, 1, 1), datetime.date(2024, 12, 31))
+    system.find_rental(rental_id)
+    system.get_customer_rental_history(customer_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Instantané binaire contre instantané JSON")
+    parser.add_argument("--rentals", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"Construction d'un système de {args.rentals} locations...")
+    system, _ = build_system(args.rentals, args.seed)
+    rental_id = args.rentals // 3
+    customer_id = system.get_all_customers()[0].id
+    revenue = system.calculate_total_revenue()
+    directory = tempfile.mkdtemp(prefix="snapshot-bench-")
+    try:
+        binary_path = os.path.join(directory, "systeme.snap")
+        json_directory = os.path.join(directory, "journal")
+        os.makedirs(json_directory)
+
+        binary_save, binary_size = timed(lambda: save_snapshot(system, binary_path))
+        json_save, json_size = timed(lambda: save_json(system, json_directory))
+        del system
+        gc.collect()
+
+        binary_load, loaded = timed(lambda: load_snapshot(binary_path))
+        binary_queries, _ = timed(lambda: first_queries(loaded, rental_id, customer_id))
+        assert abs(loaded.calculate_total_revenue() - revenue) < 1e-6 * max(1.0, revenue)
+        del loaded
+        gc.collect()
+
+        json_load, loaded = timed(lambda: CarRentalSystem(JournalStorage(json_directory)))
+        json_queries, _ = timed(lambda: first_queries(loaded, rental_id, customer_id))
+        assert abs(loaded.calculate_total_revenue() - revenue) < 1e-6 * max(1.0, revenue)
+        loaded.storage.close()
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"{'format':<8} {'écriture (s)':>13} {'taille (Mo)':>12} {'relecture (s)':>14} {'1res requêtes (s)':>18}")
+    for name, save, size, load, queries in (("binaire", binary_save, binary_size, binary_load, binary_queries),
+                                            ("JSON", json_save, json_size, json_load, json_queries)):
+        print(f"{name:<8} {save:>13.3f} {size / 1e6:>12.1f} {load:>14.3f} {queries:>18.4f}")
+    print(f"Démarrage à froid : {json_load / binary_load:.1f} fois plus rapide, "
+          f"fichier {json_size / binary_size:.1f} fois plus petit.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# generate_workload.py
+# Génère une charge synthétique réaliste pour CarRentalSystem, en JSONL :
+#   vehicles.jsonl   flotte (colonnes de core.importers.VEHICLE_FIELDS), catégories de MIN_AGE_BY_CATEGORY
+#   customers.jsonl  clients (colonnes de core.importers.CUSTOMER_FIELDS), dont quelques jeunes conducteurs
+#   trace.jsonl      événements horodatés : recherches, réservations, annulations et retours
+#                    (saisonnalité annuelle et hebdomadaire, retours en retard ou anticipés)
+#
+# Exemple : python -m benchmarks.generate_workload --out charge/ --vehicles 2000 --customers 5000 --days 365
+#
+# Format des événements (une ligne JSON par événement, triés par "at", en secondes depuis le début) :
+#   {"at": ..., "op": "search", "start": "AAAA-MM-JJ", "end": "AAAA-MM-JJ", "category": ...}
+#   {"at": ..., "op": "book", "ref": n, "customer": i, "vehicle": j, "start": ..., "end": ...}
+#   {"at": ..., "op": "cancel", "ref": n}
+#   {"at": ..., "op": "return", "ref": n, "date": ...}
+# customer et vehicle sont des positions (à partir de 0) dans customers.jsonl et vehicles.jsonl ;
+# ref désigne la réservation n de la trace (les IDs réels ne sont connus qu'au rejeu).
+import argparse
+import datetime
+import heapq
+import json
+import math
+import os
+import random
+from typing import Dict, List, Tuple
+
+from core.car_rental_system import CarRentalSystem
+
+DAY = 86400
+
+# Part de chaque catégorie dans la flotte, durée de location typique (jours) et fourchette de tarif
+CATEGORY_PROFILES = {
+    "Véhicule": {"share": 0.70, "days": (1, 7), "rate": (35.0, 120.0),
+                 "models": [("Renault", "Clio"), ("Peugeot", "208"), ("Toyota", "Yaris"), ("Tesla", "Model 3")]},
+    "Camion": {"share": 0.12, "days": (1, 3), "rate": (80.0, 180.0),
+               "models": [("Mercedes", "Sprinter"), ("Renault", "Master"), ("Iveco", "Daily")]},
+    "Moto": {"share": 0.13, "days": (1, 5), "rate": (30.0, 90.0),
+             "models": [("Yamaha", "MT-07"), ("Honda", "CB500F"), ("BMW", "R1250")]},
+    "Bus": {"share": 0.05, "days": (1, 3), "rate": (150.0, 400.0),
+            "models": [("Mercedes", "Tourismo"), ("Iveco", "Crossway")]},
+}
+assert set(CATEGORY_PROFILES) == set(CarRentalSystem.MIN_AGE_BY_CATEGORY)
+
+FIRST_NAMES = ["Alice", "Bob", "Chloé", "David", "Emma", "Farid", "Gabriel", "Hugo", "Inès", "Jules", "Léa", "Manon"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau"]
+
+
+def seasonality(day: datetime.date) -> float:
+    """Multiplicateur de demande : pic en été, creux en hiver, plus de départs en fin de semaine."""
+    yearly = 1.0 + 0.5 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 100) / 365)
+    weekly = (0.9, 0.9, 0.95, 1.0, 1.3, 1.25, 0.7)[day.weekday()]
+    return yearly * weekly
+
+
+def generate_fleet(count: int, rng: random.Random) -> List[dict]:
+    categories = list(CATEGORY_PROFILES)
+    weights = [CATEGORY_PROFILES[category]["share"] for category in categories]
+    vehicles = []
+    for i in range(count):
+        category = rng.choices(categories, weights)[0]
+        profile = CATEGORY_PROFILES[category]
+        brand, model = rng.choice(profile["models"])
+        low, high = profile["rate"]
+        vehicles.append({"brand": brand, "model": model, "license_plate": f"GW-{i:06d}",
+                         "daily_rate": round(rng.uniform(low, high), 2), "category": category, "state": "disponible"})
+    return vehicles
+
+
+def generate_customers(count: int, rng: random.Random) -> List[dict]:
+    customers = []
+    for i in range(count):
+        bracket = rng.random()
+        age = rng.randint(18, 24) if bracket < 0.15 else rng.randint(66, 80) if bracket > 0.9 else rng.randint(25, 65)
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        customers.append({"first_name": first_name, "last_name": last_name, "age": age,
+                          "driver_license_number": f"GW{i:08d}",
+                          "email": f"{first_name.lower()}.{last_name.lower()}{i}@example.com"})
+    return customers
+
+
+def generate_trace(vehicles: List[dict], customer_count: int, days: int, bookings_per_day: float,
+                   first_day: datetime.date, rng: random.Random, late_rate: float = 0.1, early_rate: float = 0.05,
+                   cancel_rate: float = 0.03, searches_per_booking: float = 2.0) -> List[dict]:
+    """
+    Événements de la trace, triés par horodatage. Le générateur suit l'occupation de chaque véhicule
+    pour que la plupart des réservations soient possibles ; une partie vise volontairement un véhicule
+    déjà pris (demandes concurrentes) et est refusée au rejeu, comme en production.
+    """
+    by_category: Dict[str, List[int]] = {}
+    for position, vehicle in enumerate(vehicles):
+        by_category.setdefault(vehicle["category"], []).append(position)
+    categories = list(by_category)
+    weights = [CATEGORY_PROFILES[category]["share"] for category in categories]
+    busy_until: Dict[int, datetime.date] = {}
+    events: List[Tuple[float, int, dict]] = []  # (horodatage, ordre de création, événement)
+    sequence = 0
+    ref = 0
+
+    def emit(at: float, event: dict):
+        nonlocal sequence
+        event["at"] = round(at, 3)
+        heapq.heappush(events, (at, sequence, event))
+        sequence += 1
+
+    for day_number in range(days):
+        day = first_day + datetime.timedelta(days=day_number)
+        expected = bookings_per_day * seasonality(day)
+        for _ in range(max(0, round(rng.gauss(expected, math.sqrt(expected))))):
+            at = day_number * DAY + rng.uniform(8, 20) * 3600  # Heures d'ouverture
+            category = rng.choices(categories, weights)[0]
+            low, high = CATEGORY_PROFILES[category]["days"]
+            start = day + datetime.timedelta(days=min(int(rng.expovariate(1 / 5)), 60))
+            end = start + datetime.timedelta(days=rng.randint(low, high) - 1)
+            for _ in range(int(searches_per_booking) + (rng.random() < searches_per_booking % 1)):
+                emit(at - rng.uniform(10, 600), {"op": "search", "start": start.isoformat(), "end": end.isoformat(),
+                                                 "category": category})
+            candidates = by_category[category]
+            vehicle = rng.choice(candidates)
+            for _ in range(8):  # Le client trouve le plus souvent un véhicule libre
+                if busy_until.get(vehicle, first_day) <= start:
+                    break
+                vehicle = rng.choice(candidates)
+            emit(at, {"op": "book", "ref": ref, "customer": rng.randrange(customer_count), "vehicle": vehicle,
+                      "start": start.isoformat(), "end": end.isoformat()})
+
+            if rng.random() < cancel_rate:
+                emit(at + rng.uniform(0, (start - day).days * DAY + 3600), {"op": "cancel", "ref": ref})
+            else:
+                outcome = rng.random()
+                returned = end
+                if outcome < late_rate:
+                    returned = end + datetime.timedelta(days=rng.randint(1, 3))
+                elif outcome < late_rate + early_rate and end > start:
+                    returned = end - datetime.timedelta(days=rng.randint(1, (end - start).days))
+                emit((returned - first_day).days * DAY + rng.uniform(8, 19) * 3600,
+                     {"op": "return", "ref": ref, "date": returned.isoformat()})
+                if busy_until.get(vehicle, first_day) <= start:
+                    busy_until[vehicle] = max(end, returned) + datetime.timedelta(days=1)
+            ref += 1
+    return [event for _, _, event in sorted(events)]
+
+
+def write_jsonl(path: str, records: List[dict]):
+    with open(path, "w", encoding="utf-8") as output:
+        for record in records:
+            output.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère flotte, clients et trace de réservations (JSONL)")
+    parser.add_argument("--out", required=True, help="répertoire de sortie")
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--bookings-per-day", type=float, default=600.0, help="demande moyenne (avant saisonnalité)")
+    parser.add_argument("--first-day", type=datetime.date.fromisoformat, default=datetime.date(2025, 1, 1))
+    parser.add_argument("--late-rate", type=float, default=0.1, help="part des retours en retard")
+    parser.add_argument("--early-rate", type=float, default=0.05, help="part des retours anticipés")
+    parser.add_argument("--cancel-rate", type=float, default=0.03, help="part des réservations annulées")
+    parser.add_argument("--searches-per-booking", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    vehicles = generate_fleet(args.vehicles, rng)
+    customers = generate_customers(args.customers, rng)
+    trace = generate_trace(vehicles, len(customers), args.days, args.bookings_per_day, args.first_day, rng,
+                           args.late_rate, args.early_rate, args.cancel_rate, args.searches_per_booking)
+    write_jsonl(os.path.join(args.out, "vehicles.jsonl"), vehicles)
+    write_jsonl(os.path.join(args.out, "customers.jsonl"), customers)
+    write_jsonl(os.path.join(args.out, "trace.jsonl"), trace)
+    counts: Dict[str, int] = {}
+    for event in trace:
+        counts[event["op"]] = counts.get(event["op"], 0) + 1
+    print(f"{len(vehicles)} véhicules, {len(customers)} clients, {len(trace)} événements "
+          f"({', '.join(f'{op}: {count}' for op, count in sorted(counts.items()))}) dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# replay_workload.py
+# Rejoue une trace produite par benchmarks.generate_workload sur un CarRentalSystem neuf, via son API
+# publique (import_vehicles, import_customers, find_available, create_rental, cancel_rental, end_rental),
+# avec plusieurs threads clients et une accélération réglable du temps simulé.
+# Rapport : débit, histogramme et percentiles des latences par opération, motifs de refus, pic de mémoire.
+#
+# Exemples :
+#   python -m benchmarks.replay_workload charge/ --threads 8                  (au plus vite)
+#   python -m benchmarks.replay_workload charge/ --threads 8 --speedup 86400  (un jour simulé par seconde)
+#   python -m benchmarks.replay_workload charge/ --db /tmp/rejeu.db --output rejeu.json
+import argparse
+import bisect
+import concurrent.futures
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import re
+import resource
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.car_rental_system import CarRentalSystem
+from core.importers import read_records
+from core.journal_storage import JournalStorage
+from core.sqlite_storage import SqliteStorage
+
+# Bornes supérieures des classes de l'histogramme des latences, en millisecondes
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+# Motifs de refus reconnus dans les messages d'erreur du système, dans l'ordre de test
+REJECTION_REASONS = (
+    ("chevauchement", re.compile(r"déjà réservé")),
+    ("âge minimum", re.compile(r"âge minimum")),
+    ("véhicule indisponible", re.compile(r"non disponible")),
+    ("dates invalides", re.compile(r"date de fin|date de retour|antérieure", re.IGNORECASE)),
+    ("introuvable", re.compile(r"non trouvé")),
+    ("location inactive", re.compile(r"n'est pas active")),
+)
+
+
+def rejection_reason(message: str) -> str:
+    for reason, pattern in REJECTION_REASONS:
+        if pattern.search(message):
+            return reason
+    return "autre"
+
+
+class ReplayStats:
+    """Latences et refus collectés par les threads clients."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.rejections: Dict[str, Dict[str, int]] = {}
+
+    def record(self, op: str, seconds: float, rejection: Optional[str] = None):
+        with self._lock:
+            self.latencies.setdefault(op, []).append(seconds)
+            if rejection is not None:
+                reasons = self.rejections.setdefault(op, {})
+                reasons[rejection] = reasons.get(rejection, 0) + 1
+
+
+def load_system(directory: str, storage=None) -> Tuple[CarRentalSystem, List[int], List[int]]:
+    """Système neuf chargé avec la flotte et les clients de la trace ; retourne aussi les IDs par position."""
+    system = CarRentalSystem(storage)
+    with open(os.path.join(directory, "vehicles.jsonl"), encoding="utf-8") as stream:
+        report = system.import_vehicles(read_records(stream, "jsonl"))
+        if report.rejected_count:
+            raise ValueError(f"vehicles.jsonl : {report}")
+    with open(os.path.join(directory, "customers.jsonl"), encoding="utf-8") as stream:
+        report = system.import_customers(read_records(stream, "jsonl"))
+        if report.rejected_count:
+            raise ValueError(f"customers.jsonl : {report}")
+    # Les imports conservent l'ordre des fichiers : la position dans la liste est celle de la trace
+    return system, [vehicle.id for vehicle in system.get_all_vehicles()], \
+        [customer.id for customer in system.get_all_customers()]
+
+
+def read_trace(directory: str, limit: Optional[int] = None) -> List[dict]:
+    events = []
+    with open(os.path.join(directory, "trace.jsonl"), encoding="utf-8") as stream:
+        for event in read_records(stream, "jsonl"):
+            if limit is not None and len(events) >= limit:
+                break
+            events.append(event)
+    return events
+
+
+def replay(system: CarRentalSystem, vehicle_ids: List[int], customer_ids: List[int], events: List[dict],
+           threads: int, speedup: float = 0.0) -> Tuple[ReplayStats, float]:
+    """
+    Distribue les événements, dans l'ordre de la trace, à un pool de `threads` clients.
+    Avec speedup > 0, chaque événement part à son horodatage divisé par speedup (temps réel) ;
+    avec 0, la trace est rejouée au plus vite. Retourne les statistiques et la durée du rejeu.
+    Les annulations et retours attendent le résultat de leur réservation (le pool traite les tâches
+    dans l'ordre de soumission, une réservation est donc toujours prise en charge avant eux).
+    """
+    stats = ReplayStats()
+    bookings: Dict[int, concurrent.futures.Future] = {}
+    date = datetime.date.fromisoformat
+
+    def search(event: dict):
+        began = time.perf_counter()
+        system.find_available(date(event["start"]), date(event["end"]), event.get("category"), limit=20)
+        stats.record("search", time.perf_counter() - began)
+
+    def book(event: dict):
+        began = time.perf_counter()
+        rental, error = system.create_rental(customer_ids[event["customer"]], vehicle_ids[event["vehicle"]],
+                                             date(event["start"]), date(event["end"]))
+        stats.record("book", time.perf_counter() - began, rejection_reason(error) if error else None)
+        return rental
+
+    def cancel(event: dict, booking: concurrent.futures.Future):
+        rental = booking.result()
+        if rental is None:
+            return  # Réservation refusée : rien à annuler
+        began = time.perf_counter()
+        cancelled = system.cancel_rental(rental.id)
+        stats.record("cancel", time.perf_counter() - began, None if cancelled else "location inactive")
+
+    def end(event: dict, booking: concurrent.futures.Future):
+        rental = booking.result()
+        if rental is None:
+            return
+        began = time.perf_counter()
+        cost = system.end_rental(rental.id, date(event["date"]))
+        stats.record("return", time.perf_counter() - began, None if cost is not None else "retour refusé")
+
+    pending: List[concurrent.futures.Future] = []
+    # Les méthodes du système écrivent leurs messages sur stdout ; on les écarte pendant le rejeu
+    with contextlib.redirect_stdout(io.StringIO()), \
+            concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        began = time.perf_counter()
+        for event in events:
+            if speedup > 0:
+                delay = began + event["at"] / speedup - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            op = event["op"]
+            if op == "book":
+                future = bookings[event["ref"]] = executor.submit(book, event)
+            elif op == "search":
+                future = executor.submit(search, event)
+            elif op in ("cancel", "return") and event["ref"] in bookings:
+                future = executor.submit(cancel if op == "cancel" else end, event, bookings.pop(event["ref"]))
+            else:
+                continue
+            pending.append(future)
+            if len(pending) >= 10000:  # Remonte les exceptions au fil de l'eau sans tout garder en mémoire
+                for done in pending:
+                    done.result()
+                pending = []
+        for done in pending:
+            done.result()
+        elapsed = time.perf_counter() - began
+    return stats, elapsed
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def histogram(values: List[float]) -> List[int]:
+    """Nombre de mesures par classe de LATENCY_BUCKETS_MS, plus une dernière classe au-delà."""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for seconds in values:
+        counts[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+    return counts
+
+
+def summarize(stats: ReplayStats, elapsed: float, peak_rss: int) -> dict:
+    total = sum(len(values) for values in stats.latencies.values())
+    operations = {}
+    for op, values in sorted(stats.latencies.items()):
+        values = sorted(values)
+        operations[op] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 0.5) * 1000, 4),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+            "max_ms": round(values[-1] * 1000, 4),
+            "histogram": histogram(values),
+            "rejections": stats.rejections.get(op, {}),
+        }
+    return {"operations": total, "elapsed_s": round(elapsed, 3), "throughput": round(total / elapsed, 1) if elapsed else 0.0,
+            "peak_rss_mib": round(peak_rss / 2 ** 20, 1), "buckets_ms": list(LATENCY_BUCKETS_MS), "per_operation": operations}
+
+
+def print_summary(summary: dict):
+    print(f"{summary['operations']} opérations en {summary['elapsed_s']:.2f} s : {summary['throughput']:.0f} op/s, "
+          f"pic de mémoire {summary['peak_rss_mib']:.0f} Mio")
+    print(f"{'opération':>10} {'nombre':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'refus':>8}")
+    for op, measure in summary["per_operation"].items():
+        print(f"{op:>10} {measure['count']:>9} {measure['p50_ms']:>9.3f} {measure['p99_ms']:>9.3f} "
+              f"{measure['max_ms']:>9.3f} {sum(measure['rejections'].values()):>8}")
+    labels = [f"≤ {bound:g} ms" for bound in summary["buckets_ms"]] + [f"> {summary['buckets_ms'][-1]:g} ms"]
+    for op, measure in summary["per_operation"].items():
+        print(f"\nLatences {op} :")
+        largest = max(measure["histogram"]) or 1
+        for label, count in zip(labels, measure["histogram"]):
+            if count:
+                print(f"{label:>12} {count:>9} {'#' * max(1, round(40 * count / largest))}")
+        for reason, count in sorted(measure["rejections"].items(), key=lambda item: -item[1]):
+            print(f"{'refus':>12} {count:>9} {reason}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue une trace de réservations sur CarRentalSystem")
+    parser.add_argument("directory", help="répertoire produit par benchmarks.generate_workload")
+    parser.add_argument("--threads", type=int, default=8, help="threads clients simultanés")
+    parser.add_argument("--speedup", type=float, default=0.0,
+                        help="accélération du temps simulé (0 : au plus vite)")
+    parser.add_argument("--limit", type=int, help="ne rejoue que les N premiers événements")
+    parser.add_argument("--db", help="rejoue sur une base SQLite neuve à ce chemin")
+    parser.add_argument("--journal", help="rejoue sur un journal neuf dans ce répertoire")
+    parser.add_argument("--output", help="fichier JSON où enregistrer le rapport")
+    args = parser.parse_args()
+
+    for path in (args.db, args.journal):
+        if path and os.path.exists(path):
+            parser.error(f"{path} existe déjà : le rejeu part d'un stockage vide")
+    storage = SqliteStorage(args.db) if args.db else JournalStorage(args.journal) if args.journal else None
+    system, vehicle_ids, customer_ids = load_system(args.directory, storage)
+    events = read_trace(args.directory, args.limit)
+    print(f"... {len(vehicle_ids)} véhicules, {len(customer_ids)} clients, {len(events)} événements", file=sys.stderr)
+
+    stats, elapsed = replay(system, vehicle_ids, customer_ids, events, args.threads, args.speedup)
+    summary = summarize(stats, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    print_summary(summary)
+    if args.output:
+        document = {
+            "meta": {"date": datetime.datetime.now().isoformat(timespec="seconds"), "trace": args.directory,
+                     "threads": args.threads, "speedup": args.speedup, "storage": "sqlite" if args.db
+                     else "journal" if args.journal else "mémoire", "python": platform.python_version()},
+            "results": summary,
+        }
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(document, output, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
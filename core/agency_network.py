@@ -0,0 +1,424 @@
+import datetime
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from models.customer import Customer
+from models.rental import Rental
+from models.vehicle import Vehicle
+from core.car_rental_system import CarRentalSystem, OCCUPANCY_DAYS
+from core.catalog_index import Page
+from core.importers import ImportReport
+
+if TYPE_CHECKING:
+    from core.analytics import RentalAnalytics, RentalColumns
+
+DEFAULT_AGENCY = "Agence principale"
+AGENCY_COLUMN = "Agence"  # Colonne ajoutée aux projections consolidées
+
+T = TypeVar("T")
+
+
+class AgencyNetwork:
+    """
+    Réseau d'agences : chaque agence a son propre CarRentalSystem (sa flotte, ses clients, ses locations,
+    ses index, ses verrous et son stockage). Une réservation ne touche que le système de l'agence du véhicule.
+
+    Les requêtes globales (disponibilités, clients, chiffre d'affaires, occupation, rapports) sont envoyées
+    à toutes les agences de façon concurrente sur un pool de threads, puis leurs résultats sont fusionnés.
+    Les attentes (stockage, E/S) se recouvrent ; les calculs en Python pur restent sur un seul cœur (GIL).
+    Les IDs de véhicules, clients et locations sont uniques dans tout le réseau (compteurs de classe
+    des modèles) ; l'agence d'un véhicule est retrouvée une fois puis gardée en cache.
+
+    Un client loue dans une autre agence que la sienne grâce à une copie locale (adopt_customer) :
+    chaque agence ne garde que ses propres locations, l'historique complet est fusionné à la demande.
+    Les clients sont donc ajoutés, modifiés et supprimés par le réseau : le permis et l'email sont uniques
+    dans toutes les agences, et une modification est reportée sur toutes les copies.
+
+    Les méthodes de lecture des rapports ont les mêmes noms et résultats que celles de CarRentalSystem :
+    les pages affichent indifféremment une agence ou le réseau entier.
+    """
+
+    def __init__(self, systems: Dict[str, CarRentalSystem], max_workers: Optional[int] = None):
+        if not systems:
+            raise ValueError("Le réseau doit compter au moins une agence.")
+        self._systems = dict(systems)
+        workers = max_workers or min(len(self._systems), os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="agence")
+        self._vehicle_agency: Dict[int, str] = {}  # Cache de routage : ID de véhicule -> agence
+        self._routing_lock = threading.Lock()
+        self._customers_lock = threading.Lock()  # Ajouts, modifications et suppressions de clients du réseau
+        self._analytics: Dict[str, "RentalAnalytics"] = {}  # Projection en colonnes de chaque agence
+        self._projections: Dict[str, Tuple[tuple, object]] = {}  # Nom -> (versions des agences, projection)
+
+    # --- Agences ---
+
+    def agencies(self) -> List[str]:
+        return list(self._systems)
+
+    def system(self, agency: str) -> CarRentalSystem:
+        system = self._systems.get(agency)
+        if system is None:
+            raise ValueError(f"Agence inconnue : {agency!r}.")
+        return system
+
+    def systems(self) -> List[CarRentalSystem]:
+        return list(self._systems.values())
+
+    def _fan_out(self, call: Callable[[CarRentalSystem], T], agencies: Optional[List[str]] = None,
+                 parallel: bool = True) -> Dict[str, T]:
+        """
+        Appelle call sur le système de chaque agence (toutes, ou celles de agencies), sur le pool de threads ;
+        résultats par agence, dans l'ordre des agences. parallel=False pour les lectures d'index en
+        quelques microsecondes : le passage par le pool coûterait plus que les appels eux-mêmes.
+        """
+        systems = self._systems if agencies is None else {agency: self.system(agency) for agency in agencies}
+        if len(systems) == 1 or not parallel:
+            return {agency: call(system) for agency, system in systems.items()}
+        futures = {agency: self._executor.submit(call, system) for agency, system in systems.items()}
+        return {agency: future.result() for agency, future in futures.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for system in self._systems.values():
+            system.storage.close()
+
+    # --- Véhicules et clients ---
+
+    def agency_of_vehicle(self, vehicle_id: int) -> Optional[str]:
+        agency = self._vehicle_agency.get(vehicle_id)
+        if agency is not None and vehicle_id in self._systems[agency].vehicles:
+            return agency
+        found = [name for name, vehicle
+                 in self._fan_out(lambda system: system.find_vehicle(vehicle_id), parallel=False).items()
+                 if vehicle is not None]
+        if not found:
+            return None
+        with self._routing_lock:
+            self._vehicle_agency[vehicle_id] = found[0]
+        return found[0]
+
+    def find_vehicle(self, vehicle_id: int) -> Optional[Vehicle]:
+        agency = self.agency_of_vehicle(vehicle_id)
+        return self._systems[agency].find_vehicle(vehicle_id) if agency is not None else None
+
+    def get_all_vehicles(self) -> List[Vehicle]:
+        return [vehicle for vehicles in self._fan_out(lambda system: system.get_all_vehicles()).values()
+                for vehicle in vehicles]
+
+    def get_available_vehicles(self) -> List[Vehicle]:
+        return [vehicle for vehicles in self._fan_out(lambda system: system.get_available_vehicles()).values()
+                for vehicle in vehicles]
+
+    def find_available(self, start_date: datetime.date, end_date: datetime.date, category: Optional[str] = None,
+                       max_daily_rate: Optional[float] = None, customer_id: Optional[int] = None,
+                       limit: Optional[int] = None, agencies: Optional[List[str]] = None) -> List[Tuple[str, Vehicle]]:
+        """
+        Véhicules libres sur toute la période dans toutes les agences (ou celles de agencies),
+        [(agence, véhicule)] triés par tarif croissant. Mêmes filtres que CarRentalSystem.find_available ;
+        l'âge minimum est vérifié ici, le client pouvant ne pas être encore connu de l'agence du véhicule.
+        """
+        customer = None
+        if customer_id is not None:
+            customer = self.find_customer(customer_id)
+            if customer is None:
+                return []
+
+        def find(system: CarRentalSystem) -> List[Vehicle]:
+            # Agence qui connaît le client : elle filtre elle-même par âge et peut s'arrêter à limit
+            local = customer_id if customer is not None and system.find_customer(customer_id) is not None else None
+            return system.find_available(start_date, end_date, category, max_daily_rate, customer_id=local,
+                                         limit=limit if customer is None or local is not None else None)
+
+        per_agency = self._fan_out(find, agencies)
+        merged = heapq.merge(*([(agency, vehicle) for vehicle in vehicles] for agency, vehicles in per_agency.items()),
+                             key=lambda item: item[1].daily_rate)
+        available = []
+        for agency, vehicle in merged:
+            if customer is not None:
+                required_age = CarRentalSystem.MIN_AGE_BY_CATEGORY.get(vehicle.category)
+                if required_age is not None and customer.age < required_age:
+                    continue
+            available.append((agency, vehicle))
+            if limit is not None and len(available) >= limit:
+                break
+        return available
+
+    def find_customer(self, customer_id: int) -> Optional[Customer]:
+        """Le client dans la première agence qui le connaît (les agences visitées en ont une copie)."""
+        for system in self._systems.values():
+            customer = system.find_customer(customer_id)
+            if customer is not None:
+                return customer
+        return None
+
+    def _customer_systems(self, customer_id: int) -> List[CarRentalSystem]:
+        """Systèmes des agences qui connaissent le client (la sienne et celles où il a loué)."""
+        return [system for system in self._systems.values() if system.find_customer(customer_id) is not None]
+
+    def _check_customer_unique(self, driver_license_number: str, email: str, customer_id: Optional[int] = None):
+        """ValueError si le permis ou l'email appartient à un autre client, dans n'importe quelle agence."""
+        for system in self._systems.values():
+            system.check_customer_unique(driver_license_number, email, customer_id)
+
+    def add_customer(self, agency: str, first_name: str, last_name: str, age: int, driver_license_number: str,
+                     email: str) -> Customer:
+        """CarRentalSystem.add_customer dans l'agence choisie ; ValueError si le permis ou l'email est déjà pris."""
+        system = self.system(agency)
+        with self._customers_lock:
+            self._check_customer_unique(driver_license_number, email)
+            return system.add_customer(first_name, last_name, age, driver_license_number, email)
+
+    def import_customers(self, agency: str, records: Iterable[dict]) -> ImportReport:
+        """
+        CarRentalSystem.import_customers dans l'agence choisie. Une ligne dont le permis ou l'email appartient
+        à un client d'une autre agence est rejetée comme un doublon du fichier.
+        """
+        system = self.system(agency)
+        others = [other for other in self._systems.values() if other is not system]
+
+        def unique_in_network(records: Iterable[dict]) -> Iterator[dict]:
+            for record in records:
+                if isinstance(record, dict) and isinstance(record.get("driver_license_number"), str) \
+                        and isinstance(record.get("email"), str):
+                    try:
+                        for other in others:
+                            other.check_customer_unique(record["driver_license_number"].strip(),
+                                                        record["email"].strip())
+                    except ValueError as error:
+                        record = {"_error": str(error)}  # Rejetée par l'import, avec son numéro de ligne
+                yield record
+
+        with self._customers_lock:
+            return system.import_customers(unique_in_network(records))
+
+    def update_customer(self, customer_id: int, new_first_name: str, new_last_name: str, new_age: int,
+                        new_driver_license_number: str, new_email: str) -> bool:
+        """
+        Modifie le client dans toutes les agences qui le connaissent (copies comprises) : l'âge vérifié
+        à la location est le même partout. ValueError (client inchangé) si le permis ou l'email est pris.
+        """
+        with self._customers_lock:
+            systems = self._customer_systems(customer_id)
+            self._check_customer_unique(new_driver_license_number, new_email, customer_id)
+            results = [system.update_customer(customer_id, new_first_name, new_last_name, new_age,
+                                              new_driver_license_number, new_email) for system in systems]
+        return bool(results) and all(results)
+
+    def remove_customer(self, customer_id: int) -> bool:
+        """
+        Supprime le client de toutes les agences qui le connaissent ; refusé (False) s'il est inconnu
+        ou s'il a une location en cours dans l'une d'elles.
+        """
+        with self._customers_lock:
+            systems = self._customer_systems(customer_id)
+            if not systems or any(system.has_active_rentals(customer_id) for system in systems):
+                return False
+            results = [system.remove_customer(customer_id) for system in systems]
+        return all(results)
+
+    def get_all_customers(self) -> List[Customer]:
+        """Clients de toutes les agences, une fois chacun (les copies locales sont ignorées)."""
+        seen = set()
+        customers = []
+        for agency_customers in self._fan_out(lambda system: system.get_all_customers()).values():
+            for customer in agency_customers:
+                if customer.id not in seen:
+                    seen.add(customer.id)
+                    customers.append(customer)
+        return customers
+
+    def search_customers(self, query: str, limit: int = 50) -> Page:
+        """
+        Recherche à la frappe dans toutes les agences (voir CarRentalSystem.search_customers) : les
+        résultats des agences sont fusionnés, une fois par client, par ID croissant.
+        """
+        pages = self._fan_out(lambda system: system.search_customers(query, limit))
+        unique = {customer.id: customer for page in reversed(list(pages.values())) for customer in page.items}
+        ids = sorted(unique)
+        return Page([unique[customer_id] for customer_id in ids[:limit]], 0, limit, None,
+                    len(ids) > limit or any(page.has_more for page in pages.values()))
+
+    # --- Locations ---
+
+    def create_rental(self, customer_id: int, vehicle_id: int, start_date: datetime.date,
+                      end_date: datetime.date) -> Tuple[Optional[Rental], Optional[str]]:
+        """Crée la location dans l'agence du véhicule, en y enregistrant le client s'il vient d'ailleurs."""
+        agency = self.agency_of_vehicle(vehicle_id)
+        if agency is None:
+            return None, f"Erreur: Véhicule avec ID {vehicle_id} non trouvé."
+        system = self._systems[agency]
+        error = self._adopt_customer(system, customer_id)
+        if error is not None:
+            return None, error
+        return system.create_rental(customer_id, vehicle_id, start_date, end_date)
+
+    def book_category(self, agency: str, customer_id: int, category: str, start_date: datetime.date,
+                      end_date: datetime.date,
+                      max_daily_rate: Optional[float] = None) -> Tuple[Optional[Rental], Optional[str]]:
+        """CarRentalSystem.book_category dans l'agence choisie, pour un client de n'importe quelle agence."""
+        system = self.system(agency)
+        error = self._adopt_customer(system, customer_id)
+        if error is not None:
+            return None, error
+        return system.book_category(customer_id, category, start_date, end_date, max_daily_rate=max_daily_rate)
+
+    def _adopt_customer(self, system: CarRentalSystem, customer_id: int) -> Optional[str]:
+        """Enregistre le client dans system s'il vient d'une autre agence ; message d'erreur, ou None."""
+        if system.find_customer(customer_id) is not None:
+            return None
+        customer = self.find_customer(customer_id)
+        if customer is None:
+            return f"Erreur: Client avec ID {customer_id} non trouvé."
+        try:
+            system.adopt_customer(customer)
+        except ValueError as error:
+            return f"Erreur: {error}"
+        return None
+
+    def find_rental(self, rental_id: int) -> Optional[Rental]:
+        for rental in self._fan_out(lambda system: system.find_rental(rental_id)).values():
+            if rental is not None:
+                return rental
+        return None
+
+    def end_rental(self, rental_id: int, return_date: datetime.date) -> Optional[float]:
+        for system in self._systems.values():
+            if system.find_rental(rental_id) is not None:
+                return system.end_rental(rental_id, return_date)
+        print(f"Erreur: Location ID {rental_id} non trouvée.")
+        return None
+
+    def get_current_rentals(self) -> List[Rental]:
+        return [rental for rentals in self._fan_out(lambda system: system.get_current_rentals()).values()
+                for rental in rentals]
+
+    def get_customer_rental_history(self, customer_id: int) -> List[Rental]:
+        """Locations du client dans toutes les agences, dans l'ordre de création."""
+        histories = self._fan_out(lambda system: system.get_customer_rental_history(customer_id))
+        return list(heapq.merge(*histories.values(), key=lambda rental: rental.id))
+
+    # --- Chiffre d'affaires et statistiques ---
+
+    def calculate_total_revenue(self) -> float:
+        return sum(self._fan_out(lambda system: system.calculate_total_revenue(), parallel=False).values())
+
+    def revenue_between(self, start_date: datetime.date, end_date: datetime.date,
+                        category: Optional[str] = None) -> float:
+        return sum(self.revenue_by_agency(start_date, end_date, category).values())
+
+    def revenue_by_agency(self, start_date: datetime.date, end_date: datetime.date,
+                          category: Optional[str] = None) -> Dict[str, float]:
+        return self._fan_out(lambda system: system.revenue_between(start_date, end_date, category), parallel=False)
+
+    def revenue_by_month(self, start_date: datetime.date, end_date: datetime.date,
+                         category: Optional[str] = None) -> List[Tuple[datetime.date, float]]:
+        per_agency = self._fan_out(lambda system: system.revenue_by_month(start_date, end_date, category),
+                                   parallel=False)
+        # Mêmes mois dans le même ordre pour toutes les agences : somme terme à terme
+        return [(months[0][0], sum(revenue for _, revenue in months)) for months in zip(*per_agency.values())]
+
+    def get_revenue_bounds(self) -> Optional[Tuple[datetime.date, datetime.date]]:
+        bounds = [bound for bound in self._fan_out(lambda system: system.get_revenue_bounds(), parallel=False).values()
+                  if bound is not None]
+        if not bounds:
+            return None
+        return min(first for first, _ in bounds), max(last for _, last in bounds)
+
+    def get_revenue_categories(self) -> List[str]:
+        per_agency = self._fan_out(lambda system: system.get_revenue_categories(), parallel=False)
+        return sorted({category for categories in per_agency.values() for category in categories})
+
+    def get_rental_statistics(self) -> Dict[str, object]:
+        """Statistiques de CarRentalSystem.get_rental_statistics, additionnées sur toutes les agences."""
+        totals: Dict[str, object] = {}
+        for stats in self._fan_out(lambda system: system.get_rental_statistics(), parallel=False).values():
+            for key, value in stats.items():
+                if isinstance(value, dict):
+                    merged = totals.setdefault(key, {})
+                    for category, amount in value.items():
+                        merged[category] = merged.get(category, 0.0) + amount
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+
+    # --- Rapports ---
+
+    def get_projection(self, name: str):
+        """
+        Projection de CarRentalSystem.get_projection pour tout le réseau : les tableaux des agences mis
+        bout à bout avec une colonne « Agence », les sélecteurs fusionnés. Reconstruite seulement si une
+        agence a changé ; le résultat est partagé et ne doit pas être modifié.
+        """
+        versions = tuple(tuple(versions.values())
+                         for versions in self._fan_out(lambda system: system.get_versions(), parallel=False).values())
+        cached = self._projections.get(name)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        per_agency = self._fan_out(lambda system: system.get_projection(name))
+        if all(isinstance(projection, dict) for projection in per_agency.values()):
+            projection = {label: value for labels in per_agency.values() for label, value in labels.items()}
+        else:
+            projection = [{AGENCY_COLUMN: agency, **row} for agency, rows in per_agency.items() for row in rows]
+        self._projections[name] = (versions, projection)
+        return projection
+
+    def rental_columns(self, agency: Optional[str] = None) -> "RentalColumns":
+        """
+        Projection en colonnes NumPy (core.analytics) d'une agence ou de tout le réseau (None). Chaque
+        agence garde la sienne, reconstruite seulement quand ses locations changent ; celles du réseau
+        sont construites sur le pool de threads puis mises bout à bout.
+        """
+        from core.analytics import RentalAnalytics, RentalColumns  # NumPy, seulement pour les rapports
+
+        agencies = self.agencies() if agency is None else [agency]
+        with self._routing_lock:
+            for name in agencies:
+                if name not in self._analytics:
+                    self._analytics[name] = RentalAnalytics(self.system(name))
+        if len(agencies) == 1:
+            return self._analytics[agencies[0]].columns()
+        futures = [self._executor.submit(self._analytics[name].columns) for name in agencies]
+        return RentalColumns.concatenate([future.result() for future in futures])
+
+    def get_free_vehicle_counts(self, start_date: Optional[datetime.date] = None,
+                                days: int = OCCUPANCY_DAYS) -> Dict[str, List[int]]:
+        totals: Dict[str, List[int]] = {}
+        for counts in self._fan_out(lambda system: system.get_free_vehicle_counts(start_date, days)).values():
+            for category, free in counts.items():
+                current = totals.get(category)
+                totals[category] = free if current is None else [a + b for a, b in zip(current, free)]
+        return totals
+
+    def get_vehicle_utilization(self, start_date: Optional[datetime.date] = None,
+                                days: int = OCCUPANCY_DAYS) -> List[Tuple[Vehicle, float]]:
+        per_agency = self._fan_out(lambda system: system.get_vehicle_utilization(start_date, days))
+        return list(heapq.merge(*per_agency.values(), key=lambda item: -item[1]))
+
+    def get_occupancy_heatmap(self, start_date: Optional[datetime.date] = None,
+                              days: int = OCCUPANCY_DAYS) -> List[Dict[str, object]]:
+        """Carte de chaleur de CarRentalSystem.get_occupancy_heatmap, véhicules libres et flottes additionnés."""
+        merged: Dict[Tuple[datetime.date, str], Dict[str, object]] = {}
+        for rows in self._fan_out(lambda system: system.get_occupancy_heatmap(start_date, days)).values():
+            for row in rows:
+                total = merged.get((row["Jour"], row["Catégorie"]))
+                if total is None:
+                    merged[(row["Jour"], row["Catégorie"])] = dict(row)
+                else:
+                    total["Libres"] += row["Libres"]
+                    total["Flotte"] += row["Flotte"]
+        for row in merged.values():
+            size = row["Flotte"]
+            row["Occupation (%)"] = round(100.0 * (size - row["Libres"]) / size, 1) if size else 0.0
+        return sorted(merged.values(), key=lambda row: (row["Catégorie"], row["Jour"]))
+
+    def reoptimize_category_bookings(self, category: Optional[str] = None,
+                                     after: Optional[datetime.date] = None) -> Dict[str, int]:
+        """Réoptimisation de chaque agence (les véhicules ne changent pas d'agence), résumés additionnés."""
+        totals: Dict[str, int] = {}
+        for summary in self._fan_out(lambda system: system.reoptimize_category_bookings(category, after)).values():
+            for key, value in summary.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
@@ -0,0 +1,268 @@
+import datetime
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from models.rental import Rental
+
+if TYPE_CHECKING:
+    from core.car_rental_system import CarRentalSystem
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+NO_DATE = -1  # Ordinal utilisé quand la date de retour effective est inconnue
+VALUE_FIELDS = ("start_ordinal", "end_ordinal", "return_ordinal", "daily_rate", "final_billed_amount", "penalty_amount")
+
+
+class RentalColumns:
+    """
+    Projection en colonnes NumPy des locations : une entrée par location, dans l'ordre de get_all_rentals.
+    Les catégories et statuts sont codés en entiers (index dans category_names / status_names).
+    """
+
+    def __init__(self, rentals: List[Rental]):
+        category_codes: Dict[str, int] = {}
+        status_codes: Dict[str, int] = {}
+        count = len(rentals)
+        self.start_ordinal = np.fromiter((r.start_date.toordinal() for r in rentals), dtype=np.int32, count=count)
+        self.end_ordinal = np.fromiter((r.end_date.toordinal() for r in rentals), dtype=np.int32, count=count)
+        self.return_ordinal = np.fromiter(
+            (r.actual_return_date.toordinal() if r.actual_return_date is not None else NO_DATE for r in rentals),
+            dtype=np.int32, count=count)
+        self.daily_rate = np.fromiter((r.vehicle.daily_rate for r in rentals), dtype=np.float64, count=count)
+        self.final_billed_amount = np.fromiter(
+            (r.final_billed_amount if r.final_billed_amount is not None else np.nan for r in rentals),
+            dtype=np.float64, count=count)
+        self.penalty_amount = np.fromiter((r.penalty_amount for r in rentals), dtype=np.float64, count=count)
+        self.category_code = np.fromiter(
+            (category_codes.setdefault(r.vehicle.category, len(category_codes)) for r in rentals), dtype=np.int32, count=count)
+        self.status_code = np.fromiter(
+            (status_codes.setdefault(r.status, len(status_codes)) for r in rentals), dtype=np.int32, count=count)
+        self.category_names = list(category_codes)
+        self.status_names = list(status_codes)
+
+    @classmethod
+    def concatenate(cls, parts: List["RentalColumns"]) -> "RentalColumns":
+        """
+        Met bout à bout les projections de plusieurs systèmes (une par agence) : les codes de catégorie
+        et de statut de chaque partie sont renumérotés dans des noms communs. parts n'est pas vide.
+        """
+        columns = cls.__new__(cls)
+        columns.category_names, category_codes = cls._merged_codes([part.category_names for part in parts])
+        columns.status_names, status_codes = cls._merged_codes([part.status_names for part in parts])
+        for field in VALUE_FIELDS:
+            setattr(columns, field, np.concatenate([getattr(part, field) for part in parts]))
+        columns.category_code = np.concatenate([codes[part.category_code] for codes, part in zip(category_codes, parts)])
+        columns.status_code = np.concatenate([codes[part.status_code] for codes, part in zip(status_codes, parts)])
+        return columns
+
+    @staticmethod
+    def _merged_codes(name_lists: List[List[str]]):
+        """Noms communs, et pour chaque liste le tableau ancien code -> nouveau code."""
+        merged: Dict[str, int] = {}
+        mappings = [np.array([merged.setdefault(name, len(merged)) for name in names], dtype=np.int32)
+                    for names in name_lists]
+        return list(merged), mappings
+
+    def __len__(self) -> int:
+        return len(self.start_ordinal)
+
+    def status_mask(self, status: str) -> np.ndarray:
+        if status not in self.status_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.status_code == self.status_names.index(status)
+
+    def billed_mask(self) -> np.ndarray:
+        """Locations prises en compte dans le chiffre d'affaires : terminées et facturées."""
+        return self.status_mask("completed") & ~np.isnan(self.final_billed_amount)
+
+
+def _ordinals_to_months(ordinals: np.ndarray) -> np.ndarray:
+    return (ordinals - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+
+
+def revenue_by_month_and_category(columns: RentalColumns) -> List[Dict[str, object]]:
+    """Chiffre d'affaires par mois de retour effectif et par catégorie (locations terminées et facturées)."""
+    mask = columns.billed_mask()
+    if not mask.any():
+        return []
+    months = _ordinals_to_months(columns.return_ordinal[mask])
+    categories = columns.category_code[mask]
+    month_keys, month_index = np.unique(months, return_inverse=True)
+    group = month_index * len(columns.category_names) + categories
+    size = len(month_keys) * len(columns.category_names)
+    revenue = np.bincount(group, weights=columns.final_billed_amount[mask], minlength=size)
+    counts = np.bincount(group, minlength=size)
+    rows = []
+    for key in np.flatnonzero(counts):
+        month, category = divmod(int(key), len(columns.category_names))
+        rows.append({
+            "Mois": str(month_keys[month]),
+            "Catégorie": columns.category_names[category],
+            "Locations": int(counts[key]),
+            "Chiffre d'affaires": float(revenue[key]),
+        })
+    return rows
+
+
+def summary_by_category(columns: RentalColumns) -> List[Dict[str, object]]:
+    """
+    Par catégorie : nombre de locations, durée moyenne prévue, durée moyenne effective,
+    taux de retours en retard et part des pénalités dans le montant facturé.
+    """
+    if not len(columns):
+        return []
+    size = len(columns.category_names)
+    planned_days = (columns.end_ordinal - columns.start_ordinal + 1).astype(np.float64)
+    billed = columns.billed_mask()
+    returned = columns.status_mask("completed") & (columns.return_ordinal != NO_DATE)
+    effective_days = (columns.return_ordinal - columns.start_ordinal + 1).astype(np.float64)
+    late = returned & (columns.return_ordinal > columns.end_ordinal)
+
+    count = np.bincount(columns.category_code, minlength=size)
+    planned_sum = np.bincount(columns.category_code, weights=planned_days, minlength=size)
+    returned_count = np.bincount(columns.category_code[returned], minlength=size)
+    effective_sum = np.bincount(columns.category_code[returned], weights=effective_days[returned], minlength=size)
+    late_count = np.bincount(columns.category_code[late], minlength=size)
+    billed_sum = np.bincount(columns.category_code[billed], weights=columns.final_billed_amount[billed], minlength=size)
+    penalty_sum = np.bincount(columns.category_code[billed], weights=columns.penalty_amount[billed], minlength=size)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_planned = planned_sum / count
+        average_effective = effective_sum / returned_count
+        late_rate = late_count / returned_count
+        penalty_share = penalty_sum / billed_sum
+
+    rows = []
+    for code, category in enumerate(columns.category_names):
+        rows.append({
+            "Catégorie": category,
+            "Locations": int(count[code]),
+            "Durée moyenne prévue (j)": _rounded(average_planned[code]),
+            "Durée moyenne effective (j)": _rounded(average_effective[code]),
+            "Taux de retard (%)": _rounded(late_rate[code] * 100),
+            "Part des pénalités (%)": _rounded(penalty_share[code] * 100),
+        })
+    return rows
+
+
+def global_indicators(columns: RentalColumns) -> Dict[str, Optional[float]]:
+    """Indicateurs globaux : durée moyenne, taux de retard et part des pénalités sur toutes les locations."""
+    billed = columns.billed_mask()
+    returned = columns.status_mask("completed") & (columns.return_ordinal != NO_DATE)
+    billed_total = columns.final_billed_amount[billed].sum()
+    return {
+        "average_duration": _rounded((columns.end_ordinal - columns.start_ordinal + 1).mean()) if len(columns) else None,
+        "late_rate": _rounded((columns.return_ordinal[returned] > columns.end_ordinal[returned]).mean() * 100)
+        if returned.any() else None,
+        "penalty_share": _rounded(columns.penalty_amount[billed].sum() / billed_total * 100) if billed_total else None,
+    }
+
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+class RentalAnalytics:
+    """
+    Rapports vectorisés sur les locations d'un système.
+    La projection en colonnes suit les locations (get_rentals_version) sans être reconstruite : les nouvelles
+    locations sont ajoutées en fin de colonnes, celles signalées par add_rental_listener sont relues.
+    """
+
+    def __init__(self, system: "CarRentalSystem"):
+        self.system = system
+        self._columns: Optional[RentalColumns] = None  # Tableaux avec de la réserve : seules les _size premières lignes comptent
+        self._ids: Optional[np.ndarray] = None  # ID de la location de chaque ligne
+        self._size = 0
+        self._version: Optional[int] = None
+        self._view: Optional[RentalColumns] = None
+        self._changed: Dict[int, Rental] = {}  # Locations modifiées depuis la dernière mise à jour, par ID
+        self._changed_lock = threading.Lock()
+        self._lock = threading.Lock()  # Une seule mise à jour des colonnes à la fois
+        system.add_rental_listener(self._on_rental_change)
+
+    def _on_rental_change(self, rental: Rental, old_status: str, new_status: str):
+        with self._changed_lock:
+            self._changed[rental.id] = rental
+
+    def columns(self) -> RentalColumns:
+        """
+        Projection à jour. Les lignes modifiées sont corrigées en place : une projection retournée plus tôt
+        voit l'état courant de ses locations, mais pas les locations ajoutées depuis.
+        """
+        with self._lock:
+            version = self.system.get_rentals_version()
+            if self._view is None or self._version != version:
+                # Version lue avant la lecture des locations : un changement concurrent sera repris au prochain appel
+                with self._changed_lock:
+                    changed, self._changed = self._changed, {}
+                self._append(self.system.get_all_rentals(self._size))
+                self._patch(list(changed.values()))
+                self._version = version
+                self._view = self._sliced()
+            return self._view
+
+    def _append(self, rentals: List[Rental]):
+        if not rentals and self._columns is not None:
+            return
+        part = RentalColumns(rentals)
+        ids = np.fromiter((r.id for r in rentals), dtype=np.int64, count=len(rentals))
+        if self._columns is None:
+            self._columns, self._ids, self._size = part, ids, len(part)
+            return
+        size = self._size + len(part)
+        if size > len(self._ids):
+            capacity = max(size, 2 * len(self._ids))  # Réserve doublée : ajouts en temps amorti constant
+            for field in VALUE_FIELDS + ("category_code", "status_code"):
+                setattr(self._columns, field, self._grown(getattr(self._columns, field), capacity))
+            self._ids = self._grown(self._ids, capacity)
+        self._write(slice(self._size, size), part)
+        self._ids[self._size:size] = ids
+        self._size = size
+
+    def _patch(self, rentals: List[Rental]):
+        """Relit les lignes des locations modifiées."""
+        if not rentals or not self._size:
+            return
+        ids = np.fromiter((r.id for r in rentals), dtype=np.int64, count=len(rentals))
+        known = self._ids[:self._size]
+        rows = np.searchsorted(known, ids).clip(0, self._size - 1)
+        for position in np.flatnonzero(known[rows] != ids):
+            # IDs pas tout à fait croissants (créations concurrentes) : recherche directe
+            found = np.flatnonzero(known == ids[position])
+            rows[position] = found[0] if len(found) else -1
+        present = rows >= 0
+        rentals = [rental for rental, keep in zip(rentals, present) if keep]
+        if rentals:
+            self._write(rows[present], RentalColumns(rentals))
+
+    def _write(self, rows, part: RentalColumns):
+        """Copie part dans les lignes rows, en renumérotant ses catégories et statuts dans les noms existants."""
+        columns = self._columns
+        for field in VALUE_FIELDS:
+            getattr(columns, field)[rows] = getattr(part, field)
+        columns.category_code[rows] = self._codes(columns.category_names, part.category_names)[part.category_code]
+        columns.status_code[rows] = self._codes(columns.status_names, part.status_names)[part.status_code]
+
+    @staticmethod
+    def _codes(names: List[str], part_names: List[str]) -> np.ndarray:
+        """Tableau code de la partie -> code dans names ; les noms inconnus sont ajoutés à names."""
+        for name in part_names:
+            if name not in names:
+                names.append(name)
+        return np.array([names.index(name) for name in part_names], dtype=np.int32)
+
+    @staticmethod
+    def _grown(array: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.empty(capacity, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _sliced(self) -> RentalColumns:
+        view = RentalColumns.__new__(RentalColumns)
+        for field in VALUE_FIELDS + ("category_code", "status_code"):
+            setattr(view, field, getattr(self._columns, field)[:self._size])
+        view.category_names = list(self._columns.category_names)
+        view.status_names = list(self._columns.status_names)
+        return view
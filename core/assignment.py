@@ -0,0 +1,83 @@
+import bisect
+import heapq
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+NO_BOOKING = 0  # « Libre depuis » d'un véhicule sans réservation : avant toute date (ordinaux >= 1)
+
+
+def assign_bookings(requests: List[Tuple[int, int, int, int]], vehicles: List[int],
+                    fixed: Dict[int, List[Tuple[int, int]]]) -> Optional[Dict[int, int]]:
+    """
+    Réattribue des réservations à des véhicules interchangeables (même catégorie, même tarif).
+
+    requests : [(id, début, fin, véhicule actuel)], dates en ordinaux ; fixed : réservations (début, fin)
+    qui ne bougent pas, par véhicule. Deux périodes se chevauchent avec la règle de create_rental
+    (début1 < fin2 et fin1 > début2).
+
+    Les réservations sont placées par date de début croissante, chacune sur le véhicule libre depuis le
+    plus tard (meilleur ajustement : le plus petit trou avant elle), à condition que la prochaine
+    réservation fixe du véhicule ne commence pas avant sa fin. Les véhicules déjà occupés sont ainsi
+    remplis avant ceux qui sont vides. À égalité, le véhicule actuel est gardé.
+    Les véhicules sont tenus dans une liste triée par « libre depuis » (recherche par dichotomie) ; les
+    réservations fixes sont prises dans un tas par date de début, au fil des dates.
+
+    Retourne {id: véhicule}, ou None si une réservation ne trouve plus de place.
+    """
+    free_from: Dict[int, int] = {vehicle_id: NO_BOOKING for vehicle_id in vehicles}
+    slots = sorted((NO_BOOKING, vehicle_id) for vehicle_id in vehicles)  # (libre depuis, véhicule), trié
+    upcoming: Dict[int, Deque[int]] = {vehicle_id: deque() for vehicle_id in vehicles}  # Débuts des réservations fixes
+    events = []
+    for vehicle_id, periods in fixed.items():
+        for start, end in sorted(periods):
+            upcoming[vehicle_id].append(start)
+            events.append((start, end, vehicle_id))
+    heapq.heapify(events)
+
+    def move_slot(vehicle_id: int, new_free_from: int):
+        del slots[bisect.bisect_left(slots, (free_from[vehicle_id], vehicle_id))]
+        free_from[vehicle_id] = new_free_from
+        bisect.insort(slots, (new_free_from, vehicle_id))
+
+    def fits(vehicle_id: int, end: int) -> bool:
+        next_fixed = upcoming[vehicle_id]
+        return not next_fixed or next_fixed[0] >= end
+
+    assignment: Dict[int, int] = {}
+    for request_id, start, end, current in sorted(requests, key=lambda request: (request[1], request[2], request[0])):
+        # Réservations fixes commencées à cette date : le véhicule n'est libre qu'après leur fin
+        while events and events[0][0] <= start:
+            _, fixed_end, vehicle_id = heapq.heappop(events)
+            upcoming[vehicle_id].popleft()
+            if fixed_end > free_from[vehicle_id]:
+                move_slot(vehicle_id, fixed_end)
+
+        pos = bisect.bisect_right(slots, (start, float("inf"))) - 1
+        while pos >= 0 and not fits(slots[pos][1], end):
+            pos -= 1
+        if pos < 0:
+            return None
+        best_free_from, chosen = slots[pos]
+        if current != chosen and free_from.get(current) == best_free_from and fits(current, end):
+            chosen = current
+        assignment[request_id] = chosen
+        move_slot(chosen, max(end, best_free_from))
+    return assignment
+
+
+def packing_score(requests: List[Tuple[int, int, int, int]], assignment: Dict[int, int],
+                  fixed: Dict[int, List[Tuple[int, int]]]) -> Tuple[int, int]:
+    """
+    Qualité d'une attribution des réservations de requests (même format que assign_bookings), plus petite
+    = meilleure : (véhicules qui portent au moins une de ces réservations, jours libres entre deux
+    réservations consécutives de ces véhicules, réservations fixes comprises).
+    L'attribution actuelle s'évalue avec {id: véhicule actuel}.
+    """
+    periods: Dict[int, List[Tuple[int, int]]] = {}
+    for request_id, start, end, _ in requests:
+        periods.setdefault(assignment[request_id], []).append((start, end))
+    gaps = 0
+    for vehicle_id, booked in periods.items():
+        booked = sorted(booked + fixed.get(vehicle_id, []))
+        gaps += sum(max(0, start - previous_end) for (_, previous_end), (start, _) in zip(booked, booked[1:]))
+    return len(periods), gaps
@@ -0,0 +1,138 @@
+import bisect
+import datetime
+from typing import List, Optional, Tuple
+
+from models.rental import Rental
+
+
+class BookingIndex:
+    """
+    Index trié des réservations d'un seul véhicule.
+
+    Les intervalles (début, fin) ne se chevauchent jamais : create_rental refuse
+    tout chevauchement avant d'insérer. Triés par (début, fin), les dates de fin
+    sont donc elles aussi croissantes, ce qui permet de tester un chevauchement
+    avec une seule recherche dichotomique (O(log k) pour k réservations).
+
+    Les écritures se font sous le verrou du véhicule, les lectures sans verrou :
+    un ajout en fin de liste est atomique, toute autre modification remplace la liste
+    par une copie modifiée, si bien qu'un lecteur voit toujours une liste cohérente.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[datetime.date, datetime.date, int, Rental]] = []  # (début, fin, id, location)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def find_overlap(self, start_date: datetime.date, end_date: datetime.date) -> Optional[Rental]:
+        """
+        Retourne une location qui chevauche la période [start_date, end_date], ou None.
+        Même condition que l'ancienne boucle de create_rental :
+        (Début Nouvelle < Fin Existante) ET (Fin Nouvelle > Début Existante)
+        """
+        # Dernier intervalle dont le début est strictement avant la fin demandée :
+        # c'est aussi celui dont la fin est la plus tardive parmi les candidats.
+        keys = self._keys
+        pos = bisect.bisect_left(keys, (end_date,)) - 1
+        if pos >= 0:
+            existing_start, existing_end, _, rental = keys[pos]
+            if start_date < existing_end:
+                return rental
+        return None
+
+    def gap_around(self, start_date: datetime.date, end_date: datetime.date
+                   ) -> Optional[Tuple[Optional[datetime.date], Optional[datetime.date]]]:
+        """
+        Trou du calendrier qui accueillerait la période [start_date, end_date] : (fin de la réservation
+        précédente, début de la suivante), None de chaque côté s'il n'y en a pas.
+        Retourne None si la période chevauche une réservation (même règle que find_overlap).
+        """
+        keys = self._keys
+        pos = bisect.bisect_left(keys, (end_date,))  # Première réservation qui commence à end_date ou après
+        previous_end = None
+        if pos > 0:
+            previous_end = keys[pos - 1][1]
+            if start_date < previous_end:
+                return None
+        return previous_end, keys[pos][0] if pos < len(keys) else None
+
+    def find_overlaps(self, periods: List[Tuple[datetime.date, datetime.date]]) -> List[Optional[Rental]]:
+        """
+        Version par balayage de find_overlap pour des périodes triées par date de début.
+        Le premier intervalle qui finit après le début demandé ne fait qu'avancer d'une période
+        à la suivante : un seul parcours suffit après une recherche dichotomique initiale.
+        """
+        keys = self._keys
+        if not periods or not keys:
+            return [None] * len(periods)
+        results: List[Optional[Rental]] = []
+        # Premier intervalle dont la fin est strictement après le premier début demandé
+        pos = bisect.bisect_right(keys, periods[0][0], key=lambda key: key[1])
+        for start_date, end_date in periods:
+            while pos < len(keys) and keys[pos][1] <= start_date:
+                pos += 1
+            if pos < len(keys) and keys[pos][0] < end_date:
+                results.append(keys[pos][3])
+            else:
+                results.append(None)
+        return results
+
+    def add(self, rental: Rental, end_date: Optional[datetime.date] = None):
+        """Ajoute une réservation. end_date permet d'indexer une fin différente de rental.end_date."""
+        key = (rental.start_date, end_date if end_date is not None else rental.end_date, rental.id, rental)
+        pos = bisect.bisect_left(self._keys, key[:3])
+        if pos == len(self._keys):
+            self._keys.append(key)  # Cas courant (dates croissantes, rechargement)
+        else:
+            self._keys = self._keys[:pos] + [key] + self._keys[pos:]
+
+    def add_many(self, entries: List[Tuple[Rental, datetime.date]]):
+        """Ajoute des réservations (location, fin indexée) d'un coup : un seul tri au lieu d'une insertion chacune."""
+        keys = self._keys + [(rental.start_date, end_date, rental.id, rental) for rental, end_date in entries]
+        keys.sort(key=lambda key: key[:3])
+        self._keys = keys
+
+    def remove(self, rental: Rental) -> bool:
+        """Retire la réservation de l'index (annulation). Retourne False si elle n'y était pas."""
+        keys = self._keys
+        pos = bisect.bisect_left(keys, (rental.start_date,))
+        while pos < len(keys) and keys[pos][0] == rental.start_date:
+            if keys[pos][2] == rental.id:
+                self._keys = keys[:pos] + keys[pos + 1:]
+                return True
+            pos += 1
+        return False
+
+    def shorten(self, rental: Rental, new_end_date: datetime.date):
+        """
+        Ramène la fin indexée d'une réservation à new_end_date (retour anticipé).
+        Une réservation ne peut être que raccourcie : l'index reste sans chevauchement.
+        """
+        if self.remove(rental):
+            self.add(rental, new_end_date)
+
+    def periods_between(self, first_day: datetime.date, last_day: datetime.date, with_ids: bool = False) -> list:
+        """
+        Périodes (début, fin indexée) des réservations qui touchent un jour de [first_day, last_day] ;
+        (début, fin, ID de la location) avec with_ids=True.
+        """
+        keys = self._keys
+        # Les fins sont croissantes, comme les débuts : première réservation qui finit le first_day ou après
+        pos = bisect.bisect_left(keys, first_day, key=lambda key: key[1])
+        periods = []
+        while pos < len(keys) and keys[pos][0] <= last_day:
+            periods.append(keys[pos][:3] if with_ids else keys[pos][:2])
+            pos += 1
+        return periods
+
+    def rentals(self) -> List[Rental]:
+        """Retourne les réservations du véhicule triées par date de début."""
+        return [rental for _, _, _, rental in self._keys]
+
+
+def booked_end_date(rental: Rental) -> datetime.date:
+    """Fin de la période bloquée par une location : la fin prévue, ou le retour effectif s'il est anticipé."""
+    if rental.actual_return_date is not None and rental.actual_return_date < rental.end_date:
+        return rental.actual_return_date
+    return rental.end_date
@@ -1,12 +1,78 @@
+import bisect
 import datetime
-from typing import List, Dict, Optional, Tuple
+import sys
+import threading
+from typing import Iterable, List, Dict, NamedTuple, Optional, Set, Tuple
 from models.vehicle import Vehicle, Car, Truck, Motorcycle
 from models.customer import Customer
-from models.rental import Rental
+from models.rental import Rental, StatusListener
+from core.booking_index import BookingIndex, booked_end_date
+from core.assignment import assign_bookings, packing_score
+from core.storage import RentalStorage, StoredState
+from core.vehicle_index import RateIndex
+from core.rental_registry import RentalRegistry
+from core.rental_stats import RentalStats
+from core.importers import ImportReport, build_customer, build_vehicle, chunked, validated
+from core.locks import KeyedLocks, RWLock
+from core.catalog_index import CatalogIndex, Page
+from core.projections import ProjectionCache
+from core.search_index import PrefixIndex, UniqueConstraints, compact, fold, name_terms, words
+
+# Champs triables des listes paginées (list_vehicles, list_customers) ; les textes sont comparés sans casse
+VEHICLE_SORT_KEYS = {
+    "id": lambda v: v.id,
+    "brand": lambda v: (v.brand.casefold(), v.model.casefold()),
+    "license_plate": lambda v: v.license_plate.casefold(),
+    "daily_rate": lambda v: v.daily_rate,
+    "category": lambda v: v.category.casefold(),
+    "state": lambda v: v.state.casefold(),
+}
+CUSTOMER_SORT_KEYS = {
+    "id": lambda c: c.id,
+    "last_name": lambda c: (c.last_name.casefold(), c.first_name.casefold()),
+    "first_name": lambda c: (c.first_name.casefold(), c.last_name.casefold()),
+    "age": lambda c: c.age,
+    "email": lambda c: c.email.casefold(),
+}
+
+# Fenêtre par défaut du calendrier d'occupation (jours à partir d'aujourd'hui)
+OCCUPANCY_DAYS = 90
+
+# Valeurs qui ne peuvent appartenir qu'à un seul véhicule / client : champ -> (libellé, normalisation)
+VEHICLE_UNIQUE_FIELDS = {
+    "license_plate": ("la plaque d'immatriculation", compact),  # « AB-123-CD » et « ab 123 cd » sont la même plaque
+}
+CUSTOMER_UNIQUE_FIELDS = {
+    "driver_license_number": ("le numéro de permis", compact),
+    "email": ("l'email", lambda email: fold(email.strip())),
+}
+
+
+def vehicle_terms(vehicle: Vehicle) -> List[str]:
+    """Termes de la recherche à la frappe des véhicules : marque, modèle et plaque (par morceaux ou entière)."""
+    plate = words(vehicle.license_plate)
+    return name_terms(vehicle.brand) + name_terms(vehicle.model) + plate + ["".join(plate)]
+
+
+def customer_terms(customer: Customer) -> List[str]:
+    """Termes de la recherche à la frappe des clients : prénom, nom, email et numéro de permis."""
+    return (name_terms(customer.first_name) + name_terms(customer.last_name)
+            + [compact(customer.email), compact(customer.driver_license_number)])
+
+
+class ReturnResult(NamedTuple):
+    """Résultat d'un retour traité par end_rentals_batch."""
+    rental_id: int
+    final_cost: Optional[float]  # Coût final facturé (pénalité incluse) ; None si le retour est refusé
+    penalty: float
+    error: Optional[str]  # Message d'erreur (mêmes cas que end_rental), None si la location est terminée
+
 
 class CarRentalSystem:
     
     #Classe centrale pour gérer le système de location de voitures.
+    # Une même instance peut être partagée entre plusieurs threads (sessions Streamlit).
+    # Ordre de prise des verrous : véhicules, puis catalogue, puis index des locations.
     # Définition des règles d'âge minimum par catégorie de véhicule
     MIN_AGE_BY_CATEGORY = {
         "Véhicule": 18,
@@ -15,57 +81,311 @@ class CarRentalSystem:
         "Bus": 25
     }
 
-    def __init__(self):
+    def __init__(self, storage: Optional[RentalStorage] = None):
         self.vehicles: Dict[int, Vehicle] = {}
         self.customers: Dict[int, Customer] = {}
         self.rentals: List[Rental] = []
+        self._bookings: Dict[int, BookingIndex] = {}  # Index des réservations par ID de véhicule
+        self._category_bookings: Set[int] = set()  # Locations réservées par catégorie (book_category), réattribuables
+        self._occupancy = None  # Calendrier d'occupation (OccupancyCalendar), construit à la première demande
+        self._occupancy_vehicles_version = None  # Version des véhicules lors de sa construction
+        # Changements de réservation notés pour chaque calendrier en construction hors verrou (_occupancy_calendar)
+        self._occupancy_changes: Dict[int, List[Tuple[int, datetime.date, datetime.date, int]]] = {}
+        self._registry = RentalRegistry()  # Index des locations par ID, client, véhicule et actives
+        self._stats = RentalStats()  # Agrégats (chiffre d'affaires, compteurs par statut...) tenus à jour
+        self._rate_index = RateIndex()  # Véhicules triés par tarif, par catégorie
+        self._vehicle_index = CatalogIndex(VEHICLE_SORT_KEYS, partition="category")  # Listes paginées
+        self._customer_index = CatalogIndex(CUSTOMER_SORT_KEYS)
+        self._vehicle_unique = UniqueConstraints(VEHICLE_UNIQUE_FIELDS)  # Plaques déjà attribuées
+        self._customer_unique = UniqueConstraints(CUSTOMER_UNIQUE_FIELDS)  # Permis et emails déjà attribués
+        self._vehicle_search = PrefixIndex(vehicle_terms)  # Recherche à la frappe
+        self._customer_search = PrefixIndex(customer_terms)
+        self._rentals_version = 0  # Incrémenté à chaque location ajoutée ou changement de statut
+        self._vehicles_version = 0  # Incrémenté à chaque véhicule ajouté, modifié ou supprimé
+        self._customers_version = 0  # Idem pour les clients
+        self._projections = ProjectionCache(self)  # Tableaux prêts à afficher, reconstruits selon les versions
+        self._rental_status_listener = self._on_rental_status_change
+        self._rental_listeners: Tuple[StatusListener, ...] = ()  # Abonnés aux changements de toutes les locations
+        self._vehicle_locks = KeyedLocks()  # Réservations et retours : seul le véhicule concerné est verrouillé
+        self._catalog_lock = RWLock()  # Véhicules et clients : listes en parallèle, modifications exclusives
+        self._index_lock = threading.RLock()  # Index partagés des locations (IDs, registre, agrégats) : sections courtes
+
+        # Sans stockage explicite, tout reste en mémoire (RentalStorage ne fait rien).
+        # Avec un stockage persistant (ex. SqliteStorage), l'état est rechargé puis chaque mutation y est écrite.
+        self.storage = storage if storage is not None else RentalStorage()
+        self._history_loaded = not self.storage.lazy_history
+        state = self.storage.load()
+        if state is not None:
+            self._restore_state(state)
+        self.storage.attach(self)
+
+    def _restore_state(self, state: StoredState):
+        self._register_vehicles(state.vehicles)
+        self._register_customers(state.customers)
+        self._index_rentals(state.rentals, counted=state.stats is not None)
+        if state.stats is not None:
+            self._stats.seed(**state.stats)
+        self._category_bookings.update(state.category_bookings)
 
     # --- Méthodes pour les véhicules ---
 
     def add_vehicle(self, brand: str, model: str, license_plate: str, daily_rate: float, category: str, state: str) -> Vehicle:
         # Assurez-vous que la classe Vehicle gère la génération d'un ID unique
         vehicle = Vehicle(brand, model, license_plate, daily_rate, category, state)
-        self.vehicles[vehicle.id] = vehicle
+        with self._catalog_lock.write():
+            self._vehicle_unique.check_item(vehicle)  # ValueError si la plaque est déjà attribuée
+            self._register_vehicle(vehicle)
+        self.storage.save_vehicle(vehicle)
         return vehicle
 
+    def _register_vehicle(self, vehicle: Vehicle):
+        self._register_vehicles((vehicle,))
+
+    def _register_vehicles(self, vehicles: Iterable[Vehicle]):
+        """Enregistre un lot de véhicules ; les index sont mis à jour une fois pour tout le lot."""
+        vehicles = list(vehicles)
+        self.vehicles.update((vehicle.id, vehicle) for vehicle in vehicles)
+        self._rate_index.add_many(vehicles)
+        self._vehicle_index.add_many(vehicles)
+        self._vehicle_unique.add_many(vehicles)
+        self._vehicle_search.add_many(vehicles)
+        self._vehicles_version += 1
+
+    def import_vehicles(self, records: Iterable[dict], chunk_size: int = 1000) -> ImportReport:
+        """
+        Importe des véhicules en flux depuis des enregistrements (dicts, ex. core.importers.read_records).
+        Chaque ligne passe par les validations de Vehicle.__init__ ; les lignes invalides sont
+        consignées dans le rapport sans interrompre l'import, comme celles dont la plaque est déjà attribuée
+        (dans le catalogue ou plus haut dans le fichier). L'insertion se fait par paquets de chunk_size.
+        """
+        report = ImportReport()
+        for chunk in chunked(validated(records, build_vehicle, report), chunk_size):
+            with self._catalog_lock.write():
+                vehicles = self._unique_only(self._vehicle_unique, chunk, report)
+                self._register_vehicles(vehicles)
+            with self.storage.batch():
+                for vehicle in vehicles:
+                    self.storage.save_vehicle(vehicle)
+            report.imported += len(vehicles)
+        return report
+
+    @staticmethod
+    def _unique_only(constraints: UniqueConstraints, chunk: List[Tuple[int, object]], report: ImportReport) -> list:
+        """Éléments du lot dont les valeurs uniques sont libres ; les autres sont rejetés avec leur numéro de ligne."""
+        accepted = []
+        for line_number, item in chunk:
+            try:
+                constraints.check_item(item)
+            except ValueError as e:
+                report.reject(line_number, str(e))
+                continue
+            constraints.add_many((item,))  # Réservé tout de suite : un doublon plus bas dans le lot sera rejeté
+            accepted.append(item)
+        return accepted
+
     def find_vehicle(self, vehicle_id: int) -> Optional[Vehicle]:
         return self.vehicles.get(vehicle_id)
 
     def get_all_vehicles(self) -> List[Vehicle]:
-        return list(self.vehicles.values())
+        with self._catalog_lock.read():
+            return list(self.vehicles.values())
+
+    def list_vehicles(self, offset: int = 0, limit: int = 50, sort_by: str = "id", descending: bool = False,
+                      filters: Optional[Dict[str, str]] = None) -> Page:
+        """
+        Une page de véhicules triés par sort_by (clé de VEHICLE_SORT_KEYS), à partir de la position offset.
+        Filtres : "category" (lu directement dans l'index de la catégorie), "state", et "search"
+        (texte contenu dans la marque, le modèle ou la plaque, sans casse ni accents).
+        Sans filtre state/search, le coût ne dépend que de la taille de la page ; avec, du nombre de
+        véhicules parcourus pour la remplir, et le total n'est connu qu'à la dernière page.
+        """
+        filters = dict(filters or {})
+        category = filters.pop("category", None) or None
+        state = filters.pop("state", None)
+        search = filters.pop("search", None)
+        if filters:
+            raise ValueError(f"Filtre(s) de véhicules inconnu(s) : {', '.join(filters)}.")
+        predicates = []
+        if state:
+            predicates.append(lambda v: v.state == state)
+        if search:
+            needle = fold(search)
+            predicates.append(lambda v: needle in fold(v.brand) or needle in fold(v.model)
+                              or needle in fold(v.license_plate))
+        with self._catalog_lock.read():
+            return self._list_page(self._vehicle_index, self.vehicles, offset, limit, sort_by, descending,
+                                   category, predicates)
+
+    def search_vehicles(self, query: str, limit: int = 50) -> Page:
+        """
+        Recherche à la frappe : véhicules dont la marque, le modèle ou la plaque commence par chacun des mots
+        de query, sans casse ni accents (voir PrefixIndex). Le coût dépend du nombre de résultats, pas de la
+        taille de la flotte. Sans texte, les premiers véhicules par marque.
+        """
+        with self._catalog_lock.read():
+            if not query.strip():
+                return self._list_page(self._vehicle_index, self.vehicles, 0, limit, "brand", False, None, [])
+            ids = self._vehicle_search.search(query, self.vehicles.get, limit + 1)
+            return self._search_page([self.vehicles[vehicle_id] for vehicle_id in ids], limit)
+
+    @staticmethod
+    def _list_page(index: CatalogIndex, catalog: dict, offset: int, limit: int, sort_by: str, descending: bool,
+                   part: Optional[str], predicates: list) -> Page:
+        """Lit une page dans un index trié du catalogue (verrou du catalogue détenu par l'appelant)."""
+        if sort_by not in index.sort_keys:
+            raise ValueError(f"Tri inconnu : {sort_by!r} (attendu : {', '.join(index.sort_keys)}).")
+        if offset < 0 or limit < 1:
+            raise ValueError("offset doit être positif ou nul et limit strictement positif.")
+        if not predicates:
+            ids = index.page_ids(sort_by, offset, limit + 1, descending, part)
+            return Page([catalog[item_id] for item_id in ids[:limit]], offset, limit, index.count(part), len(ids) > limit)
+
+        # Filtre hors index : parcours dans l'ordre du tri, arrêté dès que la page (plus un élément) est remplie
+        items = []
+        skipped = 0
+        for item_id in index.iter_ids(sort_by, descending, part):
+            item = catalog[item_id]
+            if all(predicate(item) for predicate in predicates):
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                items.append(item)
+                if len(items) > limit:
+                    break
+        has_more = len(items) > limit
+        return Page(items[:limit], offset, limit, None if has_more else skipped + len(items), has_more)
+
+    @staticmethod
+    def _search_page(items: list, limit: int) -> Page:
+        """Page de résultats d'une recherche à la frappe (limit + 1 éléments demandés pour savoir s'il y en a d'autres)."""
+        if limit < 1:
+            raise ValueError("limit doit être strictement positif.")
+        has_more = len(items) > limit
+        return Page(items[:limit], 0, limit, None if has_more else len(items), has_more)
 
     def get_available_vehicles(self) -> List[Vehicle]:
         # On suppose que la classe Vehicle a une propriété is_available mise à jour correctement
         # Ou qu'elle dérive de son 'state'
-        return [v for v in self.vehicles.values() if v.is_available] # ou v.state.lower() == "disponible"
+        with self._catalog_lock.read():
+            return [v for v in self.vehicles.values() if v.is_available] # ou v.state.lower() == "disponible"
+
+    def find_available(self, start_date: datetime.date, end_date: datetime.date, category: Optional[str] = None,
+                       max_daily_rate: Optional[float] = None, customer_id: Optional[int] = None,
+                       limit: Optional[int] = None) -> List[Vehicle]:
+        """
+        Véhicules réellement libres sur toute la période [start_date, end_date], triés par tarif croissant.
+        Filtres optionnels : catégorie, tarif journalier maximum, et âge minimum du client (MIN_AGE_BY_CATEGORY).
+        La disponibilité est vérifiée dans l'index des réservations de chaque véhicule, avec les mêmes
+        règles que create_rental.
+        """
+        if end_date < start_date:
+            return []
+        with self._catalog_lock.read():
+            return self._find_available(start_date, end_date, category, max_daily_rate, customer_id, limit)
+
+    def _find_available(self, start_date: datetime.date, end_date: datetime.date, category: Optional[str],
+                        max_daily_rate: Optional[float], customer_id: Optional[int],
+                        limit: Optional[int]) -> List[Vehicle]:
+        customer = None
+        if customer_id is not None:
+            customer = self.find_customer(customer_id)
+            if customer is None:
+                return []
+
+        stored_busy = set()
+        if not self._history_loaded:
+            stored_busy = {vehicle_id for vehicle_id, rental_id in self.storage.find_overlapping_rentals(start_date, end_date)
+                           if rental_id not in self._registry}
+
+        eligible_categories: Dict[str, bool] = {}
+        available = []
+        for vehicle_id in self._rate_index.iter_ids(category, max_daily_rate):
+            vehicle = self.vehicles[vehicle_id]
+            if not vehicle.is_available:
+                continue
+            if customer is not None:
+                eligible = eligible_categories.get(vehicle.category)
+                if eligible is None:
+                    required_age = self.MIN_AGE_BY_CATEGORY.get(vehicle.category)
+                    eligible = eligible_categories[vehicle.category] = required_age is None or customer.age >= required_age
+                if not eligible:
+                    continue
+            bookings = self._bookings.get(vehicle_id)
+            if (bookings is not None and bookings.find_overlap(start_date, end_date) is not None) or vehicle_id in stored_busy:
+                continue
+            available.append(vehicle)
+            if limit is not None and len(available) >= limit:
+                break
+        return available
+
+    def quote_many(self, requests: Iterable[Tuple[int, datetime.date, datetime.date]]) -> List[Optional[float]]:
+        """
+        Devis de plusieurs demandes (vehicle_id, start_date, end_date), calculés en une fois avec
+        Rental.pricing.quote_many : mêmes montants que calculate_base_cost d'une location sur la même
+        période. None pour un véhicule inconnu. La disponibilité n'est pas vérifiée (voir find_available).
+        """
+        requests = list(requests)
+        with self._catalog_lock.read():
+            vehicles = [self.vehicles.get(vehicle_id) for vehicle_id, _, _ in requests]
+        known = [i for i, vehicle in enumerate(vehicles) if vehicle is not None]
+        quotes: List[Optional[float]] = [None] * len(requests)
+        if known:
+            costs = Rental.pricing.quote_many([vehicles[i].daily_rate for i in known],
+                                              [vehicles[i].category for i in known],
+                                              [requests[i][1] for i in known], [requests[i][2] for i in known])
+            for i, cost in zip(known, costs.tolist()):
+                quotes[i] = cost
+        return quotes
 
     def update_vehicle(self, vehicle_id: int, new_brand: str, new_model: str, new_daily_rate: float, new_license_plate: str, new_state: str, new_category: str) -> bool:
-        vehicle = self.find_vehicle(vehicle_id)
+        # Lève ValueError (véhicule inchangé) si la nouvelle plaque appartient déjà à un autre véhicule
+        with self._catalog_lock.write():
+            vehicle = self.find_vehicle(vehicle_id)
+            if vehicle:
+                self._vehicle_unique.check({"license_plate": new_license_plate}, vehicle_id)
+                self._rate_index.remove(vehicle_id)
+                self._vehicle_index.remove(vehicle_id)
+                self._vehicle_unique.remove(vehicle)
+                self._vehicle_search.remove(vehicle)
+                vehicle.brand = sys.intern(new_brand)
+                vehicle.model = sys.intern(new_model)
+                vehicle.daily_rate = new_daily_rate
+                vehicle.license_plate = new_license_plate
+                vehicle.state = sys.intern(new_state) # La classe Vehicle devrait mettre à jour is_available si state change
+                vehicle.category = sys.intern(new_category)
+                if hasattr(vehicle, 'is_available'): # Vérifie si l'attribut existe et le met à jour
+                     vehicle.is_available = (new_state.lower() == "disponible")
+                self._rate_index.add(vehicle)
+                self._vehicle_index.add(vehicle)
+                self._vehicle_unique.add_many((vehicle,))
+                self._vehicle_search.add(vehicle)
+                self._vehicles_version += 1
         if vehicle:
-            vehicle.brand = new_brand
-            vehicle.model = new_model
-            vehicle.daily_rate = new_daily_rate
-            vehicle.license_plate = new_license_plate
-            vehicle.state = new_state # La classe Vehicle devrait mettre à jour is_available si state change
-            if hasattr(vehicle, 'is_available'): # Vérifie si l'attribut existe et le met à jour
-                 vehicle.is_available = (new_state.lower() == "disponible")
+            self.storage.save_vehicle(vehicle)
             return True
         return False
 
     def remove_vehicle(self, vehicle_id: int) -> bool:
-        vehicle = self.find_vehicle(vehicle_id)
-        if not vehicle:
-            print(f"Erreur: Véhicule avec l'ID {vehicle_id} non trouvé.")
-            return False
+        # Le verrou du véhicule empêche une réservation concurrente entre la vérification et la suppression
+        with self._vehicle_locks.hold((vehicle_id,)), self._catalog_lock.write():
+            vehicle = self.find_vehicle(vehicle_id)
+            if not vehicle:
+                print(f"Erreur: Véhicule avec l'ID {vehicle_id} non trouvé.")
+                return False
 
-        # Vérifier s'il existe des locations actives pour ce véhicule
-        for rental in self.rentals:
-            # On vérifie la présence d'une location dont le véhicule correspond et qui est active
-            if rental.vehicle.id == vehicle_id and rental.is_active:
+            # Vérifier s'il existe des locations actives pour ce véhicule
+            if self._registry.has_active_for_vehicle(vehicle_id):
                 print(f"Erreur: Véhicule '{vehicle.license_plate}' (ID: {vehicle_id}) est en location active et ne peut pas être supprimé.")
                 return False
 
-        del self.vehicles[vehicle_id]
+            del self.vehicles[vehicle_id]
+            self._bookings.pop(vehicle_id, None)
+            self._rate_index.remove(vehicle_id)
+            self._vehicle_index.remove(vehicle_id)
+            self._vehicle_unique.remove(vehicle)
+            self._vehicle_search.remove(vehicle)
+            self._vehicles_version += 1
+        self.storage.delete_vehicle(vehicle_id)
         print(f"Véhicule (ID: {vehicle_id}) supprimé avec succès.")
         return True
 
@@ -74,46 +394,151 @@ class CarRentalSystem:
     def add_customer(self, first_name: str, last_name: str, age: int, driver_license_number: str, email: str) -> Customer:
         # Assurez-vous que la classe Customer gère la génération d'un ID unique
         customer = Customer(first_name, last_name, age, driver_license_number, email)
-        self.customers[customer.id] = customer
+        with self._catalog_lock.write():
+            self._customer_unique.check_item(customer)  # ValueError si le permis ou l'email est déjà attribué
+            self._register_customer(customer)
+        self.storage.save_customer(customer)
         return customer
 
+    def adopt_customer(self, customer: Customer) -> Customer:
+        """
+        Enregistre ici un client d'un autre système (autre agence, voir AgencyNetwork), avec le même ID,
+        pour qu'il puisse y louer. Le client local est une copie : son historique ne contient que les
+        locations de ce système. Retourne le client local, déjà présent ou ajouté ; ValueError si son
+        permis ou son email est attribué à un autre client de ce système.
+        """
+        with self._catalog_lock.write():
+            local = self.customers.get(customer.id)
+            if local is not None:
+                return local
+            local = Customer.restore(customer.id, customer.first_name, customer.last_name, customer.age,
+                                     customer.driver_license_number, customer.email)
+            self._customer_unique.check_item(local)
+            self._register_customer(local)
+        self.storage.save_customer(local)
+        return local
+
+    def _register_customer(self, customer: Customer):
+        self._register_customers((customer,))
+
+    def _register_customers(self, customers: Iterable[Customer]):
+        """Enregistre un lot de clients ; les index sont mis à jour une fois pour tout le lot."""
+        customers = list(customers)
+        self.customers.update((customer.id, customer) for customer in customers)
+        self._customer_index.add_many(customers)
+        self._customer_unique.add_many(customers)
+        self._customer_search.add_many(customers)
+        self._customers_version += 1
+
+    def import_customers(self, records: Iterable[dict], chunk_size: int = 1000) -> ImportReport:
+        """
+        Importe des clients en flux depuis des enregistrements (dicts, ex. core.importers.read_records).
+        Mêmes règles que import_vehicles, avec les validations de Customer.__init__ et l'unicité
+        du numéro de permis et de l'email.
+        """
+        report = ImportReport()
+        for chunk in chunked(validated(records, build_customer, report), chunk_size):
+            with self._catalog_lock.write():
+                customers = self._unique_only(self._customer_unique, chunk, report)
+                self._register_customers(customers)
+            with self.storage.batch():
+                for customer in customers:
+                    self.storage.save_customer(customer)
+            report.imported += len(customers)
+        return report
+
     def find_customer(self, customer_id: int) -> Optional[Customer]:
         return self.customers.get(customer_id)
 
+    def check_customer_unique(self, driver_license_number: str, email: str, customer_id: Optional[int] = None):
+        """Lève ValueError si le permis ou l'email appartient à un autre client que customer_id (voir AgencyNetwork)."""
+        with self._catalog_lock.read():
+            self._customer_unique.check({"driver_license_number": driver_license_number, "email": email}, customer_id)
+
+    def has_active_rentals(self, customer_id: int) -> bool:
+        """Vrai si le client a une location en cours dans ce système."""
+        with self._index_lock:
+            return self._registry.has_active_for_customer(customer_id)
+
     def get_all_customers(self) -> List[Customer]:
-        return list(self.customers.values())
+        with self._catalog_lock.read():
+            return list(self.customers.values())
+
+    def list_customers(self, offset: int = 0, limit: int = 50, sort_by: str = "id", descending: bool = False,
+                       filters: Optional[Dict[str, str]] = None) -> Page:
+        """
+        Une page de clients triés par sort_by (clé de CUSTOMER_SORT_KEYS), à partir de la position offset.
+        Filtre : "search" (texte contenu dans le prénom, le nom, l'email ou le numéro de permis, sans casse ni accents).
+        Mêmes règles de coût que list_vehicles.
+        """
+        filters = dict(filters or {})
+        search = filters.pop("search", None)
+        if filters:
+            raise ValueError(f"Filtre(s) de clients inconnu(s) : {', '.join(filters)}.")
+        predicates = []
+        if search:
+            needle = fold(search)
+            predicates.append(lambda c: needle in fold(c.first_name) or needle in fold(c.last_name)
+                              or needle in fold(c.email) or needle in fold(c.driver_license_number))
+        with self._catalog_lock.read():
+            return self._list_page(self._customer_index, self.customers, offset, limit, sort_by, descending,
+                                   None, predicates)
+
+    def search_customers(self, query: str, limit: int = 50) -> Page:
+        """
+        Recherche à la frappe : clients dont le prénom, le nom, l'email ou le numéro de permis commence par
+        chacun des mots de query, sans casse ni accents. Sans texte, les premiers clients par nom.
+        """
+        with self._catalog_lock.read():
+            if not query.strip():
+                return self._list_page(self._customer_index, self.customers, 0, limit, "last_name", False, None, [])
+            ids = self._customer_search.search(query, self.customers.get, limit + 1)
+            return self._search_page([self.customers[customer_id] for customer_id in ids], limit)
 
     def update_customer(self, customer_id: int, new_first_name: str, new_last_name: str, new_age: int, new_driver_license_number: str, new_email: str) -> bool:
-        customer = self.find_customer(customer_id)
+        # Lève ValueError (client inchangé) si le permis ou l'email appartient déjà à un autre client
+        with self._catalog_lock.write():
+            customer = self.find_customer(customer_id)
+            if customer:
+                self._customer_unique.check({"driver_license_number": new_driver_license_number,
+                                             "email": new_email}, customer_id)
+                self._customer_index.remove(customer_id)
+                self._customer_unique.remove(customer)
+                self._customer_search.remove(customer)
+                customer.first_name = new_first_name
+                customer.last_name = new_last_name
+                customer.age = new_age
+                customer.driver_license_number = new_driver_license_number
+                customer.email = new_email
+                self._customer_index.add(customer)
+                self._customer_unique.add_many((customer,))
+                self._customer_search.add(customer)
+                self._customers_version += 1
         if customer:
-            customer.first_name = new_first_name
-            customer.last_name = new_last_name
-            customer.age = new_age
-            customer.driver_license_number = new_driver_license_number
-            customer.email = new_email
+            self.storage.save_customer(customer)
             return True
         return False
 
     def remove_customer(self, customer_id: int) -> bool:
         print(f"\n--- Tentative de suppression du client ID: {customer_id} ---")
 
-        if customer_id not in self.customers:
-            print(f"Erreur: Client avec l'ID {customer_id} non trouvé dans self.customers.")
-            return False
-
-        # Vérifier s'il existe des locations actives pour ce client
-        found_active_rental = False
-        for rental_obj in self.rentals:
-            if rental_obj.customer.id == customer_id and rental_obj.is_active:
-                print(f"!!! ATTENTION : Location active trouvée pour le client {customer_id} (Location ID: {rental_obj.id}) !!!")
-                found_active_rental = True
-                break
+        # Sous le verrou des index : aucune location ne peut être ouverte pour ce client pendant la suppression
+        with self._catalog_lock.write(), self._index_lock:
+            if customer_id not in self.customers:
+                print(f"Erreur: Client avec l'ID {customer_id} non trouvé dans self.customers.")
+                return False
 
-        if found_active_rental:
-            print(f"Erreur: Le client {customer_id} a des locations actives et ne peut pas être supprimé.")
-            return False
+            # Vérifier s'il existe des locations actives pour ce client
+            if self._registry.has_active_for_customer(customer_id):
+                print(f"Erreur: Le client {customer_id} a des locations actives et ne peut pas être supprimé.")
+                return False
 
-        del self.customers[customer_id]
+            customer = self.customers.pop(customer_id)
+            self._customer_index.remove(customer_id)
+            self._customer_unique.remove(customer)
+            self._customer_search.remove(customer)
+            self._customers_version += 1
+        self.storage.delete_customer(customer_id)
         print(f"Client (ID: {customer_id}) supprimé avec succès.")
         return True
 
@@ -125,78 +550,611 @@ class CarRentalSystem:
         #la disponibilité du véhicule, l'âge du client et l'absence de chevauchement.
         #Retourne la location créée et None en cas de succès,
         #ou None et un message d'erreur en cas d'échec.
-        
+        #Seul le véhicule demandé est verrouillé : des réservations sur d'autres véhicules avancent en parallèle.
+        with self._vehicle_locks.hold((vehicle_id,)):
+            return self._create_rental(customer_id, vehicle_id, start_date, end_date)
+
+    def _create_rental(self, customer_id: int, vehicle_id: int, start_date: datetime.date,
+                       end_date: datetime.date) -> Tuple[Optional[Rental], Optional[str]]:
+        customer, vehicle, error = self._check_rental_request(customer_id, vehicle_id, start_date, end_date)
+        if error:
+            return None, error
+
+        # 3. Vérification des chevauchements de dates via l'index des réservations du véhicule
+        # Condition de chevauchement :
+        # (Début Nouvelle < Fin Existante) ET (Fin Nouvelle > Début Existante)
+        existing_rental = self._find_overlap(vehicle_id, start_date, end_date)
+        if existing_rental is not None:
+            return None, self._overlap_message(vehicle, existing_rental.start_date, existing_rental.end_date)
+
+        # Si toutes les validations passent, créer la location
+        try:
+            with self.storage.batch():
+                rental = self._open_rental(customer, vehicle, start_date, end_date)
+            return rental, None  # Succès, retourne l'objet Rental et aucun message d'erreur
+
+        except Exception as e:
+            # Capture d'éventuelles erreurs lors de la création de l'objet Rental ou des mises à jour
+            return None, f"Erreur inattendue lors de la création de la location: {e}"
+
+    def _check_rental_request(self, customer_id: int, vehicle_id: int, start_date: datetime.date, end_date: datetime.date,
+                              age_checks: Optional[Dict[Tuple[int, str], Optional[str]]] = None
+                              ) -> Tuple[Optional[Customer], Optional[Vehicle], Optional[str]]:
+        """
+        Validations d'une demande de location avant le contrôle des chevauchements.
+        Retourne (client, véhicule, None) si la demande est valide, sinon un message d'erreur.
+        age_checks permet de mémoriser le résultat du contrôle d'âge par (client, catégorie) sur un lot.
+        """
         customer = self.find_customer(customer_id)
         vehicle = self.find_vehicle(vehicle_id)
 
         if not customer:
-            return None, f"Erreur: Client avec ID {customer_id} non trouvé."
+            return None, None, f"Erreur: Client avec ID {customer_id} non trouvé."
         if not vehicle:
-            return None, f"Erreur: Véhicule avec ID {vehicle_id} non trouvé."
+            return None, None, f"Erreur: Véhicule avec ID {vehicle_id} non trouvé."
 
         # 1. Vérification de la disponibilité du véhicule (état et absence de location active)
         if not vehicle.is_available:
-            return None, f"Erreur: Véhicule '{vehicle.brand} {vehicle.model}' ({vehicle.license_plate}) non disponible actuellement."
+            return None, None, f"Erreur: Véhicule '{vehicle.brand} {vehicle.model}' ({vehicle.license_plate}) non disponible actuellement."
 
         # 2. Vérification des dates de location
         if end_date < start_date:
-            return None, "Erreur: La date de fin ne peut pas être antérieure à la date de début."
+            return None, None, "Erreur: La date de fin ne peut pas être antérieure à la date de début."
 
         # --- LOGIQUE DE VÉRIFICATION DE L'ÂGE ---
-        required_age = self.MIN_AGE_BY_CATEGORY.get(vehicle.category)
-        if required_age is not None and customer.age < required_age:
-            return None, (f"Erreur: Le client '{customer.first_name} {customer.last_name}' (âge: {customer.age}) "
-                          f"n'a pas l'âge minimum requis ({required_age} ans) "
-                          f"pour la catégorie de véhicule '{vehicle.category}'.")
+        age_key = (customer.id, vehicle.category)
+        if age_checks is not None and age_key in age_checks:
+            age_error = age_checks[age_key]
+        else:
+            age_error = None
+            required_age = self.MIN_AGE_BY_CATEGORY.get(vehicle.category)
+            if required_age is not None and customer.age < required_age:
+                age_error = (f"Erreur: Le client '{customer.first_name} {customer.last_name}' (âge: {customer.age}) "
+                             f"n'a pas l'âge minimum requis ({required_age} ans) "
+                             f"pour la catégorie de véhicule '{vehicle.category}'.")
+            if age_checks is not None:
+                age_checks[age_key] = age_error
+        if age_error:
+            return None, None, age_error
         # --- FIN DE LA LOGIQUE DE RÈGLE D'ÂGE ---
 
-        # 3. *** NOUVELLE LOGIQUE : Vérification des chevauchements de dates ***
-        for existing_rental in self.rentals:
-            # On ne vérifie que les locations pour le même véhicule
-            if existing_rental.vehicle.id == vehicle_id:
-                # On vérifie si la nouvelle période chevauche une location existante (qui n'est pas encore terminée)
-                # Condition de chevauchement :
-                # (Début Nouvelle <= Fin Existante) ET (Fin Nouvelle >= Début Existante)
-                if start_date < existing_rental.end_date and end_date > existing_rental.start_date:
-                    return None, (f"Erreur: Le véhicule '{vehicle.brand} {vehicle.model}' ({vehicle.license_plate}) "
-                                  f"est déjà réservé du {existing_rental.start_date.strftime('%d/%m/%Y')} au {existing_rental.end_date.strftime('%d/%m/%Y')}. "
-                                  f"Veuillez choisir une autre période ou un autre véhicule.")
-        # *** FIN DE LA NOUVELLE LOGIQUE ***
+        return customer, vehicle, None
 
+    @staticmethod
+    def _overlap_message(vehicle: Vehicle, start_date: datetime.date, end_date: datetime.date) -> str:
+        return (f"Erreur: Le véhicule '{vehicle.brand} {vehicle.model}' ({vehicle.license_plate}) "
+                f"est déjà réservé du {start_date.strftime('%d/%m/%Y')} au {end_date.strftime('%d/%m/%Y')}. "
+                f"Veuillez choisir une autre période ou un autre véhicule.")
 
-        # Si toutes les validations passent, créer la location
-        try:
+    def _open_rental(self, customer: Customer, vehicle: Vehicle, start_date: datetime.date, end_date: datetime.date) -> Rental:
+        """Crée et enregistre une location déjà validée (verrou du véhicule détenu par l'appelant)."""
+        with self._index_lock:
+            # Le client a pu être supprimé par un autre thread depuis la validation
+            if self.customers.get(customer.id) is not customer:
+                raise ValueError(f"Client avec ID {customer.id} non trouvé.")
             rental = Rental(customer, vehicle, start_date, end_date)
-            self.rentals.append(rental)
-
-            # Mettre à jour l'état du véhicule pour marquer comme loué
-            if hasattr(vehicle, 'set_status'):
-                vehicle.set_status("rented")
-            elif hasattr(vehicle, 'is_available'):
-                vehicle.is_available = False
+            self._index_rental(rental)
 
             # Ajouter la location à l'historique du client
             if hasattr(customer, 'add_rental_to_history'):
                 customer.add_rental_to_history(rental.id)
 
-            return rental, None  # Succès, retourne l'objet Rental et aucun message d'erreur
+        # Mettre à jour l'état du véhicule pour marquer comme loué
+        if hasattr(vehicle, 'set_status'):
+            vehicle.set_status("rented")
+        elif hasattr(vehicle, 'is_available'):
+            vehicle.is_available = False
 
-        except Exception as e:
-            # Capture d'éventuelles erreurs lors de la création de l'objet Rental ou des mises à jour
-            return None, f"Erreur inattendue lors de la création de la location: {e}"
+        self.storage.save_rental(rental)
+        self.storage.save_vehicle(vehicle)
+        return rental
+
+    def create_rentals_batch(self, requests: Iterable[Tuple[int, int, datetime.date, datetime.date]],
+                             atomic: bool = False,
+                             arrival_order: bool = False) -> List[Tuple[Optional[Rental], Optional[str]]]:
+        """
+        Crée un lot de locations. Chaque demande est un tuple (customer_id, vehicle_id, start_date, end_date).
+
+        Les demandes sont regroupées par véhicule et triées par date de début, puis vérifiées en un seul
+        balayage contre les réservations existantes et contre les autres demandes du lot :
+        entre deux demandes du lot qui se chevauchent, la plus tôt dans le calendrier l'emporte.
+
+        atomic=False (au mieux) : les demandes valides sont créées, les autres sont refusées.
+        atomic=True (tout ou rien) : rien n'est créé si une seule demande échoue.
+        arrival_order=True : entre deux demandes du lot qui se chevauchent, la première de la liste
+        l'emporte (premier arrivé, premier servi), quelles que soient leurs dates.
+
+        Retourne, dans l'ordre des demandes, un tuple (location, None) ou (None, message d'erreur)
+        avec les mêmes messages que create_rental.
+        """
+        requests = list(requests)
+        results: List[Tuple[Optional[Rental], Optional[str]]] = [(None, None)] * len(requests)
+        age_checks: Dict[Tuple[int, str], Optional[str]] = {}
+        by_vehicle: Dict[int, List[int]] = {}
+        checked: Dict[int, Tuple[Customer, Vehicle]] = {}
+
+        for position, (customer_id, vehicle_id, start_date, end_date) in enumerate(requests):
+            customer, vehicle, error = self._check_rental_request(customer_id, vehicle_id, start_date, end_date, age_checks)
+            if error:
+                results[position] = (None, error)
+                continue
+            checked[position] = (customer, vehicle)
+            by_vehicle.setdefault(vehicle_id, []).append(position)
+
+        # Les véhicules du lot sont verrouillés ensemble (ordre croissant des IDs) jusqu'à la création
+        with self._vehicle_locks.hold(by_vehicle):
+            return self._create_checked_rentals(requests, results, by_vehicle, checked, atomic, arrival_order)
 
+    def _create_checked_rentals(self, requests: List[Tuple[int, int, datetime.date, datetime.date]],
+                                results: List[Tuple[Optional[Rental], Optional[str]]],
+                                by_vehicle: Dict[int, List[int]], checked: Dict[int, Tuple[Customer, Vehicle]],
+                                atomic: bool, arrival_order: bool) -> List[Tuple[Optional[Rental], Optional[str]]]:
+        # Balayage par véhicule, dans l'ordre chronologique des demandes
+        accepted: List[int] = []
+        for vehicle_id, positions in by_vehicle.items():
+            positions.sort(key=lambda position: (requests[position][2], requests[position][3]))
+            periods = [(requests[position][2], requests[position][3]) for position in positions]
+            existing_overlaps = self._booking_index(vehicle_id).find_overlaps(periods)
+            vehicle = checked[positions[0]][1]
+            free: List[int] = []  # Demandes sans chevauchement avec les réservations existantes
+            for position, (start_date, end_date), existing_rental in zip(positions, periods, existing_overlaps):
+                if existing_rental is None:
+                    existing_rental = self._find_stored_overlap(vehicle_id, start_date, end_date)
+                if existing_rental is not None:
+                    results[position] = (None, self._overlap_message(vehicle, existing_rental.start_date, existing_rental.end_date))
+                else:
+                    free.append(position)
+            if arrival_order:
+                accepted += self._first_come_winners(requests, results, free, vehicle)
+                continue
+            last_start = last_end = None  # Dernière demande retenue du lot (fin la plus tardive)
+            for position in free:
+                _, _, start_date, end_date = requests[position]
+                if last_end is not None and start_date < last_end and end_date > last_start:
+                    results[position] = (None, self._overlap_message(vehicle, last_start, last_end))
+                else:
+                    accepted.append(position)
+                    last_start, last_end = start_date, end_date
+
+        if atomic and len(accepted) < len(requests):
+            cancelled = (None, "Erreur: Réservation groupée annulée : au moins une autre demande du lot a échoué.")
+            return [result if result[1] else cancelled for result in results]
+
+        accepted.sort()  # Les IDs sont attribués dans l'ordre des demandes
+        with self.storage.batch():
+            for position in accepted:
+                customer, vehicle = checked[position]
+                _, _, start_date, end_date = requests[position]
+                try:
+                    results[position] = (self._open_rental(customer, vehicle, start_date, end_date), None)
+                except Exception as e:
+                    results[position] = (None, f"Erreur inattendue lors de la création de la location: {e}")
+        return results
+
+    def _first_come_winners(self, requests: List[Tuple[int, int, datetime.date, datetime.date]],
+                            results: List[Tuple[Optional[Rental], Optional[str]]], positions: List[int],
+                            vehicle: Vehicle) -> List[int]:
+        """
+        Demandes d'un même véhicule retenues dans l'ordre d'arrivée (arrival_order) : chacune est comparée
+        aux demandes déjà retenues, tenues triées par date de début. Elles ne se chevauchent pas, donc leurs
+        fins sont croissantes aussi : seule la dernière qui commence avant la fin demandée peut chevaucher.
+        """
+        kept: List[Tuple[datetime.date, datetime.date]] = []
+        winners = []
+        for position in sorted(positions):
+            _, _, start_date, end_date = requests[position]
+            previous = bisect.bisect_left(kept, end_date, key=lambda period: period[0]) - 1
+            if previous >= 0 and kept[previous][1] > start_date:
+                results[position] = (None, self._overlap_message(vehicle, *kept[previous]))
+                continue
+            bisect.insort(kept, (start_date, end_date))
+            winners.append(position)
+        return winners
+
+    def book_category(self, customer_id: int, category: str, start_date: datetime.date, end_date: datetime.date,
+                      max_daily_rate: Optional[float] = None) -> Tuple[Optional[Rental], Optional[str]]:
+        """
+        Réserve un véhicule de la catégorie sans que le client en choisisse un : le véhicule est attribué
+        au meilleur ajustement (voir _best_fit_vehicle), ce qui comble les trous du calendrier au lieu
+        d'en créer de nouveaux. Mêmes validations et même retour que create_rental.
+        La location reste réattribuable tant qu'elle n'a pas commencé (reoptimize_category_bookings).
+        """
+        if end_date < start_date:
+            return None, "Erreur: La date de fin ne peut pas être antérieure à la date de début."
+        refused = set()
+        while True:
+            with self._catalog_lock.read():
+                vehicle = self._best_fit_vehicle(category, start_date, end_date, max_daily_rate, refused)
+            if vehicle is None:
+                return None, (f"Erreur: Aucun véhicule de la catégorie '{category}' n'est libre du "
+                              f"{start_date.strftime('%d/%m/%Y')} au {end_date.strftime('%d/%m/%Y')}.")
+            with self._vehicle_locks.hold((vehicle.id,)):
+                # Un autre thread a pu réserver ce véhicule depuis le choix : on passe au suivant
+                if self._find_overlap(vehicle.id, start_date, end_date) is not None:
+                    refused.add(vehicle.id)
+                    continue
+                rental, error = self._create_rental(customer_id, vehicle.id, start_date, end_date)
+                if rental is not None:
+                    with self._index_lock:
+                        self._category_bookings.add(rental.id)
+                    self.storage.save_category_booking(rental.id)
+                return rental, error
+
+    def _best_fit_vehicle(self, category: str, start_date: datetime.date, end_date: datetime.date,
+                          max_daily_rate: Optional[float], excluded: Set[int]) -> Optional[Vehicle]:
+        """
+        Véhicule de la catégorie libre sur la période dont le trou du calendrier est le mieux rempli :
+        la réservation précédente finit le plus tard possible avant le début (véhicules vides en dernier),
+        puis, à égalité, la suivante commence le plus tôt après la fin. À égalité encore, le moins cher
+        (ordre de RateIndex). Verrou du catalogue détenu par l'appelant.
+        """
+        stored_busy = set()
+        if not self._history_loaded:
+            stored_busy = {vehicle_id for vehicle_id, rental_id in self.storage.find_overlapping_rentals(start_date, end_date)
+                           if rental_id not in self._registry}
+        # Clé à maximiser : (fin de la réservation précédente, -début de la suivante), en ordinaux ;
+        # 0 et -(dernier ordinal) quand il n'y en a pas
+        no_next = -datetime.date.max.toordinal()
+        best, best_key = None, None
+        bookings_by_vehicle = self._bookings
+        for vehicle_id in self._rate_index.iter_ids(category, max_daily_rate):
+            vehicle = self.vehicles[vehicle_id]
+            if not vehicle.is_available or vehicle_id in excluded or vehicle_id in stored_busy:
+                continue
+            bookings = bookings_by_vehicle.get(vehicle_id)
+            if not bookings:
+                key = (0, no_next)  # Véhicule sans réservation : retenu seulement faute de mieux
+            else:
+                gap = bookings.gap_around(start_date, end_date)
+                if gap is None:
+                    continue
+                previous_end, next_start = gap
+                key = (previous_end.toordinal() if previous_end else 0, -next_start.toordinal() if next_start else no_next)
+            if best_key is None or key > best_key:
+                best, best_key = vehicle, key
+        return best
+
+    def reoptimize_category_bookings(self, category: Optional[str] = None,
+                                     after: Optional[datetime.date] = None) -> Dict[str, int]:
+        """
+        Réattribue les réservations faites par book_category qui n'ont pas encore commencé
+        (début après `after`, aujourd'hui par défaut) pour remplir la flotte au mieux : les véhicules
+        déjà occupés sont complétés en premier, d'autres se retrouvent entièrement libres.
+        Une réservation ne change de véhicule qu'au sein de sa catégorie et à tarif journalier égal :
+        le prix du client ne bouge pas. Les autres réservations restent sur leur véhicule.
+        Les groupes (catégorie, tarif) sans solution complète, ou dont la nouvelle attribution n'utilise
+        pas moins de véhicules ni ne laisse moins de jours libres entre les réservations (packing_score),
+        sont laissés tels quels.
+
+        Retourne {"reservations": examinées, "deplacees": réattribuées,
+                  "vehicules_avant": véhicules utilisés par les réservations du périmètre, "vehicules_apres": ...}.
+        """
+        after = after or datetime.date.today()
+        with self._index_lock:
+            candidates = [self._registry.get(rental_id) for rental_id in self._category_bookings]
+        groups: Dict[Tuple[str, float], List[Rental]] = {}
+        for rental in candidates:
+            if (rental is not None and rental.is_active and rental.start_date > after
+                    and (category is None or rental.vehicle.category == category)):
+                groups.setdefault((rental.vehicle.category, rental.vehicle.daily_rate), []).append(rental)
+
+        summary = {"reservations": 0, "deplacees": 0, "vehicules_avant": 0, "vehicules_apres": 0}
+        for (group_category, daily_rate), rentals in groups.items():
+            with self._catalog_lock.read():
+                vehicle_ids = [vehicle_id for vehicle_id in self._rate_index.iter_ids(group_category)
+                               if self.vehicles[vehicle_id].daily_rate == daily_rate]
+            # Tous les véhicules du groupe sont verrouillés : aucune réservation ne s'y glisse pendant le calcul
+            with self._vehicle_locks.hold(vehicle_ids + [rental.vehicle.id for rental in rentals]):
+                self._reoptimize_group(rentals, vehicle_ids, summary)
+        return summary
+
+    def _reoptimize_group(self, rentals: List[Rental], vehicle_ids: List[int], summary: Dict[str, int]):
+        with self._catalog_lock.read(), self._index_lock:
+            # Réservations toujours réattribuables (un thread a pu en terminer ou en annuler une)
+            rentals = [rental for rental in rentals if rental.is_active]
+            targets = [vehicle_id for vehicle_id in vehicle_ids
+                       if vehicle_id in self.vehicles and self.vehicles[vehicle_id].is_available]
+            flexible = {rental.id for rental in rentals}
+            first_day = min((rental.start_date for rental in rentals), default=None)
+            if first_day is None:
+                return
+            if not self._history_loaded:
+                # Locations restées dans le stockage (terminées) sur les véhicules cibles : rechargées pour que
+                # leurs périodes comptent parmi les réservations fixes
+                target_set = set(targets)
+                for vehicle_id, rental_id in self.storage.find_overlapping_rentals(first_day, datetime.date.max):
+                    if vehicle_id in target_set and rental_id not in self._registry:
+                        self.find_rental(rental_id)
+            fixed = {vehicle_id: [(start.toordinal(), end.toordinal()) for start, end, rental_id
+                                  in self._booking_index(vehicle_id).periods_between(first_day, datetime.date.max, with_ids=True)
+                                  if rental_id not in flexible]
+                     for vehicle_id in targets}
+            requests = [(rental.id, rental.start_date.toordinal(), rental.end_date.toordinal(), rental.vehicle.id)
+                        for rental in rentals]
+            assignment = assign_bookings(requests, targets, fixed)
+            current = {rental.id: rental.vehicle.id for rental in rentals}
+            summary["reservations"] += len(rentals)
+            summary["vehicules_avant"] += len(set(current.values()))
+            if assignment is None or packing_score(requests, assignment, fixed) >= packing_score(requests, current, fixed):
+                # Pas mieux que l'attribution actuelle (moins de véhicules, ou moins de jours libres entre
+                # les réservations) : rien ne bouge
+                summary["vehicules_apres"] += len(set(current.values()))
+                return
+            summary["vehicules_apres"] += len(set(assignment.values()))
+            moved = [(rental, self.vehicles[assignment[rental.id]]) for rental in rentals
+                     if assignment[rental.id] != rental.vehicle.id]
+            # Toutes les réservations déplacées quittent d'abord leur véhicule : les index ne contiennent
+            # jamais deux réservations qui se chevauchent
+            for rental, _ in moved:
+                self._booking_index(rental.vehicle.id).remove(rental)
+                self._update_occupancy(rental.vehicle.id, rental.start_date, rental.end_date, -1)
+            released = {rental.vehicle.id: rental.vehicle for rental, _ in moved}
+            for rental, vehicle in moved:
+                self._registry.move(rental, vehicle)
+                self._booking_index(vehicle.id).add(rental)
+                self._update_occupancy(vehicle.id, rental.start_date, rental.end_date, 1)
+                vehicle.set_status("rented")  # Comme à la création d'une location
+            for vehicle in released.values():
+                if not self._registry.has_active_for_vehicle(vehicle.id):
+                    vehicle.set_status("available")
+            if moved:
+                self._rentals_version += 1
+                for rental, _ in moved:
+                    for listener in self._rental_listeners:
+                        listener(rental, rental.status, rental.status)
+            summary["deplacees"] += len(moved)
+        with self.storage.batch():
+            for rental, vehicle in moved:
+                self.storage.save_rental(rental)
+                self.storage.save_vehicle(vehicle)
+            for vehicle in released.values():
+                self.storage.save_vehicle(vehicle)
+
+    def _index_rental(self, rental: Rental, counted: bool = False):
+        """
+        Enregistre une location dans la liste et dans tous les index du système.
+        counted=True : la location est déjà comptée dans les agrégats (rechargée depuis le stockage).
+        """
+        self.rentals.append(rental)
+        self._registry.add(rental)
+        self._stats.track(rental, counted)
+        rental.add_status_listener(self._rental_status_listener)
+        self._rentals_version += 1
+        if rental.status != "cancelled":
+            self._booking_index(rental.vehicle.id).add(rental, booked_end_date(rental))
+            self._update_occupancy(rental.vehicle.id, rental.start_date, booked_end_date(rental), 1)
+
+    def _index_rentals(self, rentals: List[Rental], counted: bool = False):
+        """
+        _index_rental pour tout un lot (démarrage, historique rechargé) : chaque index est rempli en une passe,
+        les réservations d'un véhicule sont triées une seule fois.
+        """
+        self.rentals.extend(rentals)
+        self._registry.add_many(rentals)
+        self._stats.track_many(rentals, counted)
+        listener = self._rental_status_listener
+        by_vehicle: Dict[int, List[Tuple[Rental, datetime.date]]] = {}
+        for rental in rentals:
+            rental.add_status_listener(listener)
+            if rental.status != "cancelled":
+                by_vehicle.setdefault(rental.vehicle.id, []).append((rental, booked_end_date(rental)))
+        self._rentals_version += 1
+        for vehicle_id, entries in by_vehicle.items():
+            self._booking_index(vehicle_id).add_many(entries)
+            if self._occupancy is not None or self._occupancy_changes:  # Pas de calendrier au démarrage
+                for rental, end_date in entries:
+                    self._update_occupancy(vehicle_id, rental.start_date, end_date, 1)
+
+    def _on_rental_status_change(self, rental: Rental, old_status: str, new_status: str):
+        self._rentals_version += 1
+        for listener in self._rental_listeners:
+            listener(rental, old_status, new_status)
+
+    def add_rental_listener(self, listener: StatusListener):
+        """
+        Abonne listener(location, ancien statut, nouveau statut) aux changements des locations existantes :
+        changement de statut, ou changement de véhicule par la réoptimisation (statut inchangé).
+        Les nouvelles locations ne sont pas signalées : elles sont ajoutées en fin de get_all_rentals.
+        """
+        self._rental_listeners += (listener,)
+
+    def get_rentals_version(self) -> int:
+        """Numéro de version des locations : change dès qu'une location est ajoutée ou change de statut."""
+        return self._rentals_version
+
+    def get_versions(self) -> Dict[str, int]:
+        """
+        Versions croissantes par type d'entité : "vehicles" et "customers" changent à chaque ajout,
+        modification ou suppression, "rentals" comme get_rentals_version.
+        """
+        return {"vehicles": self._vehicles_version, "customers": self._customers_version,
+                "rentals": self._rentals_version}
+
+    def get_projection(self, name: str):
+        """
+        Projection prête à afficher (voir core.projections.PROJECTIONS : "active_rentals",
+        "active_rental_choices", "completed_rentals", "available_vehicles"). Elle n'est reconstruite
+        que si les véhicules, clients ou locations dont elle dépend ont changé ; le résultat est
+        partagé entre les appelants et ne doit pas être modifié.
+        """
+        return self._projections.get(name)
+
+    def _find_overlap(self, vehicle_id: int, start_date: datetime.date, end_date: datetime.date) -> Optional[Rental]:
+        """Cherche une réservation du véhicule qui chevauche la période, en mémoire puis dans le stockage."""
+        existing_rental = self._booking_index(vehicle_id).find_overlap(start_date, end_date)
+        if existing_rental is None:
+            existing_rental = self._find_stored_overlap(vehicle_id, start_date, end_date)
+        return existing_rental
+
+    def _find_stored_overlap(self, vehicle_id: int, start_date: datetime.date, end_date: datetime.date) -> Optional[Rental]:
+        """Chevauchement avec une location restée dans le stockage (historique non chargé)."""
+        if self._history_loaded:
+            return None
+        # Une location déjà chargée a été vérifiée dans l'index : la mémoire fait foi pour elle
+        stored_rental_id = self.storage.find_overlap(vehicle_id, start_date, end_date, skip=self._registry)
+        return self.find_rental(stored_rental_id) if stored_rental_id is not None else None
+
+    def _update_occupancy(self, vehicle_id: int, start_date: datetime.date, end_date: datetime.date, delta: int):
+        """Répercute une réservation ajoutée (1) ou des jours libérés (-1) sur le calendrier d'occupation (verrou des index)."""
+        for changes in self._occupancy_changes.values():
+            changes.append((vehicle_id, start_date, end_date, delta))
+        if self._occupancy is not None and not self._occupancy.book(vehicle_id, start_date, end_date, delta):
+            self._occupancy = None  # Véhicule inconnu du calendrier : reconstruit à la prochaine demande
+
+    def _occupancy_calendar(self, start_date: Optional[datetime.date], days: int):
+        """
+        Calendrier d'occupation de la fenêtre demandée (verrou du catalogue en lecture détenu par l'appelant,
+        pas celui des index : les réductions sur le calendrier retourné se font sous ce verrou).
+        Il est reconstruit si la fenêtre ou les véhicules ont changé, sinon tenu à jour réservation par réservation.
+        La reconstruction (historique stocké, matrice NumPy) se fait hors du verrou des index pour ne pas bloquer
+        les réservations et les retours : seules les périodes sont copiées sous le verrou, et les changements
+        faits pendant la construction sont notés puis rejoués sur le nouveau calendrier avant de l'installer.
+        """
+        from core.occupancy import OccupancyCalendar  # NumPy n'est chargé que pour ce rapport
+
+        first_day = start_date or datetime.date.today()
+        with self._index_lock:
+            calendar = self._occupancy
+            if (calendar is not None and calendar.covers(first_day, days)
+                    and self._occupancy_vehicles_version == self._vehicles_version):
+                return calendar
+        last_day = first_day + datetime.timedelta(days=days - 1)
+        if not self._history_loaded:
+            # Locations de la fenêtre restées dans le stockage (fenêtre passée) : chargées dans les index
+            for _, rental_id in self.storage.find_overlapping_rentals(first_day - datetime.timedelta(days=1),
+                                                                      last_day + datetime.timedelta(days=1)):
+                self.find_rental(rental_id)
+        vehicles = list(self.vehicles.values())  # Stable : le verrou du catalogue est détenu en lecture
+        changes: List[Tuple[int, datetime.date, datetime.date, int]] = []
+        with self._index_lock:
+            periods = [(vehicle_id, start, end) for vehicle_id, index in self._bookings.items()
+                       for start, end in index.periods_between(first_day, last_day)]
+            self._occupancy_changes[id(changes)] = changes
+        try:
+            calendar = OccupancyCalendar(first_day, days, vehicles, periods)
+        except Exception:
+            with self._index_lock:
+                del self._occupancy_changes[id(changes)]
+            raise
+        with self._index_lock:
+            del self._occupancy_changes[id(changes)]
+            if all(calendar.book(*change) for change in changes):
+                self._occupancy = calendar
+                self._occupancy_vehicles_version = self._vehicles_version
+        return calendar
+
+    def get_free_vehicle_counts(self, start_date: Optional[datetime.date] = None,
+                                days: int = OCCUPANCY_DAYS) -> Dict[str, List[int]]:
+        """
+        Nombre de véhicules libres (sans réservation) chaque jour de [start_date, start_date + days[,
+        par catégorie. start_date vaut aujourd'hui par défaut.
+        """
+        with self._catalog_lock.read():
+            calendar = self._occupancy_calendar(start_date, days)
+            with self._index_lock:
+                return {category: free.tolist() for category, free in calendar.free_counts().items()}
+
+    def get_vehicle_utilization(self, start_date: Optional[datetime.date] = None,
+                                days: int = OCCUPANCY_DAYS) -> List[Tuple[Vehicle, float]]:
+        """Pourcentage de jours réservés de chaque véhicule sur la fenêtre, du plus au moins utilisé."""
+        with self._catalog_lock.read():
+            calendar = self._occupancy_calendar(start_date, days)
+            with self._index_lock:
+                usage = calendar.utilization()
+            order = usage.argsort(kind="stable")[::-1]
+            return [(self.vehicles[int(calendar.vehicle_ids[row])], float(usage[row])) for row in order]
+
+    def get_occupancy_heatmap(self, start_date: Optional[datetime.date] = None,
+                              days: int = OCCUPANCY_DAYS) -> List[Dict[str, object]]:
+        """
+        Données de la carte de chaleur d'occupation : une ligne par (jour, catégorie) avec le nombre
+        de véhicules libres, la taille de la flotte et le taux d'occupation.
+        """
+        with self._catalog_lock.read():
+            calendar = self._occupancy_calendar(start_date, days)
+            with self._index_lock:
+                return calendar.heatmap()
+
+    def _booking_index(self, vehicle_id: int) -> BookingIndex:
+        index = self._bookings.get(vehicle_id)
+        if index is None:
+            index = self._bookings[vehicle_id] = BookingIndex()
+        return index
+
+    def cancel_rental(self, rental_id: int) -> bool:
+        """
+        Annule une location active : la période réservée est libérée
+        et le véhicule redevient disponible.
+        """
+        rental = self.find_rental(rental_id)
+        if not rental:
+            print(f"Erreur: Location ID {rental_id} non trouvée.")
+            return False
+        with self._vehicle_locks.hold((rental.vehicle.id,)):
+            if not rental.is_active:
+                print(f"Erreur: La location ID {rental_id} n'est pas active et ne peut pas être annulée.")
+                return False
+
+            with self._index_lock:
+                rental.set_status("cancelled")
+                # Index des réservations et calendrier modifiés ensemble : une reconstruction du calendrier
+                # (sous ce verrou) ne voit jamais l'un à jour et pas l'autre
+                self._booking_index(rental.vehicle.id).remove(rental)
+                self._update_occupancy(rental.vehicle.id, rental.start_date, rental.end_date, -1)
+            vehicle = self.find_vehicle(rental.vehicle.id)
+            with self.storage.batch():
+                self.storage.save_rental(rental)
+                if vehicle:
+                    vehicle.set_status("available")
+                    self.storage.save_vehicle(vehicle)
+
+        print(f"Location {rental_id} annulée.")
+        return True
 
     def find_rental(self, rental_id: int) -> Optional[Rental]:
-        for rental in self.rentals:
-            if rental.id == rental_id:
-                return rental
-        return None
+        rental = self._registry.get(rental_id)
+        if rental is None and not self._history_loaded:
+            with self._index_lock:
+                rental = self._registry.get(rental_id)  # Un autre thread a pu la charger entre-temps
+                if rental is None:
+                    # Location terminée restée dans le stockage : on la recharge à la demande
+                    rental = self.storage.load_rental(self, rental_id)
+                    if rental is not None:
+                        self._index_rental(rental, counted=True)
+        return rental
 
-    def get_all_rentals(self) -> List[Rental]:
-        return self.rentals
+    def get_all_rentals(self, start: int = 0) -> List[Rental]:
+        """
+        Toutes les locations, par ID croissant. La liste retournée est une copie : elle ne bouge plus.
+        start : saute les start premières, déjà lues par un appel précédent (les nouvelles locations
+        sont ajoutées en fin de liste).
+        """
+        if not self._history_loaded:
+            with self._index_lock:
+                if not self._history_loaded:
+                    self._index_rentals(self.storage.load_rentals(self, self._registry), counted=True)
+                    self.rentals.sort(key=lambda r: r.id)
+                    self._history_loaded = True
+        return self.rentals[start:]
 
     def get_current_rentals(self) -> List[Rental]:
-        return [r for r in self.rentals if r.is_active]
+        return self._registry.active()
+
+    def get_customer_rental_history(self, customer_id: int) -> List[Rental]:
+        """Retourne toutes les locations d'un client, dans l'ordre de création."""
+        if not self._history_loaded:
+            with self._index_lock:
+                self._index_rentals(self.storage.load_rentals(self, self._registry, customer_id=customer_id), counted=True)
+            return sorted(self._registry.for_customer(customer_id), key=lambda r: r.id)
+        return self._registry.for_customer(customer_id)
+
+    def get_vehicle_rental_history(self, vehicle_id: int) -> List[Rental]:
+        """Retourne toutes les locations d'un véhicule, dans l'ordre de création."""
+        if not self._history_loaded:
+            with self._index_lock:
+                self._index_rentals(self.storage.load_rentals(self, self._registry, vehicle_id=vehicle_id), counted=True)
+            return sorted(self._registry.for_vehicle(vehicle_id), key=lambda r: r.id)
+        return self._registry.for_vehicle(vehicle_id)
 
     def end_rental(self, rental_id: int, return_date: datetime.date) -> Optional[float]:
         """
@@ -208,6 +1166,11 @@ class CarRentalSystem:
         if not rental:
             print(f"Erreur: Location ID {rental_id} non trouvée.")
             return None
+        with self._vehicle_locks.hold((rental.vehicle.id,)):
+            return self._end_rental(rental, return_date)
+
+    def _end_rental(self, rental: Rental, return_date: datetime.date) -> Optional[float]:
+        rental_id = rental.id
         if not rental.is_active:
             print(f"Erreur: La location ID {rental_id} n'est pas active et ne peut pas être terminée.")
             return None
@@ -219,7 +1182,13 @@ class CarRentalSystem:
             print(f"Erreur lors de la fin de location {rental_id}: {e}")
             return None
 
-        rental.set_status("completed") # Marque la location comme complétée
+        with self._index_lock:
+            rental.set_status("completed") # Marque la location comme complétée
+
+            # Un retour anticipé libère le reste de la période réservée
+            if return_date < rental.end_date:
+                self._booking_index(rental.vehicle.id).shorten(rental, return_date)
+                self._update_occupancy(rental.vehicle.id, return_date + datetime.timedelta(days=1), rental.end_date, -1)
 
         # Mettre à jour l'état du véhicule : il devient disponible.
         vehicle = self.find_vehicle(rental.vehicle.id)
@@ -233,18 +1202,156 @@ class CarRentalSystem:
         else:
             print(f"Avertissement: Véhicule associé à la location {rental_id} (ID {rental.vehicle.id}) non trouvé lors du retour.")
 
+        with self.storage.batch():
+            self.storage.save_rental(rental)
+            if vehicle:
+                self.storage.save_vehicle(vehicle)
+
         print(f"Location {rental_id} terminée. Coût final: {final_cost:.2f}€ (Pénalité: {rental.penalty_amount:.2f}€).")
         return final_cost
 
+    def end_rentals_batch(self, returns: Iterable[Tuple[int, datetime.date]],
+                          atomic: bool = False) -> List[ReturnResult]:
+        """
+        Termine un lot de locations (clôture de fin de journée). Chaque retour est un tuple
+        (rental_id, return_date).
+
+        Tout le lot est d'abord validé (location connue, active, présente une seule fois dans le lot,
+        date de retour postérieure au début), puis les coûts finaux et pénalités sont calculés en une fois
+        par Rental.pricing.final_costs_many : mêmes montants qu'avec end_rental. Les véhicules du lot sont
+        verrouillés ensemble, les statuts et agrégats mis à jour sous une seule prise du verrou des index,
+        et le stockage enregistre tout le lot en une transaction.
+
+        atomic=False (au mieux) : les retours valides sont traités, les autres refusés.
+        atomic=True (tout ou rien) : aucun retour n'est traité si un seul est refusé.
+
+        Retourne un ReturnResult par retour, dans l'ordre du lot.
+        """
+        returns = list(returns)
+        rentals: Dict[int, Rental] = {}
+        for rental_id, _ in returns:
+            rental = self.find_rental(rental_id)
+            if rental is not None:
+                rentals[rental_id] = rental
+
+        with self._vehicle_locks.hold(rental.vehicle.id for rental in rentals.values()):
+            return self._end_checked_rentals(returns, rentals, atomic)
+
+    def _end_checked_rentals(self, returns: List[Tuple[int, datetime.date]], rentals: Dict[int, Rental],
+                             atomic: bool) -> List[ReturnResult]:
+        # Validation de tout le lot, verrous des véhicules détenus : les statuts ne bougent plus
+        results: List[Optional[ReturnResult]] = [None] * len(returns)
+        accepted: List[int] = []
+        seen = set()
+        for position, (rental_id, return_date) in enumerate(returns):
+            rental = rentals.get(rental_id)
+            if rental is None:
+                error = f"Erreur: Location ID {rental_id} non trouvée."
+            elif rental_id in seen:
+                error = f"Erreur: La location ID {rental_id} figure plusieurs fois dans le lot."
+            elif not rental.is_active:
+                error = f"Erreur: La location ID {rental_id} n'est pas active et ne peut pas être terminée."
+            elif return_date < rental.start_date:
+                error = (f"Erreur lors de la fin de location {rental_id}: "
+                         f"La date de retour ne peut pas être antérieure à la date de début de location.")
+            else:
+                error = None
+                accepted.append(position)
+            seen.add(rental_id)
+            if error:
+                results[position] = ReturnResult(rental_id, None, 0.0, error)
+
+        if atomic and len(accepted) < len(returns):
+            cancelled = "Erreur: Retours groupés annulés : au moins un autre retour du lot a été refusé."
+            return [result or ReturnResult(rental_id, None, 0.0, cancelled)
+                    for result, (rental_id, _) in zip(results, returns)]
+        if not accepted:
+            return results
+
+        ended = [rentals[returns[position][0]] for position in accepted]
+        costs, penalties = Rental.pricing.final_costs_many(
+            [rental.vehicle.daily_rate for rental in ended], [rental.vehicle.category for rental in ended],
+            [rental.start_date for rental in ended], [rental.end_date for rental in ended],
+            [returns[position][1] for position in accepted])
+
+        vehicles = []
+        with self._index_lock:
+            for position, rental, cost, penalty in zip(accepted, ended, costs.tolist(), penalties.tolist()):
+                return_date = returns[position][1]
+                rental.actual_return_date = return_date
+                rental.penalty_amount = penalty
+                rental.final_billed_amount = cost
+                rental.set_status("completed")  # Agrégats mis à jour par les abonnés (RentalStats)
+                results[position] = ReturnResult(rental.id, cost, penalty, None)
+                if return_date < rental.end_date:
+                    self._booking_index(rental.vehicle.id).shorten(rental, return_date)
+                    self._update_occupancy(rental.vehicle.id, return_date + datetime.timedelta(days=1),
+                                           rental.end_date, -1)
+                vehicle = self.find_vehicle(rental.vehicle.id)
+                if vehicle:
+                    vehicle.set_status("available")
+                    vehicles.append(vehicle)
+
+        with self.storage.batch():
+            for rental in ended:
+                self.storage.save_rental(rental)
+            for vehicle in vehicles:
+                self.storage.save_vehicle(vehicle)
+        return results
+
     def calculate_total_revenue(self) -> float:
         """
-        Calcule le chiffre d'affaires total basé sur les locations terminées
+        Retourne le chiffre d'affaires total basé sur les locations terminées
         et dont le montant final a été facturé.
+        Le total est maintenu à chaque fin de location : aucun parcours de l'historique.
+        """
+        return self._stats.total_revenue
+
+    def revenue_between(self, start_date: datetime.date, end_date: datetime.date,
+                        category: Optional[str] = None) -> float:
+        """
+        Chiffre d'affaires des locations terminées dont la date de retour effective est comprise
+        entre start_date et end_date inclus, pour une catégorie de véhicule ou toutes (None).
+        Temps logarithmique, quelle que soit la longueur de la période (voir RevenueIndex).
+        """
+        with self._index_lock:
+            return self._stats.revenue.revenue_between(start_date, end_date, category)
+
+    def revenue_by_month(self, start_date: datetime.date, end_date: datetime.date,
+                         category: Optional[str] = None) -> List[Tuple[datetime.date, float]]:
+        """
+        Chiffre d'affaires de chaque mois touché par [start_date, end_date] (premier et dernier mois
+        limités à la période) : [(premier jour du mois, montant)], dans l'ordre chronologique.
+        """
+        months = []
+        month = start_date.replace(day=1)
+        with self._index_lock:
+            while month <= end_date:
+                next_month = (month + datetime.timedelta(days=31)).replace(day=1)
+                window_start = max(month, start_date)
+                window_end = min(next_month - datetime.timedelta(days=1), end_date)
+                months.append((month, self._stats.revenue.revenue_between(window_start, window_end, category)))
+                month = next_month
+        return months
+
+    def get_revenue_bounds(self) -> Optional[Tuple[datetime.date, datetime.date]]:
+        """Dates du premier et du dernier retour facturé, ou None si aucun (bornes du sélecteur de période)."""
+        with self._index_lock:
+            return self._stats.revenue.bounds()
+
+    def get_category_bookings(self) -> List[int]:
+        """IDs des locations réservées par catégorie et encore réattribuables (reoptimize_category_bookings)."""
+        with self._index_lock:
+            return sorted(self._category_bookings)
+
+    def get_revenue_categories(self) -> List[str]:
+        """Catégories de véhicules ayant du chiffre d'affaires, triées."""
+        with self._index_lock:
+            return self._stats.revenue.categories()
+
+    def get_rental_statistics(self) -> Dict[str, object]:
+        """
+        Statistiques globales sur l'activité de location, calculées en temps constant :
+        nombre de locations par statut, chiffre d'affaires, pénalités et chiffre d'affaires par catégorie.
         """
-        total = 0.0
-        for rental in self.rentals:
-            # On additionne seulement les locations terminées (completed)
-            # et pour lesquelles un montant final a été enregistré.
-            if rental.status == "completed" and rental.final_billed_amount is not None:
-                total += rental.final_billed_amount
-        return total
+        return self._stats.as_dict()
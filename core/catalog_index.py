@@ -0,0 +1,113 @@
+import bisect
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Au-delà de ce nombre d'entrées, un lot est fusionné en une seule recopie de la liste plutôt qu'inséré
+# entrée par entrée (chaque insertion décale toute la fin de la liste).
+INSORT_MAX_BATCH = 16
+
+
+def insert_sorted(target: list, entries: list):
+    """
+    Ajoute entries à la liste triée target, en gardant l'ordre. Un gros lot est trié à part puis placé
+    par dichotomie : seules ses entrées sont comparées, les éléments déjà en place sont seulement recopiés.
+    """
+    if len(entries) <= INSORT_MAX_BATCH:
+        for entry in entries:
+            bisect.insort(target, entry)
+        return
+    merged = []
+    start = 0
+    for entry in sorted(entries):
+        pos = bisect.bisect_right(target, entry, start)
+        merged.extend(target[start:pos])
+        merged.append(entry)
+        start = pos
+    merged.extend(target[start:])
+    target[:] = merged
+
+
+class Page(NamedTuple):
+    """Une page de résultats d'une requête sur le catalogue."""
+    items: list
+    offset: int
+    limit: int
+    total: Optional[int]  # Nombre total de résultats ; None si inconnu (filtre texte : le parcours s'arrête à la page)
+    has_more: bool
+
+
+class CatalogIndex:
+    """
+    Index triés d'un catalogue (véhicules ou clients) pour lister une page sans parcourir tout le catalogue.
+
+    Pour chaque champ triable, une liste [(clé, id)] triée, tenue à jour à chaque ajout, modification ou
+    suppression ; si un champ de partition est donné (ex. la catégorie), une liste de plus par valeur de ce
+    champ. Une page triée, éventuellement limitée à une partition, se lit par tranche de liste : son coût
+    ne dépend que de sa taille, pas du nombre d'éléments du catalogue.
+    Les appelants synchronisent l'accès (verrou du catalogue de CarRentalSystem).
+    """
+
+    def __init__(self, sort_keys: Dict[str, Callable[[object], object]], partition: Optional[str] = None):
+        self.sort_keys = sort_keys
+        self.partition = partition
+        self._sorted: Dict[Tuple[str, Optional[str]], List[tuple]] = {}  # (champ, partition) -> [(clé, id)] trié
+        self._keys: Dict[int, Tuple[Optional[str], Tuple[object, ...]]] = {}  # id -> (partition, clés indexées)
+
+    def _entries(self, item) -> Tuple[Optional[str], Tuple[object, ...]]:
+        part = getattr(item, self.partition) if self.partition else None
+        return part, tuple(key(item) for key in self.sort_keys.values())
+
+    def _scopes(self, part: Optional[str]) -> Tuple[Optional[str], ...]:
+        return (None, part) if self.partition else (None,)
+
+    def add_many(self, items: Iterable[object]):
+        """
+        Ajoute un lot d'éléments, avec une seule mise à jour par liste touchée (voir insert_sorted).
+        """
+        added: Dict[Tuple[str, Optional[str]], List[tuple]] = {}
+        for item in items:
+            part, keys = self._entries(item)
+            self._keys[item.id] = (part, keys)
+            for field, key in zip(self.sort_keys, keys):
+                entry = (key, item.id)  # Même tuple dans la liste globale et dans celle de la partition
+                for scope in self._scopes(part):
+                    added.setdefault((field, scope), []).append(entry)
+        for scope, entries in added.items():
+            insert_sorted(self._sorted.setdefault(scope, []), entries)
+
+    def add(self, item):
+        self.add_many((item,))
+
+    def remove(self, item_id: int):
+        """Retire un élément avec les clés sous lesquelles il a été indexé (à appeler avant de le modifier)."""
+        indexed = self._keys.pop(item_id, None)
+        if indexed is None:
+            return
+        part, keys = indexed
+        for field, key in zip(self.sort_keys, keys):
+            for scope in self._scopes(part):
+                entries = self._sorted[(field, scope)]
+                pos = bisect.bisect_left(entries, (key, item_id))
+                if pos < len(entries) and entries[pos] == (key, item_id):
+                    del entries[pos]
+
+    def count(self, part: Optional[str] = None) -> int:
+        if part is None:
+            return len(self._keys)
+        return len(self._sorted.get((next(iter(self.sort_keys)), part), ()))
+
+    def page_ids(self, sort_by: str, offset: int, limit: int, descending: bool = False,
+                 part: Optional[str] = None) -> List[int]:
+        """IDs de la tranche [offset, offset + limit) dans l'ordre demandé."""
+        entries = self._sorted.get((sort_by, part), [])
+        if descending:
+            stop = max(len(entries) - offset, 0)
+            window = entries[max(stop - limit, 0):stop]
+            return [item_id for _, item_id in reversed(window)]
+        return [item_id for _, item_id in entries[offset:offset + limit]]
+
+    def iter_ids(self, sort_by: str, descending: bool = False, part: Optional[str] = None) -> Iterator[int]:
+        """IDs dans l'ordre demandé, pour les filtres qui ne correspondent pas à une partition."""
+        entries = self._sorted.get((sort_by, part), [])
+        for _, item_id in (reversed(entries) if descending else entries):
+            yield item_id
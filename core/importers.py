@@ -0,0 +1,113 @@
+import csv
+import io
+import itertools
+import json
+from typing import IO, Iterable, Iterator, List, Tuple, TypeVar
+
+from models.vehicle import Vehicle
+from models.customer import Customer
+
+T = TypeVar("T")
+
+VEHICLE_FIELDS = ("brand", "model", "license_plate", "daily_rate", "category", "state")
+CUSTOMER_FIELDS = ("first_name", "last_name", "age", "driver_license_number", "email")
+
+
+class ImportReport:
+    """
+    Résultat d'un import en masse : nombre de lignes importées et lignes rejetées.
+    Seules les max_errors premières erreurs sont conservées, pour garder une mémoire bornée.
+    """
+
+    def __init__(self, max_errors: int = 1000):
+        self.imported = 0
+        self.rejected_count = 0
+        self.rejected: List[Tuple[int, str]] = []  # (numéro de ligne, message d'erreur)
+        self.max_errors = max_errors
+
+    def reject(self, line_number: int, message: str):
+        self.rejected_count += 1
+        if len(self.rejected) < self.max_errors:
+            self.rejected.append((line_number, message))
+
+    def __str__(self):
+        return f"{self.imported} ligne(s) importée(s), {self.rejected_count} rejetée(s)"
+
+
+def read_records(stream: IO, file_format: str) -> Iterator[dict]:
+    """
+    Lit un fichier CSV (avec ligne d'en-tête) ou JSONL ligne par ligne et produit un dict par enregistrement.
+    Accepte un flux texte ou binaire (ex. fichier envoyé via Streamlit).
+    """
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(stream, "mode", ""):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        yield from csv.DictReader(stream)
+    elif file_format == "jsonl":
+        for line in stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield {"_error": f"JSON invalide : {e}"}
+    else:
+        raise ValueError(f"Format d'import non supporté : {file_format!r} (attendu : csv ou jsonl).")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _fields(record: dict, names: Tuple[str, ...], numbers: Tuple[str, ...] = ()) -> dict:
+    """
+    Champs names de l'enregistrement, textes sans espaces autour. Les champs hors de numbers doivent être
+    des textes : un enregistrement mal typé (ligne JSONL null, marque numérique...) est rejeté par ValueError.
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"Enregistrement invalide : objet attendu, {type(record).__name__} reçu.")
+    if "_error" in record:
+        raise ValueError(record["_error"])
+    missing = [name for name in names if name not in record]
+    if missing:
+        raise ValueError(f"Colonne(s) manquante(s) : {', '.join(missing)}.")
+    not_text = [name for name in names if name not in numbers and not isinstance(record[name], str)]
+    if not_text:
+        raise ValueError(f"Colonne(s) devant contenir du texte : {', '.join(not_text)}.")
+    return {name: record[name].strip() if isinstance(record[name], str) else record[name] for name in names}
+
+
+def build_vehicle(record: dict) -> Vehicle:
+    """Crée un Vehicle à partir d'un enregistrement ; les validations sont celles de Vehicle.__init__."""
+    fields = _fields(record, VEHICLE_FIELDS, numbers=("daily_rate",))
+    try:
+        fields["daily_rate"] = float(fields["daily_rate"])
+    except (TypeError, ValueError):
+        raise ValueError("Le tarif journalier doit être un nombre positif.")
+    return Vehicle(**fields)
+
+
+def build_customer(record: dict) -> Customer:
+    """Crée un Customer à partir d'un enregistrement ; les validations sont celles de Customer.__init__."""
+    fields = _fields(record, CUSTOMER_FIELDS, numbers=("age",))
+    try:
+        fields["age"] = int(fields["age"])
+    except (TypeError, ValueError):
+        raise ValueError("L'âge doit être un entier positif.")
+    return Customer(**fields)
+
+
+def validated(records: Iterable[dict], build, report: ImportReport) -> Iterator[Tuple[int, T]]:
+    """
+    Construit les objets valides, avec leur numéro de ligne (pour rejeter plus tard un doublon),
+    et consigne les lignes rejetées dans le rapport, sans interrompre l'import.
+    """
+    for line_number, record in enumerate(records, start=1):
+        try:
+            yield line_number, build(record)
+        except ValueError as e:
+            report.reject(line_number, str(e))
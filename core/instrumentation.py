@@ -0,0 +1,178 @@
+import contextlib
+import cProfile
+import csv
+import functools
+import io
+import pstats
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Taille de la collection parcourue par les méthodes qui balaient tout un catalogue
+# (les autres méthodes qui retournent une liste comptent la taille de la liste retournée)
+SCANNED_COLLECTIONS: Dict[str, Callable[[object], int]] = {
+    "get_all_vehicles": lambda system: len(system.vehicles),
+    "get_available_vehicles": lambda system: len(system.vehicles),
+    "find_available": lambda system: len(system.vehicles),
+    "get_all_customers": lambda system: len(system.customers),
+    "get_all_rentals": lambda system: len(system.rentals),
+}
+
+_DISABLED = contextlib.nullcontext()
+
+
+class OperationStats:
+    """Mesures d'une opération : nombre d'appels, temps cumulé et maximum, derniers échantillons."""
+    __slots__ = ("calls", "total", "max", "samples", "scanned_total", "scanned_max")
+
+    def __init__(self, sample_size: int):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=sample_size)  # Pour les percentiles, sur les derniers appels
+        self.scanned_total = 0
+        self.scanned_max: Optional[int] = None  # None : opération sans collection parcourue
+
+
+class Instrumentation:
+    """
+    Mesures optionnelles des appels à CarRentalSystem et des phases d'affichage des pages.
+
+    Désactivée, elle ne coûte presque rien : les méthodes du système ne sont pas enveloppées
+    et phase() retourne un contexte vide. Activée, chaque méthode publique des systèmes attachés
+    est remplacée, sur l'instance, par une enveloppe qui mesure sa durée et la taille de la
+    collection parcourue ; disable() retire les enveloppes.
+    """
+
+    def __init__(self, sample_size: int = 1024):
+        self.enabled = False
+        self.sample_size = sample_size
+        self._systems: List[object] = []
+        self._stats: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, system):
+        """Mesure les méthodes publiques de system (dès maintenant si l'instrumentation est active)."""
+        self._systems.append(system)
+        if self.enabled:
+            self._wrap(system)
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            for system in self._systems:
+                self._wrap(system)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            for system in self._systems:
+                for name in self._method_names(system):
+                    system.__dict__.pop(name, None)  # La méthode de la classe redevient visible
+
+    @staticmethod
+    def _method_names(system) -> List[str]:
+        return [name for name, attribute in vars(type(system)).items()
+                if not name.startswith("_") and callable(attribute) and not isinstance(attribute, (staticmethod, type))]
+
+    def _wrap(self, system):
+        prefix = type(system).__name__
+        for name in self._method_names(system):
+            setattr(system, name, self._measured(f"{prefix}.{name}", getattr(system, name),
+                                                 SCANNED_COLLECTIONS.get(name), system))
+
+    def _measured(self, key: str, method, scanned: Optional[Callable[[object], int]], system):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            began = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - began
+            if scanned is not None:
+                size = scanned(system)
+            else:
+                size = len(result) if isinstance(result, list) else None
+            self.record(key, elapsed, size)
+            return result
+        return wrapper
+
+    def record(self, key: str, seconds: float, scanned: Optional[int] = None):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = OperationStats(self.sample_size)
+            stats.calls += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.samples.append(seconds)
+            if scanned is not None:
+                stats.scanned_total += scanned
+                stats.scanned_max = scanned if stats.scanned_max is None else max(stats.scanned_max, scanned)
+
+    def phase(self, page: str, phase: str):
+        """Contexte qui chronomètre une phase du rendu d'une page (données, mise en forme, affichage)."""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(f"page {page} : {phase}")
+
+    @contextlib.contextmanager
+    def _timed(self, key: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(key, time.perf_counter() - began)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def rows(self) -> List[dict]:
+        """Une ligne par opération mesurée, la plus coûteuse (temps cumulé) en premier. Durées en ms."""
+        with self._lock:
+            snapshot = [(key, stats.calls, stats.total, stats.max, sorted(stats.samples),
+                         stats.scanned_total, stats.scanned_max) for key, stats in self._stats.items()]
+        rows = []
+        for key, calls, total, longest, samples, scanned_total, scanned_max in snapshot:
+            rows.append({
+                "Opération": key,
+                "Appels": calls,
+                "Total (ms)": round(total * 1000, 3),
+                "Moyenne (ms)": round(total / calls * 1000, 4),
+                "p50 (ms)": round(_percentile(samples, 0.5) * 1000, 4),
+                "p95 (ms)": round(_percentile(samples, 0.95) * 1000, 4),
+                "p99 (ms)": round(_percentile(samples, 0.99) * 1000, 4),
+                "Max (ms)": round(longest * 1000, 4),
+                "Éléments parcourus (moy.)": round(scanned_total / calls, 1) if scanned_max is not None else None,
+                "Éléments parcourus (max)": scanned_max,
+            })
+        rows.sort(key=lambda row: -row["Total (ms)"])
+        return rows
+
+    def to_csv(self) -> str:
+        rows = self.rows()
+        output = io.StringIO()
+        if rows:
+            writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return output.getvalue()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def profile(function: Callable[[], object], sort: str = "cumulative", limit: int = 40) -> Tuple[object, str]:
+    """Exécute function sous cProfile ; retourne son résultat et les `limit` fonctions les plus coûteuses."""
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(function)
+    finally:
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).strip_dirs().sort_stats(sort).print_stats(limit)
+    return result, output.getvalue()
@@ -0,0 +1,298 @@
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+from models.vehicle import Vehicle
+from models.customer import Customer
+from models.rental import Rental
+from core.storage import RentalStorage, StoredState
+
+if TYPE_CHECKING:
+    from core.car_rental_system import CarRentalSystem
+
+
+# Types d'enregistrement du journal (premier élément de chaque ligne)
+VEHICLE = "v"
+VEHICLE_REMOVED = "-v"
+CUSTOMER = "c"
+CUSTOMER_REMOVED = "-c"
+RENTAL = "r"
+CATEGORY_BOOKING = "b"  # Location réservée par catégorie (book_category), réattribuable
+
+JOURNAL_PREFIX = "journal-"
+SNAPSHOT_PREFIX = "snapshot-"
+
+
+def _ordinal(value: Optional[datetime.date]) -> Optional[int]:
+    return value.toordinal() if value is not None else None
+
+
+def _from_ordinal(value: Optional[int]) -> Optional[datetime.date]:
+    return datetime.date.fromordinal(value) if value is not None else None
+
+
+def vehicle_record(vehicle: Vehicle) -> list:
+    return [VEHICLE, vehicle.id, vehicle.brand, vehicle.model, vehicle.license_plate, vehicle.daily_rate,
+            vehicle.category, vehicle.state, vehicle.status, _ordinal(vehicle.last_maintenance_date),
+            vehicle.is_available]
+
+
+def customer_record(customer: Customer) -> list:
+    return [CUSTOMER, customer.id, customer.first_name, customer.last_name, customer.age,
+            customer.driver_license_number, customer.email]
+
+
+def rental_record(rental: Rental) -> list:
+    return [RENTAL, rental.id, rental.customer.id, rental.vehicle.id, _ordinal(rental.start_date),
+            _ordinal(rental.end_date), rental.status, rental.final_billed_amount,
+            _ordinal(rental.actual_return_date), rental.penalty_amount]
+
+
+def _encode(record: list) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+class _ReplayState:
+    """Dernière version connue de chaque entité, obtenue en rejouant instantané puis journal."""
+
+    def __init__(self):
+        self.vehicles: Dict[int, list] = {}
+        self.customers: Dict[int, list] = {}
+        self.rentals: Dict[int, list] = {}
+        self.removed_vehicles = set()
+        self.removed_customers = set()
+        self.category_bookings = set()
+
+    def apply(self, record: list):
+        kind = record[0]
+        if kind == RENTAL:
+            self.rentals[record[1]] = record
+        elif kind == VEHICLE:
+            self.vehicles[record[1]] = record
+            self.removed_vehicles.discard(record[1])
+        elif kind == CUSTOMER:
+            self.customers[record[1]] = record
+            self.removed_customers.discard(record[1])
+        elif kind == CATEGORY_BOOKING:
+            self.category_bookings.add(record[1])
+        elif kind == VEHICLE_REMOVED:
+            self.removed_vehicles.add(record[1])
+        elif kind == CUSTOMER_REMOVED:
+            self.removed_customers.add(record[1])
+        else:
+            raise ValueError(f"Type d'enregistrement inconnu dans le journal : {kind!r}")
+
+    def to_stored_state(self) -> Optional[StoredState]:
+        if not self.vehicles and not self.customers:
+            return None
+        # Les véhicules et clients supprimés sont recréés pour l'historique, mais pas enregistrés dans le système.
+        # Les lignes écrites avant l'ajout de la disponibilité (10 champs) sont des véhicules disponibles
+        vehicles = {vehicle_id: Vehicle.restore(vehicle_id, *row[2:9], _from_ordinal(row[9]),
+                                                row[10] if len(row) > 10 else True)
+                    for vehicle_id, row in self.vehicles.items()}
+        customers = {customer_id: Customer.restore(customer_id, *row[2:7])
+                     for customer_id, row in self.customers.items()}
+        rentals = []
+        for rental_id in sorted(self.rentals):
+            (_, _, customer_id, vehicle_id, start, end, status,
+             final_billed_amount, actual_return, penalty_amount) = self.rentals[rental_id]
+            customer = customers[customer_id]
+            customer.rentals_history.append(rental_id)
+            rentals.append(Rental.restore(rental_id, customer, vehicles[vehicle_id], _from_ordinal(start),
+                                          _from_ordinal(end), status, final_billed_amount,
+                                          _from_ordinal(actual_return), penalty_amount))
+        return StoredState(
+            [vehicle for vehicle_id, vehicle in sorted(vehicles.items()) if vehicle_id not in self.removed_vehicles],
+            [customer for customer_id, customer in sorted(customers.items()) if customer_id not in self.removed_customers],
+            rentals, category_bookings=[rental.id for rental in rentals
+                                        if rental.id in self.category_bookings and rental.is_active])
+
+
+class JournalStorage(RentalStorage):
+    """
+    Stockage par journal en ajout seul, avec instantanés périodiques.
+
+    Chaque mutation du système est écrite comme une ligne JSON compacte (l'état de l'entité
+    modifiée) dans le segment de journal courant. Les fsync sont groupés : un seul fsync
+    toutes les fsync_every lignes ou toutes les fsync_interval secondes (group commit).
+    Le délai est vérifié à chaque écriture ; close() force le dernier fsync.
+    Toutes les snapshot_every lignes, un instantané complet est écrit et un nouveau segment
+    commence : au démarrage, on charge le dernier instantané et on ne rejoue que les segments suivants.
+    Les écritures de plusieurs threads sont sérialisées par un verrou interne.
+    """
+
+    def __init__(self, directory: str, fsync_every: int = 100, fsync_interval: float = 1.0,
+                 snapshot_every: int = 50000):
+        self.directory = directory
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        self._system: Optional["CarRentalSystem"] = None
+        self._file = None
+        self._segment = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._records_since_snapshot = 0
+        self._batches = threading.local()  # Profondeur des blocs batch() propre à chaque thread
+        self._lock = threading.RLock()
+
+    # --- Fichiers ---
+
+    def _path(self, prefix: str, number: int) -> str:
+        return os.path.join(self.directory, f"{prefix}{number:08d}.jsonl")
+
+    def _numbers(self, prefix: str) -> List[int]:
+        return sorted(int(name[len(prefix):-len(".jsonl")]) for name in os.listdir(self.directory)
+                      if name.startswith(prefix) and name.endswith(".jsonl"))
+
+    @staticmethod
+    def _read_records(path: str) -> Iterator[list]:
+        with open(path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt brutal : tout ce qui précède est valide.
+                    return
+
+    # --- Chargement ---
+
+    def load(self) -> Optional[StoredState]:
+        state = _ReplayState()
+        snapshots = self._numbers(SNAPSHOT_PREFIX)
+        base = snapshots[-1] if snapshots else 0
+        if snapshots:
+            for record in self._read_records(self._path(SNAPSHOT_PREFIX, base)):
+                state.apply(record)
+        for number in self._numbers(JOURNAL_PREFIX):
+            if number >= base:
+                for record in self._read_records(self._path(JOURNAL_PREFIX, number)):
+                    state.apply(record)
+                    self._records_since_snapshot += 1
+                self._segment = number
+        self._segment = max(self._segment, base)
+        return state.to_stored_state()
+
+    def attach(self, system: "CarRentalSystem"):
+        self._system = system
+        self._file = open(self._path(JOURNAL_PREFIX, self._segment), "a", encoding="utf-8")
+
+    # --- Écritures ---
+
+    def save_vehicle(self, vehicle: Vehicle):
+        self._append(vehicle_record(vehicle))
+
+    def delete_vehicle(self, vehicle_id: int):
+        self._append([VEHICLE_REMOVED, vehicle_id])
+
+    def save_customer(self, customer: Customer):
+        self._append(customer_record(customer))
+
+    def delete_customer(self, customer_id: int):
+        self._append([CUSTOMER_REMOVED, customer_id])
+
+    def save_rental(self, rental: Rental):
+        self._append(rental_record(rental))
+
+    def save_category_booking(self, rental_id: int):
+        self._append([CATEGORY_BOOKING, rental_id])
+
+    def _append(self, record: list):
+        line = _encode(record)
+        with self._lock:
+            if self._file is None:
+                return  # Écritures faites pendant le chargement : elles sont déjà dans le journal
+            self._file.write(line)
+            self._unsynced += 1
+            self._records_since_snapshot += 1
+            if getattr(self._batches, "depth", 0) == 0:
+                self._maybe_sync()
+
+    def _maybe_sync(self):
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.flush()
+        if self._records_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        self._batches.depth = getattr(self._batches, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._batches.depth -= 1
+            if self._batches.depth == 0:
+                with self._lock:
+                    self._maybe_sync()
+
+    def flush(self):
+        with self._lock:
+            if self._file is None or not self._unsynced:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def snapshot(self):
+        """
+        Écrit un instantané complet de l'état du système et ouvre un nouveau segment de journal.
+        Les segments et instantanés plus anciens sont supprimés une fois l'instantané en place.
+        """
+        if self._system is None:
+            return
+        with self._lock:
+            self.flush()
+            self._file.close()
+            self._segment += 1
+            path = self._path(SNAPSHOT_PREFIX, self._segment)
+            self._write_snapshot(path + ".tmp", self._snapshot_records(self._system))
+            os.replace(path + ".tmp", path)
+            self._file = open(self._path(JOURNAL_PREFIX, self._segment), "a", encoding="utf-8")
+            self._records_since_snapshot = 0
+            for prefix in (SNAPSHOT_PREFIX, JOURNAL_PREFIX):
+                for number in self._numbers(prefix):
+                    if number < self._segment:
+                        os.remove(self._path(prefix, number))
+
+    @staticmethod
+    def _snapshot_records(system: "CarRentalSystem") -> Iterable[list]:
+        rentals = system.get_all_rentals()
+        current_vehicles = {vehicle.id: vehicle for vehicle in system.get_all_vehicles()}
+        current_customers = {customer.id: customer for customer in system.get_all_customers()}
+        vehicles = {rental.vehicle.id: rental.vehicle for rental in rentals}
+        vehicles.update(current_vehicles)
+        customers = {rental.customer.id: rental.customer for rental in rentals}
+        customers.update(current_customers)
+        # Les véhicules et clients supprimés restent dans l'instantané pour l'historique des locations.
+        for vehicle_id, vehicle in vehicles.items():
+            yield vehicle_record(vehicle)
+            if vehicle_id not in current_vehicles:
+                yield [VEHICLE_REMOVED, vehicle_id]
+        for customer_id, customer in customers.items():
+            yield customer_record(customer)
+            if customer_id not in current_customers:
+                yield [CUSTOMER_REMOVED, customer_id]
+        for rental in rentals:
+            yield rental_record(rental)
+        for rental_id in system.get_category_bookings():
+            yield [CATEGORY_BOOKING, rental_id]
+
+    @staticmethod
+    def _write_snapshot(path: str, records: Iterable[list]):
+        with open(path, "w", encoding="utf-8") as snapshot:
+            snapshot.writelines(_encode(record) for record in records)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self.flush()
+                self._file.close()
+                self._file = None
@@ -0,0 +1,79 @@
+import contextlib
+import threading
+from typing import Dict, Hashable, Iterable, Iterator
+
+
+class RWLock:
+    """
+    Verrou lecteurs/rédacteur : plusieurs lectures en parallèle, une écriture exclusive.
+    Un rédacteur en attente passe avant les nouveaux lecteurs, pour ne pas être affamé.
+    Non réentrant : ne pas reprendre le verrou dans un thread qui le détient déjà.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class KeyedLocks:
+    """
+    Un verrou par clé (ex. un par véhicule), créé à la première utilisation.
+    hold() prend plusieurs verrous toujours dans l'ordre croissant des clés, ce qui évite les interblocages.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def lock(self, key: Hashable) -> threading.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.Lock())
+        return lock
+
+    @contextlib.contextmanager
+    def hold(self, keys: Iterable[Hashable]) -> Iterator[None]:
+        locks = [self.lock(key) for key in sorted(set(keys))]
+        acquired = []
+        try:
+            for lock in locks:
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
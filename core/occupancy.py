@@ -0,0 +1,113 @@
+import datetime
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from models.vehicle import Vehicle
+
+
+class OccupancyCalendar:
+    """
+    Calendrier d'occupation de la flotte : une matrice véhicules x jours sur une fenêtre
+    [first_day, first_day + days[, en NumPy.
+
+    Une réservation occupe tous les jours de son début à sa fin indexée, inclus. Le jour où un véhicule
+    est rendu peut être celui où commence la réservation suivante : chaque case compte donc les
+    réservations du jour (uint8) plutôt qu'un simple booléen, pour que libérer l'une ne libère pas
+    l'autre. Un jour est occupé dès que son compteur est positif.
+
+    Créer, annuler ou raccourcir une réservation ne touche que la ligne du véhicule (book) ; les jours
+    libres par catégorie, l'utilisation par véhicule et la carte de chaleur sont des réductions sur la
+    matrice. Les appelants synchronisent l'accès (verrou des index de CarRentalSystem).
+    """
+
+    def __init__(self, first_day: datetime.date, days: int, vehicles: List[Vehicle],
+                 periods: Iterable[Tuple[int, datetime.date, datetime.date]]):
+        """periods : réservations (vehicle_id, début, fin) ; celles hors de la fenêtre sont ignorées."""
+        self.first_day = first_day
+        self.days = days
+        self.vehicle_ids = np.array([vehicle.id for vehicle in vehicles], dtype=np.int64)
+        self._rows: Dict[int, int] = {vehicle.id: row for row, vehicle in enumerate(vehicles)}
+        category_codes: Dict[str, int] = {}
+        self.category_code = np.fromiter((category_codes.setdefault(vehicle.category, len(category_codes))
+                                          for vehicle in vehicles), dtype=np.int32, count=len(vehicles))
+        self.category_names = list(category_codes)
+
+        # Construction vectorisée : +1 au premier jour de chaque réservation, -1 après le dernier,
+        # puis somme cumulée le long des jours
+        periods = list(periods)
+        count = len(periods)
+        rows = np.fromiter((self._rows.get(vehicle_id, -1) for vehicle_id, _, _ in periods), dtype=np.int64, count=count)
+        base = first_day.toordinal()
+        firsts = np.fromiter((start.toordinal() for _, start, _ in periods), dtype=np.int64, count=count) - base
+        lasts = np.fromiter((end.toordinal() for _, _, end in periods), dtype=np.int64, count=count) - base + 1
+        firsts, lasts = np.maximum(firsts, 0), np.minimum(lasts, days)
+        keep = (rows >= 0) & (firsts < lasts)
+        rows, firsts, lasts = rows[keep], firsts[keep], lasts[keep]
+        width = days + 1
+        size = len(vehicles) * width
+        changes = (np.bincount(rows * width + firsts, minlength=size)
+                   - np.bincount(rows * width + lasts, minlength=size)).reshape(len(vehicles), width)
+        self._counts = np.cumsum(changes[:, :days], axis=1).astype(np.uint8)
+
+    def covers(self, first_day: datetime.date, days: int) -> bool:
+        return self.first_day == first_day and self.days == days
+
+    def _span(self, start_date: datetime.date, end_date: datetime.date):
+        """Colonnes [première, dernière + 1[ de la période dans la fenêtre, ou None si elle est en dehors."""
+        first = max((start_date - self.first_day).days, 0)
+        last = min((end_date - self.first_day).days + 1, self.days)
+        return (first, last) if first < last else None
+
+    def book(self, vehicle_id: int, start_date: datetime.date, end_date: datetime.date, delta: int = 1) -> bool:
+        """
+        Ajoute (delta=1) ou retire (delta=-1) une réservation des jours [start_date, end_date].
+        Retourne False si le véhicule n'a pas de ligne (ajouté depuis la construction) : le calendrier
+        est alors à reconstruire.
+        """
+        row = self._rows.get(vehicle_id)
+        if row is None:
+            return False
+        span = self._span(start_date, end_date)
+        if span is not None:
+            cells = self._counts[row, span[0]:span[1]]
+            if delta > 0:
+                cells += np.uint8(delta)
+            else:
+                cells -= np.minimum(cells, np.uint8(-delta))
+        return True
+
+    def dates(self) -> List[datetime.date]:
+        return [self.first_day + datetime.timedelta(days=offset) for offset in range(self.days)]
+
+    def occupied(self) -> np.ndarray:
+        """Matrice booléenne véhicules x jours (lignes dans l'ordre de vehicle_ids)."""
+        return self._counts > 0
+
+    def free_counts(self) -> Dict[str, np.ndarray]:
+        """Nombre de véhicules libres chaque jour de la fenêtre, par catégorie."""
+        free = ~self.occupied()
+        return {name: free[self.category_code == code].sum(axis=0)
+                for code, name in enumerate(self.category_names)}
+
+    def fleet_sizes(self) -> Dict[str, int]:
+        counts = np.bincount(self.category_code, minlength=len(self.category_names))
+        return {name: int(counts[code]) for code, name in enumerate(self.category_names)}
+
+    def utilization(self) -> np.ndarray:
+        """Pourcentage de jours occupés de chaque véhicule sur la fenêtre (ordre de vehicle_ids)."""
+        if not self.days:
+            return np.zeros(len(self.vehicle_ids))
+        return self.occupied().mean(axis=1) * 100.0
+
+    def heatmap(self) -> List[Dict[str, object]]:
+        """Une ligne par (jour, catégorie) : véhicules libres, taille de la flotte et taux d'occupation."""
+        sizes = self.fleet_sizes()
+        days = self.dates()
+        rows = []
+        for name, free in self.free_counts().items():
+            size = sizes[name]
+            for day, free_count in zip(days, free.tolist()):
+                rows.append({"Jour": day, "Catégorie": name, "Libres": free_count, "Flotte": size,
+                             "Occupation (%)": round(100.0 * (size - free_count) / size, 1) if size else 0.0})
+        return rows
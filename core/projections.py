@@ -0,0 +1,89 @@
+import threading
+from typing import Callable, Dict, List, Tuple
+
+# Types d'entités versionnés par CarRentalSystem (get_versions)
+ENTITY_TYPES = ("vehicles", "customers", "rentals")
+
+
+def _vehicle_info(vehicle) -> str:
+    return f"{vehicle.brand} {vehicle.model} ({vehicle.license_plate})"
+
+
+def active_rentals(system) -> List[Dict[str, object]]:
+    """Tableau des locations en cours, tel qu'affiché par les pages (client et véhicule embarqués dans Rental)."""
+    return [{
+        "ID Location": rental.id,
+        "Client": f"{rental.customer.first_name} {rental.customer.last_name}",
+        "Véhicule": _vehicle_info(rental.vehicle),
+        "Date Début": rental.start_date.strftime("%Y-%m-%d"),
+        "Date Fin Prévue": rental.end_date.strftime("%Y-%m-%d"),
+        "Coût Estimé": f"{rental.get_total_cost():.2f} €",
+    } for rental in system.get_current_rentals()]
+
+
+def active_rental_choices(system) -> Dict[str, int]:
+    """Libellés des locations en cours pour un sélecteur, avec l'ID de chaque location."""
+    return {f"Location ID: {rental.id} - Client: {rental.customer.last_name} - Véhicule: {rental.vehicle.license_plate}":
+            rental.id for rental in system.get_current_rentals()}
+
+
+def completed_rentals(system) -> List[Dict[str, object]]:
+    """Tableau des locations terminées ou annulées."""
+    return [{
+        "ID Location": rental.id,
+        "Client": f"{rental.customer.first_name} {rental.customer.last_name}",
+        "Véhicule": _vehicle_info(rental.vehicle),
+        "Date Début": rental.start_date.strftime("%Y-%m-%d"),
+        "Date Fin Prévue": rental.end_date.strftime("%Y-%m-%d"),
+        "Date Retour Eff.": rental.actual_return_date.strftime("%Y-%m-%d") if rental.actual_return_date else "N/A",
+        "Coût Final": f"{rental.final_billed_amount:.2f} €" if rental.final_billed_amount is not None else "N/A",
+    } for rental in system.get_all_rentals() if not rental.is_active]
+
+
+def available_vehicles(system) -> List[Dict[str, object]]:
+    """Tableau des véhicules disponibles."""
+    return [{"ID": v.id, "Marque": v.brand, "Modèle": v.model, "Plaque": v.license_plate,
+             "Tarif Journalier": f"{v.daily_rate:.2f} €"} for v in system.get_available_vehicles()]
+
+
+# Nom -> (types d'entités dont dépend la projection, fonction qui la construit)
+PROJECTIONS: Dict[str, Tuple[Tuple[str, ...], Callable]] = {
+    "active_rentals": (("rentals", "customers", "vehicles"), active_rentals),
+    "active_rental_choices": (("rentals", "customers", "vehicles"), active_rental_choices),
+    "completed_rentals": (("rentals", "customers", "vehicles"), completed_rentals),
+    "available_vehicles": (("vehicles",), available_vehicles),
+}
+
+
+class ProjectionCache:
+    """
+    Projections prêtes à afficher, mises en cache avec les versions des entités dont elles dépendent.
+    Tant qu'aucune de ces versions ne change, get() ne coûte qu'une lecture de dictionnaire ;
+    sinon la projection est reconstruite une fois, pour tous les appelants.
+    Les versions sont lues avant la reconstruction : une modification concurrente provoque
+    au pire une reconstruction de plus, jamais une projection périmée gardée en cache.
+    """
+
+    def __init__(self, system):
+        self.system = system
+        self._cache: Dict[str, Tuple[Tuple[int, ...], object]] = {}
+        self._lock = threading.Lock()  # Une seule reconstruction à la fois
+
+    def _versions(self, entity_types: Tuple[str, ...]) -> Tuple[int, ...]:
+        versions = self.system.get_versions()
+        return tuple(versions[entity_type] for entity_type in entity_types)
+
+    def get(self, name: str):
+        """Projection `name` (clé de PROJECTIONS). Le résultat est partagé : ne pas le modifier."""
+        if name not in PROJECTIONS:
+            raise ValueError(f"Projection inconnue : {name!r} (attendu : {', '.join(PROJECTIONS)}).")
+        entity_types, build = PROJECTIONS[name]
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == self._versions(entity_types):
+            return cached[1]
+        with self._lock:
+            versions = self._versions(entity_types)
+            cached = self._cache.get(name)
+            if cached is None or cached[0] != versions:
+                cached = self._cache[name] = (versions, build(self.system))
+            return cached[1]
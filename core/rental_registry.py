@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional
+
+from models.rental import Rental
+
+
+class RentalRegistry:
+    """
+    Registre des locations avec index primaire (ID) et index secondaires
+    (par client, par véhicule, locations actives).
+
+    Le registre s'abonne aux changements de statut des locations qu'il contient
+    (Rental.set_status), ce qui garde l'ensemble des locations actives à jour
+    quel que soit le chemin de mutation.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[int, Rental] = {}
+        # Des dicts ordonnés servent d'ensembles : on garde l'ordre de création.
+        self._by_customer: Dict[int, Dict[int, Rental]] = {}
+        self._by_vehicle: Dict[int, Dict[int, Rental]] = {}
+        self._active: Dict[int, Rental] = {}
+        self._active_count_by_customer: Dict[int, int] = {}
+        self._active_count_by_vehicle: Dict[int, int] = {}
+        self._status_listener = self._on_status_change  # méthode liée partagée par toutes les locations
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, rental_id: int) -> bool:
+        return rental_id in self._by_id
+
+    def add(self, rental: Rental):
+        self._by_id[rental.id] = rental
+        self._by_customer.setdefault(rental.customer.id, {})[rental.id] = rental
+        self._by_vehicle.setdefault(rental.vehicle.id, {})[rental.id] = rental
+        if rental.is_active:
+            self._mark_active(rental)
+        rental.add_status_listener(self._status_listener)
+
+    def add_many(self, rentals: List[Rental]):
+        """add pour tout un lot (rechargement depuis un stockage), en une boucle sans appel par location."""
+        by_id, by_customer, by_vehicle, listener = self._by_id, self._by_customer, self._by_vehicle, self._status_listener
+        for rental in rentals:
+            by_id[rental.id] = rental
+            by_customer.setdefault(rental.customer.id, {})[rental.id] = rental
+            by_vehicle.setdefault(rental.vehicle.id, {})[rental.id] = rental
+            if rental.is_active:
+                self._mark_active(rental)
+            rental.add_status_listener(listener)
+
+    def get(self, rental_id: int) -> Optional[Rental]:
+        return self._by_id.get(rental_id)
+
+    def for_customer(self, customer_id: int) -> List[Rental]:
+        return list(self._by_customer.get(customer_id, {}).values())
+
+    def for_vehicle(self, vehicle_id: int) -> List[Rental]:
+        return list(self._by_vehicle.get(vehicle_id, {}).values())
+
+    def active(self) -> List[Rental]:
+        return list(self._active.values())
+
+    def active_count(self) -> int:
+        return len(self._active)
+
+    def has_active_for_customer(self, customer_id: int) -> bool:
+        return self._active_count_by_customer.get(customer_id, 0) > 0
+
+    def has_active_for_vehicle(self, vehicle_id: int) -> bool:
+        return self._active_count_by_vehicle.get(vehicle_id, 0) > 0
+
+    def move(self, rental: Rental, vehicle):
+        """Réattribue la location à un autre véhicule (même catégorie) en gardant les index par véhicule à jour."""
+        old_vehicle_id = rental.vehicle.id
+        del self._by_vehicle[old_vehicle_id][rental.id]
+        if rental.is_active:
+            self._active_count_by_vehicle[old_vehicle_id] -= 1
+            self._active_count_by_vehicle[vehicle.id] = self._active_count_by_vehicle.get(vehicle.id, 0) + 1
+        rental.vehicle = vehicle
+        history = self._by_vehicle.setdefault(vehicle.id, {})
+        history[rental.id] = rental
+        if max(history) != rental.id:  # Ajoutée en fin : on retrie pour garder l'ordre de création
+            self._by_vehicle[vehicle.id] = dict(sorted(history.items()))
+
+    def _on_status_change(self, rental: Rental, old_status: str, new_status: str):
+        was_active = old_status == "active"
+        if was_active and not rental.is_active:
+            self._unmark_active(rental)
+        elif not was_active and rental.is_active:
+            self._mark_active(rental)
+
+    def _mark_active(self, rental: Rental):
+        self._active[rental.id] = rental
+        self._active_count_by_customer[rental.customer.id] = self._active_count_by_customer.get(rental.customer.id, 0) + 1
+        self._active_count_by_vehicle[rental.vehicle.id] = self._active_count_by_vehicle.get(rental.vehicle.id, 0) + 1
+
+    def _unmark_active(self, rental: Rental):
+        if self._active.pop(rental.id, None) is None:
+            return
+        self._active_count_by_customer[rental.customer.id] -= 1
+        self._active_count_by_vehicle[rental.vehicle.id] -= 1
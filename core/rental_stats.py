@@ -0,0 +1,97 @@
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+from models.rental import Rental
+from core.revenue_index import RevenueIndex
+
+
+class RentalStats:
+    """
+    Agrégats maintenus au fil de l'eau sur les locations :
+    nombre de locations par statut, chiffre d'affaires total, total des pénalités
+    et chiffre d'affaires par catégorie de véhicule ; le chiffre d'affaires est aussi daté par
+    date de retour effective (revenue, voir RevenueIndex) pour les requêtes par période.
+
+    Le chiffre d'affaires ne compte que les locations terminées ("completed")
+    dont le montant final a été facturé, comme calculate_total_revenue l'a toujours fait.
+    Chaque mise à jour est en O(1).
+    """
+
+    def __init__(self):
+        self.total_revenue: float = 0.0
+        self.penalty_total: float = 0.0
+        self.count_by_status: Dict[str, int] = {}
+        self.revenue_by_category: Dict[str, float] = {}
+        self.revenue = RevenueIndex()
+        self._status_listener = self._on_status_change  # méthode liée partagée par toutes les locations
+
+    def seed(self, count_by_status: Dict[str, int], total_revenue: float, penalty_total: float,
+             revenue_by_category: Dict[str, float],
+             revenue_by_day: Optional[List[Tuple[str, datetime.date, float]]] = None):
+        """
+        Initialise les agrégats avec des valeurs précalculées (par exemple en SQL par un stockage).
+        revenue_by_day : [(catégorie, date de retour, chiffre d'affaires)] pour les requêtes par période.
+        """
+        self.count_by_status = dict(count_by_status)
+        self.total_revenue = total_revenue
+        self.penalty_total = penalty_total
+        self.revenue_by_category = dict(revenue_by_category)
+        self.revenue = RevenueIndex()
+        self.revenue.load(revenue_by_day or [])
+
+    def track(self, rental: Rental, counted: bool = False):
+        """
+        Compte une nouvelle location et s'abonne à ses changements de statut.
+        counted=True : la location figure déjà dans les agrégats (rechargée depuis un stockage).
+        """
+        if not counted:
+            self._count(rental.status, 1)
+            if rental.status == "completed":
+                self._add_billing(rental, 1)
+        rental.add_status_listener(self._status_listener)
+
+    def track_many(self, rentals: List[Rental], counted: bool = False):
+        """track pour tout un lot."""
+        for rental in rentals:
+            self.track(rental, counted)
+
+    def _on_status_change(self, rental: Rental, old_status: str, new_status: str):
+        if old_status == new_status:
+            return
+        self._count(old_status, -1)
+        self._count(new_status, 1)
+        if old_status == "completed":
+            self._add_billing(rental, -1)
+        if new_status == "completed":
+            self._add_billing(rental, 1)
+
+    def _count(self, status: str, delta: int):
+        self.count_by_status[status] = self.count_by_status.get(status, 0) + delta
+
+    def _add_billing(self, rental: Rental, sign: int):
+        if rental.final_billed_amount is None:
+            return
+        amount = sign * rental.final_billed_amount
+        self.total_revenue += amount
+        self.penalty_total += sign * rental.penalty_amount
+        category = rental.vehicle.category
+        self.revenue_by_category[category] = self.revenue_by_category.get(category, 0.0) + amount
+        if rental.actual_return_date is not None:  # Toujours renseignée par calculate_final_cost_on_return
+            self.revenue.add(rental.actual_return_date, category, amount)
+
+    def count(self, status: str) -> int:
+        return self.count_by_status.get(status, 0)
+
+    def total_count(self) -> int:
+        return sum(self.count_by_status.values())
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "total_locations": self.total_count(),
+            "locations_actives": self.count("active"),
+            "locations_terminees": self.count("completed"),
+            "locations_annulees": self.count("cancelled"),
+            "chiffre_affaires_total": self.total_revenue,
+            "total_penalites": self.penalty_total,
+            "chiffre_affaires_par_categorie": dict(self.revenue_by_category),
+        }
@@ -0,0 +1,79 @@
+import bisect
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class RevenueIndex:
+    """
+    Chiffre d'affaires des locations terminées, daté par la date de retour effective.
+
+    Les montants sont cumulés par jour et par catégorie ; les jours qui ont du chiffre d'affaires sont
+    gardés dans une liste triée, avec pour chaque catégorie (et pour toutes, clé None) les sommes
+    cumulées alignées sur cette liste. Le chiffre d'affaires d'une période est la différence de deux
+    sommes cumulées trouvées par dichotomie : O(log n), quelle que soit la longueur de la période.
+
+    Un retour ne met à jour que le total de son jour ; les sommes cumulées sont recalculées à la
+    requête suivante, à partir du premier jour modifié seulement (les retours du jour : la fin de la liste).
+    Les appelants synchronisent l'accès (verrou des index de CarRentalSystem).
+    """
+
+    def __init__(self):
+        self._daily: Dict[Optional[str], Dict[int, float]] = {None: {}}  # catégorie (None = toutes) -> jour -> montant
+        self._days: List[int] = []  # Jours (ordinaux) ayant eu au moins un retour facturé, triés
+        self._cumulative: Dict[Optional[str], List[float]] = {None: []}  # catégorie -> sommes cumulées par jour
+        self._dirty_from: Optional[int] = None  # Premier jour dont les sommes cumulées sont périmées
+
+    def add(self, day: datetime.date, category: str, amount: float):
+        """Ajoute amount (négatif pour retirer une facturation) au chiffre d'affaires du jour."""
+        ordinal = day.toordinal()
+        totals = self._daily[None]
+        if ordinal not in totals:
+            bisect.insort(self._days, ordinal)
+        totals[ordinal] = totals.get(ordinal, 0.0) + amount
+        daily = self._daily.get(category)
+        if daily is None:
+            daily = self._daily[category] = {}
+            self._cumulative[category] = []
+            self._dirty_from = self._days[0]  # Nouvelle catégorie : sommes cumulées à construire en entier
+        daily[ordinal] = daily.get(ordinal, 0.0) + amount
+        if self._dirty_from is None or ordinal < self._dirty_from:
+            self._dirty_from = ordinal
+
+    def load(self, entries: List[Tuple[str, datetime.date, float]]):
+        """Chiffre d'affaires précalculé [(catégorie, jour, montant)] (par exemple en SQL par un stockage)."""
+        for category, day, amount in entries:
+            self.add(day, category, amount)
+
+    def _refresh(self):
+        if self._dirty_from is None:
+            return
+        start = bisect.bisect_left(self._days, self._dirty_from)
+        for category, cumulative in self._cumulative.items():
+            daily = self._daily[category]
+            del cumulative[start:]
+            running = cumulative[-1] if cumulative else 0.0
+            for ordinal in self._days[start:]:
+                running += daily.get(ordinal, 0.0)
+                cumulative.append(running)
+        self._dirty_from = None
+
+    def revenue_between(self, start: datetime.date, end: datetime.date, category: Optional[str] = None) -> float:
+        """Chiffre d'affaires des retours du start au end inclus, pour une catégorie ou toutes (None)."""
+        self._refresh()
+        cumulative = self._cumulative.get(category)
+        if not cumulative or end < start:
+            return 0.0
+        first = bisect.bisect_left(self._days, start.toordinal())
+        last = bisect.bisect_right(self._days, end.toordinal())
+        if last == 0:
+            return 0.0
+        return cumulative[last - 1] - (cumulative[first - 1] if first else 0.0)
+
+    def categories(self) -> List[str]:
+        return sorted(category for category in self._daily if category is not None)
+
+    def bounds(self) -> Optional[Tuple[datetime.date, datetime.date]]:
+        """Premier et dernier jour ayant eu un retour facturé, ou None."""
+        if not self._days:
+            return None
+        return datetime.date.fromordinal(self._days[0]), datetime.date.fromordinal(self._days[-1])
@@ -0,0 +1,237 @@
+import bisect
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.catalog_index import insert_sorted
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_COMBINING = re.compile("[\u0300-\u036f]+")  # Accents et autres signes diacritiques combinants
+
+
+def fold(text: str) -> str:
+    """Texte en minuscules et sans accents : « Éloïse » -> « eloise »."""
+    if text.isascii():
+        return text.casefold()
+    return _COMBINING.sub("", unicodedata.normalize("NFKD", text)).casefold()
+
+
+def compact(text: str) -> str:
+    """Lettres et chiffres seuls, sans accents ni casse : « AB-123 cd » -> « ab123cd »."""
+    return _NON_ALNUM.sub("", fold(text))
+
+
+def words(text: str) -> List[str]:
+    """Mots d'un texte (séparés par tout caractère autre qu'une lettre ou un chiffre), sans accents ni casse."""
+    return [word for word in _NON_ALNUM.split(fold(text)) if word]
+
+
+def _interleave(iterators: List[Iterator[int]]) -> Iterator[int]:
+    """Éléments pris tour à tour dans chaque itérateur, jusqu'à épuisement de tous."""
+    while iterators:
+        for iterator in list(iterators):
+            try:
+                yield next(iterator)
+            except StopIteration:
+                iterators.remove(iterator)
+
+
+def name_terms(text: str) -> List[str]:
+    """Termes de recherche d'un nom : chaque mot, plus le nom entier collé (« Saint-Exupéry » -> saintexupery)."""
+    terms = words(text)
+    if len(terms) > 1:
+        terms.append("".join(terms))
+    return terms
+
+
+class DuplicateError(ValueError):
+    """Valeur unique (plaque, permis, email) déjà attribuée à un autre élément."""
+
+
+class UniqueConstraints:
+    """
+    Contraintes d'unicité d'un catalogue : pour chaque champ, un dictionnaire valeur normalisée -> ID.
+    Vérifier une valeur ne coûte qu'une lecture de dictionnaire, quel que soit le nombre d'éléments.
+    Les appelants synchronisent l'accès (verrou du catalogue de CarRentalSystem).
+    """
+
+    def __init__(self, fields: Dict[str, Tuple[str, Callable[[str], str]]]):
+        self.fields = fields  # champ -> (libellé pour les messages d'erreur, normalisation)
+        self._owners: Dict[str, Dict[str, int]] = {field: {} for field in fields}
+
+    def check(self, values: Dict[str, str], item_id: Optional[int] = None):
+        """Lève DuplicateError (ValueError) si une des valeurs est déjà utilisée par un autre élément que item_id."""
+        for field, value in values.items():
+            label, normalize = self.fields[field]
+            owner = self._owners[field].get(normalize(value))
+            if owner is not None and owner != item_id:
+                raise DuplicateError(f"Doublon : {label} « {value} » appartient déjà à l'ID {owner}.")
+
+    def check_item(self, item):
+        self.check({field: getattr(item, field) for field in self.fields}, item.id)
+
+    def add_many(self, items: Iterable[object]):
+        """
+        Enregistre les valeurs des éléments. Une valeur déjà prise garde son premier propriétaire :
+        des doublons hérités d'un ancien stockage sont rechargés sans erreur.
+        """
+        for field, (_, normalize) in self.fields.items():
+            owners = self._owners[field]
+            for item in items:
+                owners.setdefault(normalize(getattr(item, field)), item.id)
+
+    def remove(self, item):
+        """Libère les valeurs de l'élément (à appeler avant de le modifier)."""
+        for field, (_, normalize) in self.fields.items():
+            owners = self._owners[field]
+            key = normalize(getattr(item, field))
+            if owners.get(key) == item.id:
+                del owners[key]
+
+
+class PrefixIndex:
+    """
+    Recherche à la frappe : retrouve les éléments dont un terme (mot d'un nom, email, plaque...) commence
+    par chacun des mots saisis, sans accents ni casse.
+
+    Les termes distincts sont gardés dans une liste triée : ceux qui commencent par un préfixe forment une
+    tranche contiguë, trouvée par dichotomie. Chaque terme renvoie à l'ID de son élément, ou à l'ensemble
+    des IDs quand il est partagé (prénoms, marques...). Les termes ne sont pas mémorisés par élément :
+    remove() les recalcule, il faut donc l'appeler avant de modifier l'élément.
+    Les appelants synchronisent l'accès (verrou du catalogue de CarRentalSystem).
+    """
+
+    # Au-delà de ce nombre d'IDs, un mot saisi est trop vague pour être rassemblé en ensemble :
+    # il sert seulement à vérifier les candidats trouvés par les autres mots.
+    MAX_GATHERED = 5_000
+    # Nombre maximum de candidats relus pour vérifier les mots vagues : borne le coût d'une recherche
+    # faite uniquement de mots courts (« a b »), quitte à ne pas trouver tous les résultats.
+    MAX_VERIFIED = 500
+
+    def __init__(self, terms: Callable[[object], Iterable[str]]):
+        self.terms = terms  # Élément -> termes sous lesquels il est retrouvé
+        self._postings: Dict[str, object] = {}  # terme -> ID, ou set d'IDs si le terme est partagé
+        self._sorted: List[str] = []  # Termes distincts, triés
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add_many(self, items: Iterable[object]):
+        """Ajoute un lot d'éléments ; les nouveaux termes sont insérés en une fois (voir insert_sorted)."""
+        postings = self._postings
+        new_terms = []
+        for item in items:
+            for term in set(self.terms(item)):
+                ids = postings.get(term)
+                if ids is None:
+                    postings[term] = item.id
+                    new_terms.append(term)
+                elif isinstance(ids, set):
+                    ids.add(item.id)
+                elif ids != item.id:
+                    postings[term] = {ids, item.id}
+        insert_sorted(self._sorted, new_terms)
+
+    def add(self, item):
+        self.add_many((item,))
+
+    def remove(self, item):
+        for term in set(self.terms(item)):
+            ids = self._postings.get(term)
+            if isinstance(ids, set):
+                ids.discard(item.id)
+                if len(ids) == 1:
+                    self._postings[term] = next(iter(ids))
+                continue
+            if ids != item.id:
+                continue
+            del self._postings[term]
+            pos = bisect.bisect_left(self._sorted, term)
+            if pos < len(self._sorted) and self._sorted[pos] == term:
+                del self._sorted[pos]
+
+    def _matching(self, prefix: str) -> Iterator[int]:
+        """IDs des éléments ayant un terme qui commence par prefix (un ID peut revenir plusieurs fois)."""
+        terms = self._sorted
+        pos = bisect.bisect_left(terms, prefix)
+        while pos < len(terms) and terms[pos].startswith(prefix):
+            ids = self._postings[terms[pos]]
+            if isinstance(ids, set):
+                yield from ids
+            else:
+                yield ids
+            pos += 1
+
+    def _gather(self, prefix: str) -> Optional[Set[int]]:
+        """Ensemble des IDs correspondant au préfixe, ou None s'il dépasse MAX_GATHERED."""
+        found: Set[int] = set()
+        terms = self._sorted
+        pos = bisect.bisect_left(terms, prefix)
+        while pos < len(terms) and terms[pos].startswith(prefix):
+            ids = self._postings[terms[pos]]
+            if isinstance(ids, set):
+                if len(ids) > self.MAX_GATHERED:  # Terme très partagé (prénom courant...) : vague d'office
+                    return None
+                found |= ids
+            else:
+                found.add(ids)
+            if len(found) > self.MAX_GATHERED:
+                return None
+            pos += 1
+        return found
+
+    def search(self, query: str, lookup: Callable[[int], object], limit: int) -> List[int]:
+        """
+        IDs (au plus limit) des éléments dont un terme commence par chaque mot de query
+        (mots séparés par des espaces ; « AB-12 » est cherché comme « ab12 »).
+        Les mots assez précis sont croisés par ensembles d'IDs ; les mots trop vagues (plus de
+        MAX_GATHERED éléments) sont vérifiés sur au plus MAX_VERIFIED candidats, relus avec lookup(ID).
+        """
+        prefixes = sorted({compact(word) for word in query.split()} - {""}, key=len, reverse=True)
+        if not prefixes:
+            return []
+        if len(prefixes) == 1:
+            found: List[int] = []
+            seen: Set[int] = set()
+            for item_id in self._matching(prefixes[0]):
+                if item_id not in seen:
+                    seen.add(item_id)
+                    found.append(item_id)
+                    if len(found) == limit:
+                        break
+            return found
+
+        sets = []
+        vague = []
+        for prefix in prefixes:
+            gathered = self._gather(prefix)
+            if gathered is None:
+                vague.append(prefix)
+            elif not gathered:
+                return []  # Un mot sans aucune correspondance : inutile de regarder les autres
+            else:
+                sets.append(gathered)
+        if sets:
+            sets.sort(key=len)
+            candidates = iter(sorted(sets[0].intersection(*sets[1:])))
+        else:
+            # Candidats pris tour à tour chez chaque mot vague : si les premiers éléments d'un mot ne
+            # conviennent jamais (« m » -> Manon, pour « j m »), ceux des autres mots restent examinés
+            candidates = _interleave([self._matching(prefix) for prefix in vague])
+
+        found = []
+        seen = set()
+        for item_id in candidates:
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+            if vague:
+                if len(seen) > self.MAX_VERIFIED:
+                    break
+                terms = self.terms(lookup(item_id))
+                if not all(any(term.startswith(prefix) for term in terms) for prefix in vague):
+                    continue
+            found.append(item_id)
+            if len(found) == limit:
+                break
+        return found
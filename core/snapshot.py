@@ -0,0 +1,393 @@
+import bisect
+import datetime
+import gc
+import json
+import math
+import os
+import sys
+from array import array
+from typing import TYPE_CHECKING, Container, Dict, Iterable, List, Optional, Tuple
+
+from models.vehicle import Vehicle
+from models.customer import Customer
+from models.rental import Rental
+from core.booking_index import booked_end_date
+from core.storage import RentalStorage, StoredState
+
+if TYPE_CHECKING:
+    from core.car_rental_system import CarRentalSystem
+
+MAGIC = b"RCSNAP01"
+FORMAT_VERSION = 2  # La version 1 enregistrait en plus les dates des index (colonnes ignorées à la relecture)
+NO_DATE = 0  # Ordinal d'une date absente (les ordinaux commencent à 1)
+STRING_SEPARATOR = "\0"
+
+# Colonnes codées par dictionnaire : quelques valeurs très répétées, stockées une fois dans l'en-tête
+VEHICLE_POOLED = ("brand", "model", "category", "state", "status")
+
+
+def _ordinal(value: Optional[datetime.date]) -> int:
+    return value.toordinal() if value is not None else NO_DATE
+
+
+def _pooled(values: Iterable[str], pool: Dict[str, int]) -> array:
+    return array("I", (pool.setdefault(value, len(pool)) for value in values))
+
+
+def _strings(values: List[str]) -> bytes:
+    joined = STRING_SEPARATOR.join(values)
+    if joined.count(STRING_SEPARATOR) != max(len(values) - 1, 0):
+        raise ValueError("Une chaîne de l'instantané contient un caractère nul.")
+    return joined.encode("utf-8")
+
+
+class _SnapshotWriter:
+    """Sections de l'instantané : colonnes array (octets bruts) ou chaînes UTF-8 séparées par un octet nul."""
+
+    def __init__(self):
+        self.sections: List[Tuple[str, str, bytes]] = []
+
+    def column(self, name: str, values: array):
+        self.sections.append((name, values.typecode, values.tobytes()))
+
+    def strings(self, name: str, values: List[str]):
+        self.sections.append((name, "s", _strings(values)))
+
+    def write(self, path: str, header: dict) -> int:
+        header = dict(header, byteorder=sys.byteorder,
+                      sections=[[name, typecode, len(data)] for name, typecode, data in self.sections])
+        encoded = json.dumps(header, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        with open(path + ".tmp", "wb") as snapshot:
+            snapshot.write(MAGIC)
+            snapshot.write(len(encoded).to_bytes(4, "little"))
+            snapshot.write(encoded)
+            for _, _, data in self.sections:
+                snapshot.write(data)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(path + ".tmp", path)
+        return os.path.getsize(path)
+
+
+def save_snapshot(system: "CarRentalSystem", path: str) -> int:
+    """
+    Écrit l'état complet du système dans un instantané binaire (voir SnapshotStorage) ; retourne sa taille
+    en octets. Véhicules, clients et locations sont rangés en colonnes (module array), avec les compteurs
+    d'IDs, les agrégats et les index secondaires (par client, par véhicule, par fin de période) : la relecture
+    ne reconstruit rien pour l'historique. Les véhicules et clients supprimés mais présents dans l'historique
+    sont gardés, marqués comme détachés. L'écriture passe par un fichier temporaire renommé à la fin.
+    """
+    rentals = sorted(system.get_all_rentals(), key=lambda rental: rental.id)
+    current_vehicles = {vehicle.id: vehicle for vehicle in system.get_all_vehicles()}
+    current_customers = {customer.id: customer for customer in system.get_all_customers()}
+    vehicles = {rental.vehicle.id: rental.vehicle for rental in rentals}
+    vehicles.update(current_vehicles)
+    vehicles = [vehicles[vehicle_id] for vehicle_id in sorted(vehicles)]
+    customers = {rental.customer.id: rental.customer for rental in rentals}
+    customers.update(current_customers)
+    customers = [customers[customer_id] for customer_id in sorted(customers)]
+
+    writer = _SnapshotWriter()
+    pools: Dict[str, Dict[str, int]] = {}
+
+    writer.column("vehicle.id", array("I", (vehicle.id for vehicle in vehicles)))
+    for field in VEHICLE_POOLED:
+        writer.column(f"vehicle.{field}", _pooled((getattr(vehicle, field) for vehicle in vehicles),
+                                                  pools.setdefault(field, {})))
+    writer.strings("vehicle.license_plate", [vehicle.license_plate for vehicle in vehicles])
+    writer.column("vehicle.daily_rate", array("d", (vehicle.daily_rate for vehicle in vehicles)))
+    writer.column("vehicle.last_maintenance", array("i", (_ordinal(vehicle.last_maintenance_date)
+                                                          for vehicle in vehicles)))
+    writer.column("vehicle.flags", array("B", ((vehicle.id in current_vehicles) | (vehicle.is_available << 1)
+                                               for vehicle in vehicles)))
+
+    writer.column("customer.id", array("I", (customer.id for customer in customers)))
+    for field in ("first_name", "last_name", "driver_license_number", "email"):
+        writer.strings(f"customer.{field}", [getattr(customer, field) for customer in customers])
+    writer.column("customer.age", array("I", (customer.age for customer in customers)))
+    writer.column("customer.registered", array("B", (customer.id in current_customers for customer in customers)))
+
+    # Locations par ID croissant : la position d'une location se retrouve par dichotomie sur rental.id
+    status_pool = pools.setdefault("rental.status", {})
+    writer.column("rental.id", array("I", (rental.id for rental in rentals)))
+    writer.column("rental.customer", array("I", (rental.customer.id for rental in rentals)))
+    writer.column("rental.vehicle", array("I", (rental.vehicle.id for rental in rentals)))
+    starts = array("i", (rental.start_date.toordinal() for rental in rentals))
+    booked_ends = array("i", (booked_end_date(rental).toordinal() for rental in rentals))
+    writer.column("rental.start", starts)
+    writer.column("rental.end", array("i", (rental.end_date.toordinal() for rental in rentals)))
+    writer.column("rental.return", array("i", (_ordinal(rental.actual_return_date) for rental in rentals)))
+    writer.column("rental.status", array("B", (status_pool.setdefault(rental.status, len(status_pool))
+                                               for rental in rentals)))
+    writer.column("rental.billed", array("d", (rental.final_billed_amount if rental.final_billed_amount is not None
+                                               else math.nan for rental in rentals)))
+    writer.column("rental.penalty", array("d", (rental.penalty_amount for rental in rentals)))
+
+    # Index secondaires, enregistrés tels quels : IDs de location par client, positions par véhicule (triées
+    # par début), chacun avec les bornes de la tranche de chaque client / véhicule (même ordre que leurs
+    # sections) ; positions triées par fin de période réservée. Seules les permutations sont écrites : les
+    # dates se relisent dans les colonnes rental.* à travers elles
+    by_customer = sorted(range(len(rentals)), key=lambda row: rentals[row].customer.id)
+    writer.column("index.customer_ids", array("I", (rentals[row].id for row in by_customer)))
+    writer.column("index.customer_offsets", _offsets([customer.id for customer in customers],
+                                                     (rentals[row].customer.id for row in by_customer)))
+    by_vehicle = sorted(range(len(rentals)), key=lambda row: (rentals[row].vehicle.id, starts[row], booked_ends[row]))
+    writer.column("index.vehicle_rows", array("I", by_vehicle))
+    writer.column("index.vehicle_offsets", _offsets([vehicle.id for vehicle in vehicles],
+                                                    (rentals[row].vehicle.id for row in by_vehicle)))
+    by_end = sorted(range(len(rentals)), key=booked_ends.__getitem__)
+    writer.column("index.end_rows", array("I", by_end))
+    writer.column("index.category_bookings", array("I", system.get_category_bookings()))
+
+    header = {
+        "version": FORMAT_VERSION,
+        "counts": {"vehicles": len(vehicles), "customers": len(customers), "rentals": len(rentals)},
+        "next_ids": {"vehicle": Vehicle._next_id, "customer": Customer._next_id, "rental": Rental._next_id},
+        "pools": {name: list(pool) for name, pool in pools.items()},
+        "stats": _stats(rentals),
+    }
+    return writer.write(path, header)
+
+
+def _offsets(keys: List[int], sorted_keys: Iterable[int]) -> array:
+    """Bornes des tranches de chaque clé de keys dans sorted_keys : la tranche i est [offsets[i], offsets[i + 1][."""
+    counts: Dict[int, int] = {}
+    for key in sorted_keys:
+        counts[key] = counts.get(key, 0) + 1
+    offsets = array("I", [0])
+    for key in keys:
+        offsets.append(offsets[-1] + counts.get(key, 0))
+    return offsets
+
+
+def _stats(rentals: List[Rental]) -> dict:
+    """Agrégats de RentalStats.seed, calculés sur toutes les locations (revenue_by_day en ordinaux)."""
+    count_by_status: Dict[str, int] = {}
+    revenue_by_category: Dict[str, float] = {}
+    revenue_by_day: Dict[Tuple[str, int], float] = {}
+    total_revenue = 0.0
+    penalty_total = 0.0
+    for rental in rentals:
+        count_by_status[rental.status] = count_by_status.get(rental.status, 0) + 1
+        if rental.status != "completed" or rental.final_billed_amount is None:
+            continue
+        category = rental.vehicle.category
+        total_revenue += rental.final_billed_amount
+        penalty_total += rental.penalty_amount
+        revenue_by_category[category] = revenue_by_category.get(category, 0.0) + rental.final_billed_amount
+        if rental.actual_return_date is not None:
+            key = (category, rental.actual_return_date.toordinal())
+            revenue_by_day[key] = revenue_by_day.get(key, 0.0) + rental.final_billed_amount
+    return {
+        "count_by_status": count_by_status,
+        "total_revenue": total_revenue,
+        "penalty_total": penalty_total,
+        "revenue_by_category": revenue_by_category,
+        "revenue_by_day": [[category, day, amount] for (category, day), amount in revenue_by_day.items()],
+    }
+
+
+class SnapshotStorage(RentalStorage):
+    """
+    Relit un instantané binaire écrit par save_snapshot, sans rejouer la logique métier.
+
+    Le fichier est lu d'un bloc et ses colonnes sont recopiées telles quelles dans des array. Comme avec
+    SqliteStorage, seuls les véhicules, les clients et les locations actives sont recréés au démarrage, avec
+    les agrégats précalculés ; l'historique reste en colonnes et n'est recréé qu'à la demande (find_rental,
+    historique d'un client ou d'un véhicule, chevauchements), grâce aux index enregistrés dans l'instantané.
+
+    Les modifications faites ensuite restent en mémoire, comme sans stockage : save_snapshot les enregistre.
+    """
+
+    lazy_history = True
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as snapshot:
+            data = snapshot.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} n'est pas un instantané du système de location.")
+        header_size = int.from_bytes(data[len(MAGIC):len(MAGIC) + 4], "little")
+        offset = len(MAGIC) + 4 + header_size
+        self._header = json.loads(data[len(MAGIC) + 4:offset].decode("utf-8"))
+        if self._header["version"] not in (1, FORMAT_VERSION):
+            raise ValueError(f"Version d'instantané non prise en charge : {self._header['version']}.")
+        swap = self._header["byteorder"] != sys.byteorder
+        view = memoryview(data)
+        self._columns: Dict[str, object] = {}
+        for name, typecode, size in self._header["sections"]:
+            chunk = view[offset:offset + size]
+            offset += size
+            if typecode == "s":
+                # Une chaîne par véhicule ou par client : aucune s'il n'y en a pas (sinon une chaîne vide)
+                count = self._header["counts"]["vehicles" if name.startswith("vehicle.") else "customers"]
+                self._columns[name] = bytes(chunk).decode("utf-8").split(STRING_SEPARATOR) if count else []
+            else:
+                column = array(typecode)
+                column.frombytes(chunk)
+                if swap:
+                    column.byteswap()
+                self._columns[name] = column
+        self._status_names = self._header["pools"].get("rental.status", [])
+        self._vehicles: Dict[int, Vehicle] = {}  # Tous les véhicules de l'instantané, détachés compris
+        self._customers: Dict[int, Customer] = {}
+        self._vehicle_positions: Dict[int, int] = {}  # ID de véhicule -> position dans sa section
+        self._dates: Dict[int, Optional[datetime.date]] = {NO_DATE: None}  # Dates partagées, par ordinal
+
+    # --- Chargement ---
+
+    def load(self) -> Optional[StoredState]:
+        columns = self._columns
+        counts = self._header["counts"]
+        if not counts["vehicles"] and not counts["customers"]:
+            return None
+        pools = self._header["pools"]
+        pooled = {field: pools.get(field, []) for field in VEHICLE_POOLED}
+        vehicles = []
+        brands, models, categories, states, statuses = (
+            [pooled[field][code] for code in columns[f"vehicle.{field}"]] for field in VEHICLE_POOLED)
+        for row, vehicle_id in enumerate(columns["vehicle.id"]):
+            flags = columns["vehicle.flags"][row]
+            vehicle = Vehicle.restore(vehicle_id, brands[row], models[row], columns["vehicle.license_plate"][row],
+                                      columns["vehicle.daily_rate"][row], categories[row], states[row], statuses[row],
+                                      self._date(columns["vehicle.last_maintenance"][row]), bool(flags & 2))
+            self._vehicles[vehicle_id] = vehicle
+            self._vehicle_positions[vehicle_id] = row
+            if flags & 1:
+                vehicles.append(vehicle)
+
+        # IDs de location rangés par client : l'historique de chaque client est une tranche de l'index
+        customer_ids = columns["index.customer_ids"]
+        offsets = columns["index.customer_offsets"]
+        customers = []
+        for row, customer_id in enumerate(columns["customer.id"]):
+            customer = Customer.restore(customer_id, columns["customer.first_name"][row],
+                                        columns["customer.last_name"][row], columns["customer.age"][row],
+                                        columns["customer.driver_license_number"][row], columns["customer.email"][row])
+            customer.rentals_history = customer_ids[offsets[row]:offsets[row + 1]]
+            self._customers[customer_id] = customer
+            if columns["customer.registered"][row]:
+                customers.append(customer)
+
+        next_ids = self._header["next_ids"]
+        Vehicle._next_id = max(Vehicle._next_id, next_ids["vehicle"])
+        Customer._next_id = max(Customer._next_id, next_ids["customer"])
+        Rental._next_id = max(Rental._next_id, next_ids["rental"])
+
+        active_rows = []
+        if "active" in self._status_names:
+            active = self._status_names.index("active")
+            statuses = columns["rental.status"].tobytes()
+            row = statuses.find(active)
+            while row != -1:
+                active_rows.append(row)
+                row = statuses.find(active, row + 1)
+        return StoredState(vehicles, customers, self._rentals(active_rows), self._seed_stats(),
+                           category_bookings=list(columns["index.category_bookings"]))
+
+    def _seed_stats(self) -> dict:
+        stats = dict(self._header["stats"])
+        stats["revenue_by_day"] = [(category, self._date(day), amount)
+                                   for category, day, amount in stats["revenue_by_day"]]
+        return stats
+
+    def _date(self, ordinal: int) -> Optional[datetime.date]:
+        date = self._dates.get(ordinal)
+        if date is None and ordinal != NO_DATE:
+            date = self._dates[ordinal] = datetime.date.fromordinal(ordinal)
+        return date
+
+    def _rentals(self, rows: Iterable[int]) -> List[Rental]:
+        """Locations des positions données, recréées sans logique métier (boucle serrée : jusqu'au million)."""
+        columns = self._columns
+        ids, customer_ids, vehicle_ids = columns["rental.id"], columns["rental.customer"], columns["rental.vehicle"]
+        starts, ends, returns = columns["rental.start"], columns["rental.end"], columns["rental.return"]
+        statuses, billed, penalties = columns["rental.status"], columns["rental.billed"], columns["rental.penalty"]
+        customers, vehicles, status_names, date = self._customers, self._vehicles, self._status_names, self._date
+        restore, isnan = Rental.restore, math.isnan
+        return [restore(ids[row], customers[customer_ids[row]], vehicles[vehicle_ids[row]], date(starts[row]),
+                        date(ends[row]), status_names[statuses[row]], None if isnan(billed[row]) else billed[row],
+                        date(returns[row]), penalties[row])
+                for row in rows]
+
+    def _booked_end(self, row: int) -> int:
+        """Ordinal de la fin de période réservée de la position row (voir booked_end_date)."""
+        end, returned = self._columns["rental.end"][row], self._columns["rental.return"][row]
+        return returned if returned != NO_DATE and returned < end else end
+
+    def _row(self, rental_id: int) -> Optional[int]:
+        rental_ids = self._columns["rental.id"]
+        row = bisect.bisect_left(rental_ids, rental_id)
+        return row if row < len(rental_ids) and rental_ids[row] == rental_id else None
+
+    def _vehicle_span(self, vehicle_id: int) -> Tuple[int, int]:
+        """Positions [début, fin[ des locations du véhicule dans index.vehicle_rows."""
+        position = self._vehicle_positions.get(vehicle_id)
+        if position is None:
+            return 0, 0
+        offsets = self._columns["index.vehicle_offsets"]
+        return offsets[position], offsets[position + 1]
+
+    # --- Historique à la demande ---
+
+    def load_rental(self, system: "CarRentalSystem", rental_id: int) -> Optional[Rental]:
+        row = self._row(rental_id)
+        return self._rentals((row,))[0] if row is not None else None
+
+    def load_rentals(self, system: "CarRentalSystem", skip: Container[int], customer_id: Optional[int] = None,
+                     vehicle_id: Optional[int] = None) -> List[Rental]:
+        rental_ids = self._columns["rental.id"]
+        if customer_id is not None:
+            customer = self._customers.get(customer_id)
+            ids = customer.rentals_history if customer is not None else ()
+            rows = [self._row(rental_id) for rental_id in ids if rental_id not in skip]
+        elif vehicle_id is not None:
+            first, last = self._vehicle_span(vehicle_id)
+            rows = sorted(row for row in self._columns["index.vehicle_rows"][first:last] if rental_ids[row] not in skip)
+        else:
+            rows = [row for row, rental_id in enumerate(rental_ids) if rental_id not in skip]
+        return self._rentals(rows)
+
+    def find_overlap(self, vehicle_id: int, start_date: datetime.date, end_date: datetime.date,
+                     skip: Container[int] = ()) -> Optional[int]:
+        # Périodes d'un véhicule rangées par début : la dernière qui commence avant la fin demandée est la seule
+        # candidate (même raisonnement que BookingIndex), en sautant les locations annulées et celles de skip
+        # (chargées en mémoire : une location annulée depuis la relecture ne masque pas celle d'avant)
+        first, last = self._vehicle_span(vehicle_id)
+        rows = self._columns["index.vehicle_rows"]
+        position = bisect.bisect_left(rows, end_date.toordinal(), first, last,
+                                      key=self._columns["rental.start"].__getitem__) - 1
+        cancelled = self._status_names.index("cancelled") if "cancelled" in self._status_names else -1
+        statuses = self._columns["rental.status"]
+        rental_ids = self._columns["rental.id"]
+        while position >= first and (statuses[rows[position]] == cancelled or rental_ids[rows[position]] in skip):
+            position -= 1
+        if position >= first and start_date.toordinal() < self._booked_end(rows[position]):
+            return rental_ids[rows[position]]
+        return None
+
+    def find_overlapping_rentals(self, start_date: datetime.date, end_date: datetime.date) -> List[Tuple[int, int]]:
+        # L'historique est surtout dans le passé : seules les périodes qui finissent après start_date sont lues
+        columns = self._columns
+        cancelled = self._status_names.index("cancelled") if "cancelled" in self._status_names else -1
+        end_rows = columns["index.end_rows"]
+        starts = columns["rental.start"]
+        statuses = columns["rental.status"]
+        end_ordinal = end_date.toordinal()
+        first = bisect.bisect_right(end_rows, start_date.toordinal(), key=self._booked_end)
+        return [(columns["rental.vehicle"][row], columns["rental.id"][row]) for row in end_rows[first:]
+                if starts[row] < end_ordinal and statuses[row] != cancelled]
+
+
+def load_snapshot(path: str) -> "CarRentalSystem":
+    """Système relu depuis un instantané de save_snapshot (voir SnapshotStorage)."""
+    from core.car_rental_system import CarRentalSystem
+    # Des centaines de milliers d'objets créés d'un coup, sans déchet à collecter : le ramasse-miettes
+    # cyclique est suspendu pendant la relecture (sinon près d'un tiers du démarrage à 1M de locations)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return CarRentalSystem(SnapshotStorage(path))
+    finally:
+        if enabled:
+            gc.enable()
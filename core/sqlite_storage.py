@@ -0,0 +1,346 @@
+import contextlib
+import datetime
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Container, Dict, Iterator, List, Optional, Tuple
+
+from models.vehicle import Vehicle
+from models.customer import Customer
+from models.rental import Rental
+from core.booking_index import booked_end_date
+from core.storage import RentalStorage, StoredState
+
+if TYPE_CHECKING:
+    from core.car_rental_system import CarRentalSystem
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vehicles (
+    id INTEGER PRIMARY KEY,
+    brand TEXT NOT NULL,
+    model TEXT NOT NULL,
+    license_plate TEXT NOT NULL,
+    daily_rate REAL NOT NULL,
+    category TEXT NOT NULL,
+    state TEXT NOT NULL,
+    status TEXT NOT NULL,
+    last_maintenance_date TEXT,
+    available INTEGER NOT NULL DEFAULT 1,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    driver_license_number TEXT NOT NULL,
+    email TEXT NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rentals (
+    id INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL,
+    vehicle_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    booked_end_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    final_billed_amount REAL,
+    actual_return_date TEXT,
+    penalty_amount REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS category_bookings (
+    rental_id INTEGER PRIMARY KEY
+);
+CREATE INDEX IF NOT EXISTS idx_rentals_vehicle_dates ON rentals (vehicle_id, start_date, booked_end_date);
+CREATE INDEX IF NOT EXISTS idx_rentals_booked_end ON rentals (booked_end_date, start_date);
+CREATE INDEX IF NOT EXISTS idx_rentals_customer ON rentals (customer_id);
+CREATE INDEX IF NOT EXISTS idx_rentals_status ON rentals (status);
+"""
+
+# Une ligne supprimée (removed = 1) n'est jamais remplacée : elle reste liée à l'historique des locations
+UPSERT_VEHICLE = ("INSERT INTO vehicles (id, brand, model, license_plate, daily_rate, category, state, status, "
+                  "last_maintenance_date, available) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                  "brand = excluded.brand, model = excluded.model, license_plate = excluded.license_plate, "
+                  "daily_rate = excluded.daily_rate, category = excluded.category, state = excluded.state, "
+                  "status = excluded.status, last_maintenance_date = excluded.last_maintenance_date, "
+                  "available = excluded.available WHERE removed = 0")
+UPSERT_CUSTOMER = ("INSERT INTO customers (id, first_name, last_name, age, driver_license_number, email) "
+                   "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET first_name = excluded.first_name, "
+                   "last_name = excluded.last_name, age = excluded.age, "
+                   "driver_license_number = excluded.driver_license_number, email = excluded.email WHERE removed = 0")
+UPSERT_RENTAL = ("INSERT OR REPLACE INTO rentals (id, customer_id, vehicle_id, category, start_date, end_date, booked_end_date, "
+                 "status, final_billed_amount, actual_return_date, penalty_amount) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_CATEGORY_BOOKING = "INSERT OR IGNORE INTO category_bookings (rental_id) VALUES (?)"
+REMOVE_VEHICLE = "UPDATE vehicles SET removed = 1 WHERE id = ?"
+REMOVE_CUSTOMER = "UPDATE customers SET removed = 1 WHERE id = ?"
+
+VEHICLE_COLUMNS = ("id, brand, model, license_plate, daily_rate, category, state, status, last_maintenance_date, "
+                   "available")
+CUSTOMER_COLUMNS = "id, first_name, last_name, age, driver_license_number, email"
+RENTAL_COLUMNS = ("id, customer_id, vehicle_id, start_date, end_date, status, final_billed_amount, "
+                  "actual_return_date, penalty_amount")
+
+
+def _date_to_text(value: Optional[datetime.date]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _text_to_date(value: Optional[str]) -> Optional[datetime.date]:
+    return datetime.date.fromisoformat(value) if value is not None else None
+
+
+class SqliteStorage(RentalStorage):
+    """
+    Stockage persistant SQLite (module sqlite3 de la bibliothèque standard, mode WAL).
+
+    Au démarrage, seuls les véhicules, les clients et les locations actives sont chargés ;
+    les agrégats sont recalculés en SQL. Les locations terminées restent sur disque et sont
+    rechargées à la demande (find_rental, historique d'un client, chevauchements), de même que
+    la liste des IDs de locations de chaque client (Customer.rentals_history).
+
+    Les écritures sont mises en attente puis envoyées en une transaction (executemany) :
+    à la fin de chaque opération du système, ou par paquets de batch_size lignes dans un bloc batch().
+    """
+
+    lazy_history = True
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        # Streamlit exécute les pages dans plusieurs threads : la connexion est partagée sous verrou.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Bases créées avant l'enregistrement de la disponibilité : tous les véhicules y étaient disponibles
+        if "available" not in {row[1] for row in self._conn.execute("PRAGMA table_info(vehicles)")}:
+            self._conn.execute("ALTER TABLE vehicles ADD COLUMN available INTEGER NOT NULL DEFAULT 1")
+        self._pending: Dict[str, Dict[int, tuple]] = {UPSERT_VEHICLE: {}, UPSERT_CUSTOMER: {}, UPSERT_RENTAL: {},
+                                                      INSERT_CATEGORY_BOOKING: {}}
+        self._pending_removals: List[Tuple[str, int]] = []
+        self._pending_count = 0
+        self._batches = threading.local()  # Profondeur des blocs batch() propre à chaque thread
+        # Véhicules et clients supprimés, rechargés uniquement pour l'historique des locations
+        self._detached_vehicles: Dict[int, Vehicle] = {}
+        self._detached_customers: Dict[int, Customer] = {}
+
+    # --- Écritures ---
+
+    def save_vehicle(self, vehicle: Vehicle):
+        self._queue(UPSERT_VEHICLE, vehicle.id, (
+            vehicle.id, vehicle.brand, vehicle.model, vehicle.license_plate, vehicle.daily_rate, vehicle.category,
+            vehicle.state, vehicle.status, _date_to_text(vehicle.last_maintenance_date), int(vehicle.is_available)))
+
+    def delete_vehicle(self, vehicle_id: int):
+        self._queue_removal(REMOVE_VEHICLE, vehicle_id)
+
+    def save_customer(self, customer: Customer):
+        self._queue(UPSERT_CUSTOMER, customer.id, (
+            customer.id, customer.first_name, customer.last_name, customer.age,
+            customer.driver_license_number, customer.email))
+
+    def delete_customer(self, customer_id: int):
+        self._queue_removal(REMOVE_CUSTOMER, customer_id)
+
+    def save_rental(self, rental: Rental):
+        self._queue(UPSERT_RENTAL, rental.id, (
+            rental.id, rental.customer.id, rental.vehicle.id, rental.vehicle.category,
+            _date_to_text(rental.start_date), _date_to_text(rental.end_date), _date_to_text(booked_end_date(rental)),
+            rental.status, rental.final_billed_amount, _date_to_text(rental.actual_return_date), rental.penalty_amount))
+
+    def save_category_booking(self, rental_id: int):
+        self._queue(INSERT_CATEGORY_BOOKING, rental_id, (rental_id,))
+
+    def _queue(self, statement: str, key: int, row: tuple):
+        with self._lock:
+            self._pending[statement][key] = row  # Une ligne modifiée plusieurs fois n'est écrite qu'une fois
+            self._pending_count += 1
+            self._maybe_flush()
+
+    def _queue_removal(self, statement: str, key: int):
+        with self._lock:
+            self._pending_removals.append((statement, key))
+            self._pending_count += 1
+            self._maybe_flush()
+
+    def _maybe_flush(self):
+        if getattr(self._batches, "depth", 0) == 0 or self._pending_count >= self.batch_size:
+            self.flush()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        # Le verrou n'est pas gardé pendant le bloc : les autres threads continuent d'écrire et de lire.
+        self._batches.depth = getattr(self._batches, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._batches.depth -= 1
+            if self._batches.depth == 0:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending_count:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                for statement, rows in self._pending.items():
+                    if rows:
+                        self._conn.executemany(statement, rows.values())
+                for statement, key in self._pending_removals:
+                    self._conn.execute(statement, (key,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            for rows in self._pending.values():
+                rows.clear()
+            self._pending_removals.clear()
+            self._pending_count = 0
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    # --- Lectures ---
+
+    def load(self) -> Optional[StoredState]:
+        with self._lock:
+            # Les compteurs d'IDs doivent aussi tenir compte des lignes non chargées (locations terminées,
+            # véhicules et clients supprimés) : un ID déjà attribué ne doit jamais resservir
+            for model, table in ((Vehicle, "vehicles"), (Customer, "customers"), (Rental, "rentals")):
+                max_id = self._conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+                if max_id is not None and model._next_id <= max_id:
+                    model._next_id = max_id + 1
+
+            vehicles = [self._vehicle_from_row(row) for row in
+                        self._conn.execute(f"SELECT {VEHICLE_COLUMNS} FROM vehicles WHERE removed = 0 ORDER BY id")]
+            customers = [self._customer_from_row(row) for row in
+                         self._conn.execute(f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE removed = 0 ORDER BY id")]
+            if not vehicles and not customers:
+                return None
+
+            customers_by_id = {customer.id: customer for customer in customers}
+            vehicles_by_id = {vehicle.id: vehicle for vehicle in vehicles}
+            rentals = [self._rental_from_row(row, customers_by_id.get, vehicles_by_id.get) for row in
+                       self._conn.execute(f"SELECT {RENTAL_COLUMNS} FROM rentals WHERE status = 'active' ORDER BY id")]
+            # Seules les réservations par catégorie encore actives restent réattribuables
+            category_bookings = [rental_id for (rental_id,) in self._conn.execute(
+                "SELECT rentals.id FROM category_bookings JOIN rentals ON rentals.id = category_bookings.rental_id "
+                "WHERE rentals.status = 'active' ORDER BY rentals.id")]
+            return StoredState(vehicles, customers, rentals, self._load_stats(), category_bookings)
+
+    def _load_stats(self) -> dict:
+        count_by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM rentals GROUP BY status"))
+        revenue_by_category = {}
+        total_revenue = 0.0
+        penalty_total = 0.0
+        for category, revenue, penalties in self._conn.execute(
+                "SELECT category, SUM(final_billed_amount), SUM(penalty_amount) FROM rentals "
+                "WHERE status = 'completed' AND final_billed_amount IS NOT NULL GROUP BY category"):
+            revenue_by_category[category] = revenue
+            total_revenue += revenue
+            penalty_total += penalties
+        revenue_by_day = [(category, _text_to_date(day), revenue) for category, day, revenue in self._conn.execute(
+            "SELECT category, actual_return_date, SUM(final_billed_amount) FROM rentals "
+            "WHERE status = 'completed' AND final_billed_amount IS NOT NULL AND actual_return_date IS NOT NULL "
+            "GROUP BY category, actual_return_date")]
+        return {
+            "count_by_status": count_by_status,
+            "total_revenue": total_revenue,
+            "penalty_total": penalty_total,
+            "revenue_by_category": revenue_by_category,
+            "revenue_by_day": revenue_by_day,
+        }
+
+    def load_rental(self, system: "CarRentalSystem", rental_id: int) -> Optional[Rental]:
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(f"SELECT {RENTAL_COLUMNS} FROM rentals WHERE id = ?", (rental_id,)).fetchone()
+            if row is None:
+                return None
+            return self._rental_from_row(row, system.find_customer, system.find_vehicle)
+
+    def load_rentals(self, system: "CarRentalSystem", skip: Container[int], customer_id: Optional[int] = None,
+                     vehicle_id: Optional[int] = None) -> List[Rental]:
+        query = f"SELECT {RENTAL_COLUMNS} FROM rentals"
+        params: tuple = ()
+        if customer_id is not None:
+            query += " WHERE customer_id = ?"
+            params = (customer_id,)
+        elif vehicle_id is not None:
+            query += " WHERE vehicle_id = ?"
+            params = (vehicle_id,)
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+            return [self._rental_from_row(row, system.find_customer, system.find_vehicle)
+                    for row in rows if row[0] not in skip]
+
+    def find_overlap(self, vehicle_id: int, start_date: datetime.date, end_date: datetime.date,
+                     skip: Container[int] = ()) -> Optional[int]:
+        # Les périodes d'un véhicule ne se chevauchent pas : la dernière qui commence avant
+        # la fin demandée est la seule candidate (même raisonnement que BookingIndex), en remontant
+        # au-delà des locations de skip (une location annulée en mémoire ne masque pas celle d'avant).
+        # Pas de flush ici : les écritures en attente concernent des locations chargées en mémoire,
+        # donc dans skip, que le système vérifie lui-même dans son index.
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id, booked_end_date FROM rentals WHERE vehicle_id = ? AND start_date < ? AND status != 'cancelled' "
+                "ORDER BY start_date DESC, booked_end_date DESC",
+                (vehicle_id, _date_to_text(end_date)))
+            for rental_id, booked_end in cursor:
+                if rental_id not in skip:
+                    return rental_id if _date_to_text(start_date) < booked_end else None
+        return None
+
+    def find_overlapping_rentals(self, start_date: datetime.date, end_date: datetime.date) -> List[Tuple[int, int]]:
+        # L'historique est surtout dans le passé : l'index sur la fin de période rend la requête sélective.
+        with self._lock:
+            return self._conn.execute(
+                "SELECT vehicle_id, id FROM rentals WHERE booked_end_date > ? AND start_date < ? AND status != 'cancelled'",
+                (_date_to_text(start_date), _date_to_text(end_date))).fetchall()
+
+    # --- Conversion des lignes ---
+
+    def _vehicle_from_row(self, row: tuple) -> Vehicle:
+        (vehicle_id, brand, model, license_plate, daily_rate, category, state, status,
+         last_maintenance, available) = row
+        return Vehicle.restore(vehicle_id, brand, model, license_plate, daily_rate, category, state, status,
+                               _text_to_date(last_maintenance), bool(available))
+
+    def _customer_from_row(self, row: tuple) -> Customer:
+        # Historique lu à la première demande (index sur customer_id), comme celui des véhicules
+        return Customer.restore(*row, history_loader=self._customer_history)
+
+    def _customer_history(self, customer_id: int) -> List[int]:
+        with self._lock:
+            self.flush()
+            return [rental_id for (rental_id,) in
+                    self._conn.execute("SELECT id FROM rentals WHERE customer_id = ? ORDER BY id", (customer_id,))]
+
+    def _rental_from_row(self, row: tuple, find_customer, find_vehicle) -> Rental:
+        (rental_id, customer_id, vehicle_id, start_date, end_date, status,
+         final_billed_amount, actual_return_date, penalty_amount) = row
+        customer = find_customer(customer_id) or self._detached_customer(customer_id)
+        vehicle = find_vehicle(vehicle_id) or self._detached_vehicle(vehicle_id)
+        return Rental.restore(rental_id, customer, vehicle, _text_to_date(start_date), _text_to_date(end_date), status,
+                              final_billed_amount, _text_to_date(actual_return_date), penalty_amount)
+
+    def _detached_vehicle(self, vehicle_id: int) -> Vehicle:
+        vehicle = self._detached_vehicles.get(vehicle_id)
+        if vehicle is None:
+            row = self._conn.execute(f"SELECT {VEHICLE_COLUMNS} FROM vehicles WHERE id = ?", (vehicle_id,)).fetchone()
+            vehicle = self._detached_vehicles[vehicle_id] = self._vehicle_from_row(row)
+        return vehicle
+
+    def _detached_customer(self, customer_id: int) -> Customer:
+        customer = self._detached_customers.get(customer_id)
+        if customer is None:
+            row = self._conn.execute(f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE id = ?", (customer_id,)).fetchone()
+            customer = self._detached_customers[customer_id] = self._customer_from_row(row)
+        return customer
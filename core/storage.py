@@ -0,0 +1,97 @@
+import contextlib
+import datetime
+from typing import TYPE_CHECKING, Container, Iterator, List, Optional, Tuple
+
+from models.vehicle import Vehicle
+from models.customer import Customer
+from models.rental import Rental
+
+if TYPE_CHECKING:
+    from core.car_rental_system import CarRentalSystem
+
+
+class StoredState:
+    """État relu depuis un stockage persistant, prêt à être enregistré dans le système."""
+
+    def __init__(self, vehicles: List[Vehicle], customers: List[Customer], rentals: List[Rental],
+                 stats: Optional[dict] = None, category_bookings: Optional[List[int]] = None):
+        self.vehicles = vehicles
+        self.customers = customers
+        self.rentals = rentals
+        # Agrégats précalculés sur tout l'historique (None : à recalculer à partir de rentals)
+        self.stats = stats
+        # IDs des locations réservées par catégorie, encore réattribuables (book_category)
+        self.category_bookings = category_bookings or []
+
+
+class RentalStorage:
+    """
+    Interface de stockage utilisée par CarRentalSystem.
+
+    L'implémentation de base ne fait rien : c'est le mode en mémoire historique,
+    où tout vit dans les dictionnaires du système. Les backends persistants
+    redéfinissent ces méthodes ; CarRentalSystem les appelle après chaque mutation.
+    """
+
+    # Un backend "paresseux" ne charge pas tout l'historique des locations au démarrage.
+    lazy_history = False
+
+    def attach(self, system: "CarRentalSystem"):
+        """Appelé une fois l'état chargé, avec le système qui utilise ce stockage."""
+
+    def load(self) -> Optional[StoredState]:
+        """Relit l'état initial (véhicules, clients, locations nécessaires), ou None si rien n'est stocké."""
+        return None
+
+    def save_vehicle(self, vehicle: Vehicle):
+        pass
+
+    def delete_vehicle(self, vehicle_id: int):
+        pass
+
+    def save_customer(self, customer: Customer):
+        pass
+
+    def delete_customer(self, customer_id: int):
+        pass
+
+    def save_rental(self, rental: Rental):
+        pass
+
+    def save_category_booking(self, rental_id: int):
+        """Marque la location (déjà enregistrée) comme réservée par catégorie, donc réattribuable."""
+
+    def load_rental(self, system: "CarRentalSystem", rental_id: int) -> Optional[Rental]:
+        """Recharge une location absente de la mémoire, ou None."""
+        return None
+
+    def load_rentals(self, system: "CarRentalSystem", skip: Container[int], customer_id: Optional[int] = None,
+                     vehicle_id: Optional[int] = None) -> List[Rental]:
+        """
+        Recharge les locations stockées (toutes, ou d'un client / d'un véhicule)
+        dont l'ID n'est pas dans skip, c'est-à-dire celles absentes de la mémoire.
+        """
+        return []
+
+    def find_overlap(self, vehicle_id: int, start_date: datetime.date, end_date: datetime.date,
+                     skip: Container[int] = ()) -> Optional[int]:
+        """
+        Retourne l'ID d'une location stockée qui chevauche la période, ou None. Les locations de skip
+        (chargées en mémoire, dont la version stockée peut être périmée) sont ignorées.
+        """
+        return None
+
+    def find_overlapping_rentals(self, start_date: datetime.date, end_date: datetime.date) -> List[Tuple[int, int]]:
+        """Retourne les couples (ID véhicule, ID location) des locations stockées qui chevauchent la période."""
+        return []
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Regroupe les écritures effectuées dans le bloc en une seule transaction."""
+        yield
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
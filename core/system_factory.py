@@ -0,0 +1,101 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+from core.agency_network import AgencyNetwork, DEFAULT_AGENCY
+from core.car_rental_system import CarRentalSystem
+from core.sqlite_storage import SqliteStorage
+from core.journal_storage import JournalStorage
+from core.search_index import fold
+from core.storage import RentalStorage
+from models.pricing import PricingEngine
+from models.rental import Rental
+
+
+def _load_pricing():
+    """RENTACAR_PRICING désigne un fichier JSON de grilles tarifaires (format de PricingEngine.from_dict)."""
+    pricing_path = os.environ.get("RENTACAR_PRICING")
+    if pricing_path:
+        with open(pricing_path, encoding="utf-8") as f:
+            Rental.pricing = PricingEngine.from_dict(json.load(f))
+
+
+def _create_storage(agency_key: Optional[str] = None) -> Optional[RentalStorage]:
+    """
+    Stockage désigné par RENTACAR_DB (base SQLite) ou RENTACAR_JOURNAL (répertoire), None sinon.
+    agency_key sépare les agences : base « rentacar-<agence>.db », sous-répertoire « <agence> » du journal.
+    """
+    db_path = os.environ.get("RENTACAR_DB")
+    journal_dir = os.environ.get("RENTACAR_JOURNAL")
+    if db_path:
+        if agency_key:
+            stem, extension = os.path.splitext(db_path)
+            db_path = f"{stem}-{agency_key}{extension}"
+        return SqliteStorage(db_path)
+    if journal_dir:
+        return JournalStorage(os.path.join(journal_dir, agency_key) if agency_key else journal_dir)
+    return None
+
+
+def _add_demo_data(system: CarRentalSystem):
+    system.add_vehicle("Toyota", "Corolla", "AB-123-CD", 50.0,"Voiture","available")
+    system.add_vehicle("Renault", "Clio", "EF-456-GH", 40.0, "Voiture","available")
+    system.add_vehicle("Yamaha", "MT-07", "WF-002-LD", 40.0, "Moto","available")
+    system.add_customer("Alice", "Dupont", 28, "AD12345", "alice@example.com")
+    system.add_customer("Bob", "Martin", 22, "BM67890","charlie@exemple.com")
+
+
+def create_rental_system() -> CarRentalSystem:
+    """
+    Crée le système de location. Si la variable d'environnement RENTACAR_DB est définie, les données
+    sont stockées dans cette base SQLite ; avec RENTACAR_JOURNAL, dans un journal (répertoire) ;
+    sinon, tout reste en mémoire. Des données de démonstration sont ajoutées si le stockage est vide.
+    RENTACAR_PRICING désigne un fichier JSON de grilles tarifaires (format de PricingEngine.from_dict).
+    """
+    _load_pricing()
+    system = CarRentalSystem(_create_storage())
+    if not system.get_all_vehicles() and not system.get_all_customers():
+        _add_demo_data(system)
+    return system
+
+
+def agency_names() -> List[str]:
+    """Agences de RENTACAR_AGENCIES (noms séparés par des virgules), ou une seule agence par défaut."""
+    names = [name.strip() for name in os.environ.get("RENTACAR_AGENCIES", "").split(",") if name.strip()]
+    return list(dict.fromkeys(names)) or [DEFAULT_AGENCY]
+
+
+def _agency_storage_keys(names: List[str]) -> Dict[str, str]:
+    """
+    Clé de stockage de chaque agence : nom sans accents ni casse, caractères hors [0-9a-z] remplacés
+    par « - » (« Île Nord » -> « ile-nord »), rang de l'agence si rien ne reste.
+    ValueError si deux agences obtiennent la même clé : elles partageraient leurs fichiers.
+    """
+    keys: Dict[str, str] = {}
+    owners: Dict[str, str] = {}
+    for index, name in enumerate(names, 1):
+        key = re.sub(r"[^0-9a-z]+", "-", fold(name)).strip("-") or str(index)
+        if key in owners:
+            raise ValueError(f"Les agences « {owners[key]} » et « {name} » auraient le même stockage "
+                             f"(« {key} ») : renommez l'une d'elles dans RENTACAR_AGENCIES.")
+        owners[key] = name
+        keys[name] = key
+    return keys
+
+
+def create_agency_network() -> AgencyNetwork:
+    """
+    Crée un système par agence de RENTACAR_AGENCIES, chacune avec son propre stockage (voir _create_storage).
+    Avec une seule agence, c'est exactement create_rental_system (mêmes fichiers). Les données de
+    démonstration ne sont ajoutées qu'à la première agence, si toutes sont vides.
+    """
+    names = agency_names()
+    if len(names) == 1:
+        return AgencyNetwork({names[0]: create_rental_system()})
+    keys = _agency_storage_keys(names)  # Vérifiées avant d'ouvrir le moindre stockage
+    _load_pricing()
+    systems = {name: CarRentalSystem(_create_storage(keys[name])) for name in names}
+    if not any(system.get_all_vehicles() or system.get_all_customers() for system in systems.values()):
+        _add_demo_data(systems[names[0]])
+    return AgencyNetwork(systems)
@@ -0,0 +1,54 @@
+import bisect
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.vehicle import Vehicle
+from core.catalog_index import insert_sorted
+
+
+class RateIndex:
+    """
+    Véhicules triés par tarif journalier, par catégorie.
+    Permet de parcourir les véhicules du moins cher au plus cher en s'arrêtant à un tarif maximum,
+    sans trier toute la flotte à chaque recherche.
+    """
+
+    def __init__(self):
+        self._by_category: Dict[str, List[Tuple[float, int]]] = {}  # catégorie -> [(tarif, id véhicule)] trié
+        self._keys: Dict[int, Tuple[str, float]] = {}  # id véhicule -> (catégorie, tarif) indexés
+
+    def add_many(self, vehicles: Iterable[Vehicle]):
+        """
+        Ajoute un lot de véhicules, avec une seule mise à jour par catégorie touchée (voir insert_sorted).
+        """
+        added: Dict[str, List[Tuple[float, int]]] = {}
+        for vehicle in vehicles:
+            added.setdefault(vehicle.category, []).append((vehicle.daily_rate, vehicle.id))
+            self._keys[vehicle.id] = (vehicle.category, vehicle.daily_rate)
+        for category, entries in added.items():
+            insert_sorted(self._by_category.setdefault(category, []), entries)
+
+    def add(self, vehicle: Vehicle):
+        bisect.insort(self._by_category.setdefault(vehicle.category, []), (vehicle.daily_rate, vehicle.id))
+        self._keys[vehicle.id] = (vehicle.category, vehicle.daily_rate)
+
+    def remove(self, vehicle_id: int):
+        key = self._keys.pop(vehicle_id, None)
+        if key is None:
+            return
+        category, rate = key
+        entries = self._by_category[category]
+        pos = bisect.bisect_left(entries, (rate, vehicle_id))
+        if pos < len(entries) and entries[pos] == (rate, vehicle_id):
+            del entries[pos]
+
+    def iter_ids(self, category: Optional[str] = None, max_rate: Optional[float] = None) -> Iterator[int]:
+        """IDs des véhicules par tarif croissant, limités à une catégorie et/ou un tarif maximum."""
+        if category is not None:
+            entries = self._by_category.get(category, [])  # Déjà triée : pas de fusion
+        else:
+            entries = heapq.merge(*self._by_category.values())
+        for rate, vehicle_id in entries:
+            if max_rate is not None and rate > max_rate:
+                return
+            yield vehicle_id
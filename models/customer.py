@@ -1,9 +1,14 @@
+import bisect
 import datetime
+from array import array
+from typing import Callable, Iterable, Optional
 
 class Customer:
     """
     Représente un client de l'agence de location.
     """
+    __slots__ = ("id", "first_name", "last_name", "age", "driver_license_number", "email", "_rentals_history",
+                 "_history_loader")
     _next_id = 1 # Compteur pour générer des IDs uniques pour tous les clients
 
     def __init__(self, first_name: str, last_name: str, age: int, driver_license_number: str, email: str):
@@ -23,12 +28,55 @@ class Customer:
         self.age = age
         self.driver_license_number = driver_license_number
         self.email = email
-        self.rentals_history: list[int] = [] # Liste des IDs de location (de type int) pour le suivi
+        self._rentals_history = array("I") # IDs de location triés (entiers non signés compacts) pour le suivi
+        self._history_loader = None
+
+    @classmethod
+    def restore(cls, customer_id: int, first_name: str, last_name: str, age: int,
+                driver_license_number: str, email: str, rentals_history=None,
+                history_loader: Optional[Callable[[int], Iterable[int]]] = None) -> "Customer":
+        """
+        Recrée un client déjà enregistré (stockage, sauvegarde) avec son ID d'origine,
+        sans repasser par les validations. Le compteur d'IDs est avancé au-delà de cet ID.
+        history_loader : fonction (ID client) -> IDs de ses locations, appelée à la première lecture de
+        rentals_history au lieu de charger l'historique de tous les clients au démarrage.
+        """
+        customer = cls.__new__(cls)
+        customer.id = customer_id
+        customer.first_name = first_name
+        customer.last_name = last_name
+        customer.age = age
+        customer.driver_license_number = driver_license_number
+        customer.email = email
+        customer._rentals_history = array("I", sorted(rentals_history or ()))
+        customer._history_loader = history_loader
+        if Customer._next_id <= customer_id:
+            Customer._next_id = customer_id + 1
+        return customer
+
+    @property
+    def rentals_history(self) -> array:
+        loader = self._history_loader
+        if loader is not None:
+            self._rentals_history = array("I", sorted(loader(self.id)))
+            self._history_loader = None
+        return self._rentals_history
+
+    @rentals_history.setter
+    def rentals_history(self, history: array):
+        self._rentals_history = history
+        self._history_loader = None
 
     def __str__(self):
         return (f"ID Client: {self.id}, Nom: {self.first_name} {self.last_name}, "
                 f"Âge: {self.age}, Permis: {self.driver_license_number}, Email: {self.email}")
 
     def add_rental_to_history(self, rental_id: int): # L'ID de location est maintenant un int
-        if rental_id not in self.rentals_history:
-            self.rentals_history.append(rental_id)
+        history = self.rentals_history
+        # Les IDs arrivent presque toujours dans l'ordre croissant : ajout en fin, sinon insertion triée
+        if not history or history[-1] < rental_id:
+            history.append(rental_id)
+            return
+        position = bisect.bisect_left(history, rental_id)
+        if position == len(history) or history[position] != rental_id:
+            history.insert(position, rental_id)
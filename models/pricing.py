@@ -0,0 +1,273 @@
+import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def _month_day(text: str) -> Tuple[int, int]:
+    """« 07-14 » -> (7, 14)."""
+    try:
+        month, day = (int(part) for part in text.split("-"))
+        datetime.date(2000, month, day)  # Année bissextile : le 29 février est accepté
+    except (AttributeError, ValueError):
+        raise ValueError(f"Date de saison invalide : {text!r} (attendu : MM-JJ).")
+    return month, day
+
+
+class Season(NamedTuple):
+    """Période de l'année (bornes incluses, au format (mois, jour)) où le tarif journalier est multiplié."""
+    start: Tuple[int, int]
+    end: Tuple[int, int]
+    multiplier: float
+
+    def contains(self, month: int, day: int) -> bool:
+        if self.start <= self.end:
+            return self.start <= (month, day) <= self.end
+        return (month, day) >= self.start or (month, day) <= self.end  # Saison à cheval sur deux années
+
+
+class RateTable:
+    """
+    Grille tarifaire d'une catégorie de véhicules, appliquée au tarif journalier du véhicule :
+    - weekend_multiplier : multiplicateur des samedis et dimanches ;
+    - seasons : saisons avec leur multiplicateur (la première saison qui contient le jour s'applique) ;
+    - long_rental_discounts : [(durée minimum en jours, remise)] ; la remise du seuil le plus haut atteint
+      s'applique au coût des jours facturés (0.1 = 10 %) ;
+    - late_fees : [(à partir du n-ième jour de retard, pénalité par jour)], par paliers croissants.
+    La grille par défaut reproduit l'ancien calcul : tarif x jours, et 20 € par jour de retard.
+    """
+
+    __slots__ = ("weekend_multiplier", "seasons", "long_rental_discounts", "late_fees", "_multipliers")
+
+    def __init__(self, weekend_multiplier: float = 1.0, seasons: Sequence[Season] = (),
+                 long_rental_discounts: Sequence[Tuple[int, float]] = (),
+                 late_fees: Sequence[Tuple[int, float]] = ((1, 20.0),)):
+        if weekend_multiplier <= 0 or any(season.multiplier <= 0 for season in seasons):
+            raise ValueError("Les multiplicateurs de tarif doivent être strictement positifs.")
+        if any(min_days < 1 or not 0 <= discount < 1 for min_days, discount in long_rental_discounts):
+            raise ValueError("Une remise longue durée s'applique à partir d'au moins 1 jour et vaut entre 0 et 1 (exclu).")
+        late_starts = [start for start, _ in late_fees]
+        if any(start < 1 for start in late_starts) or late_starts != sorted(set(late_starts)):
+            raise ValueError("Les paliers de pénalité commencent au 1er jour de retard ou après, dans l'ordre croissant.")
+        if any(fee < 0 for _, fee in late_fees):
+            raise ValueError("Les pénalités de retard ne peuvent pas être négatives.")
+        self.weekend_multiplier = float(weekend_multiplier)
+        self.seasons = tuple(seasons)
+        self.long_rental_discounts = tuple(sorted((int(days), float(discount)) for days, discount in long_rental_discounts))
+        self.late_fees = tuple((int(start), float(fee)) for start, fee in late_fees)
+        # Multiplicateur de chaque classe de jours : classe = saison (0 = hors saison) x 2 + week-end ;
+        # sans majoration du week-end, une seule classe par saison
+        weekend_factors = (1.0, self.weekend_multiplier) if self.weekend_multiplier != 1.0 else (1.0,)
+        self._multipliers = tuple(season_multiplier * factor
+                                  for season_multiplier in (1.0,) + tuple(s.multiplier for s in self.seasons)
+                                  for factor in weekend_factors)
+
+    @classmethod
+    def from_dict(cls, data: dict, base: Optional["RateTable"] = None) -> "RateTable":
+        """Grille décrite en JSON ; les clés absentes sont reprises de base (sinon valeurs par défaut)."""
+        base = base or cls()
+        seasons = base.seasons
+        if "seasons" in data:
+            seasons = [Season(_month_day(s["start"]), _month_day(s["end"]), float(s["multiplier"]))
+                       for s in data["seasons"]]
+        return cls(weekend_multiplier=float(data.get("weekend_multiplier", base.weekend_multiplier)),
+                   seasons=seasons,
+                   long_rental_discounts=data.get("long_rental_discounts", base.long_rental_discounts),
+                   late_fees=data.get("late_fees", base.late_fees))
+
+    @property
+    def class_count(self) -> int:
+        return len(self._multipliers)
+
+    def day_class(self, day: datetime.date) -> int:
+        season = next((i for i, s in enumerate(self.seasons, start=1) if s.contains(day.month, day.day)), 0)
+        if self.weekend_multiplier == 1.0:
+            return season
+        return season * 2 + (day.weekday() >= 5)
+
+    def discount(self, days: int) -> float:
+        discount = 0.0
+        for min_days, rate in self.long_rental_discounts:
+            if days >= min_days:
+                discount = rate
+        return discount
+
+    def late_fee_days(self, days_late: int) -> List[int]:
+        """Nombre de jours de retard facturés dans chaque palier de late_fees."""
+        counts = []
+        for i, (start, _) in enumerate(self.late_fees):
+            stop = self.late_fees[i + 1][0] if i + 1 < len(self.late_fees) else None
+            covered = max(0, days_late - start + 1)
+            counts.append(covered if stop is None else min(covered, stop - start))
+        return counts
+
+
+class PricingEngine:
+    """
+    Calcul des prix des locations : une grille par catégorie (default pour les autres).
+
+    Deux interfaces qui donnent exactement les mêmes montants :
+    - quote / final_cost, pour une location (utilisées par Rental) ;
+    - quote_many / final_costs_many, pour des milliers de couples (véhicule, période) à la fois,
+      avec l'arithmétique de dates de NumPy (comparaison de devis, recalcul en masse).
+    Les deux comptent d'abord, en entiers, les jours de chaque classe (saison, week-end), puis
+    combinent ces comptes avec les multiplicateurs dans le même ordre : mêmes opérations flottantes,
+    donc mêmes résultats au centime près et au-delà.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, RateTable]] = None, default: Optional[RateTable] = None):
+        self.default = default or RateTable()
+        self.tables = dict(tables or {})
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PricingEngine":
+        """
+        Moteur décrit en JSON : {"default": {...}, "categories": {"Camion": {...}}}, chaque grille au format
+        de RateTable.from_dict ; une grille de catégorie reprend les valeurs de la grille par défaut.
+        """
+        default = RateTable.from_dict(data.get("default", {}))
+        tables = {category: RateTable.from_dict(table, default) for category, table in data.get("categories", {}).items()}
+        return cls(tables, default)
+
+    def table_for(self, category: str) -> RateTable:
+        return self.tables.get(category, self.default)
+
+    # --- Une location ---
+
+    @staticmethod
+    def _cost(table: RateTable, daily_rate: float, start_date: datetime.date, end_date: datetime.date) -> float:
+        days = (end_date - start_date).days + 1
+        multipliers = table._multipliers
+        if days <= 0:
+            days, units = 0, 0.0
+        elif len(multipliers) == 1:
+            units = days * multipliers[0]  # Cas courant (une seule classe de jours) : pas de parcours des jours
+        else:
+            counts = [0] * len(multipliers)
+            for offset in range(days):
+                counts[table.day_class(start_date + datetime.timedelta(days=offset))] += 1
+            units = 0.0
+            for count, multiplier in zip(counts, multipliers):
+                units += count * multiplier
+        discount = table.discount(days) if table.long_rental_discounts else 0.0
+        return daily_rate * units * (1.0 - discount)
+
+    def quote(self, daily_rate: float, category: str, start_date: datetime.date, end_date: datetime.date) -> float:
+        """Prix de la période [start_date, end_date] (jours inclus) au tarif journalier daily_rate."""
+        return self._cost(self.tables.get(category, self.default), daily_rate, start_date, end_date)
+
+    def final_cost(self, daily_rate: float, category: str, start_date: datetime.date, end_date: datetime.date,
+                   return_date: datetime.date) -> Tuple[float, float]:
+        """
+        (coût final, pénalité) d'une location rendue le return_date : jours effectivement utilisés
+        au prix de la grille, plus la pénalité des jours de retard après end_date.
+        """
+        table = self.tables.get(category, self.default)
+        cost = self._cost(table, daily_rate, start_date, return_date)
+        days_late = (return_date - end_date).days
+        penalty = 0.0
+        if days_late > 0 and len(table.late_fees) == 1:
+            start, fee = table.late_fees[0]
+            penalty += max(0, days_late - start + 1) * fee  # Même calcul que late_fee_days, sans liste
+        elif days_late > 0:
+            for count, (_, fee) in zip(table.late_fee_days(days_late), table.late_fees):
+                penalty += count * fee
+        return cost + penalty, penalty
+
+    # --- En masse (NumPy) ---
+
+    @staticmethod
+    def _day_numbers(np, dates):
+        """Dates (séquence de datetime.date ou tableau datetime64) -> nombre de jours depuis le 1970-01-01."""
+        if isinstance(dates, np.ndarray):
+            return dates.astype("datetime64[D]").astype(np.int64)
+        # Plus rapide que la conversion des objets date par NumPy
+        return np.fromiter((date.toordinal() for date in dates), dtype=np.int64) - EPOCH_ORDINAL
+
+    def _table_codes(self, np, categories: Sequence[str], count: int):
+        """Index de la grille de chaque ligne : 0 = défaut, puis les grilles de self.tables dans l'ordre."""
+        codes = {category: i for i, category in enumerate(self.tables, start=1)}
+        return np.fromiter((codes.get(category, 0) for category in categories), dtype=np.int32, count=count)
+
+    @staticmethod
+    def _calendar_classes(np, table: RateTable, first_day: int, last_day: int):
+        """Classe (voir RateTable.day_class) de chaque jour de first_day à last_day."""
+        days = np.arange(first_day, last_day + 1, dtype=np.int64)
+        dates = days.astype("datetime64[D]")
+        months = dates.astype("datetime64[M]")
+        month = months.astype(np.int64) % 12 + 1
+        day = (dates - months).astype(np.int64) + 1
+        season = np.zeros(len(days), dtype=np.int64)
+        for i in range(len(table.seasons), 0, -1):  # À l'envers : la première saison qui contient le jour l'emporte
+            s = table.seasons[i - 1]
+            after_start = (month > s.start[0]) | ((month == s.start[0]) & (day >= s.start[1]))
+            before_end = (month < s.end[0]) | ((month == s.end[0]) & (day <= s.end[1]))
+            inside = after_start & before_end if s.start <= s.end else after_start | before_end
+            season[inside] = i
+        if table.weekend_multiplier == 1.0:
+            return season
+        return season * 2 + ((days + 3) % 7 >= 5)  # Le 1970-01-01 était un jeudi (3)
+
+    def _costs_many(self, np, rates, codes, starts, ends):
+        """Coût de chaque ligne sur [starts, ends], grille par grille."""
+        costs = np.zeros(len(rates), dtype=np.float64)
+        if not len(rates):
+            return costs
+        first_day = int(starts.min())
+        last_day = max(int(ends.max()), int(starts.max()))  # Les lignes invalides (fin < début) sont indexées aussi
+        for code, table in enumerate([self.default] + list(self.tables.values())):
+            rows = np.flatnonzero(codes == code)
+            if not len(rows):
+                continue
+            row_starts, row_ends = starts[rows], ends[rows]
+            valid = row_ends >= row_starts
+            classes = self._calendar_classes(np, table, first_day, last_day)
+            # Jours de la classe c dans [début, fin] = différence de deux sommes cumulées (entières)
+            units = np.zeros(len(rows), dtype=np.float64)
+            days = np.zeros(len(rows), dtype=np.int64)
+            for c, multiplier in enumerate(table._multipliers):
+                cumulated = np.concatenate(([0], np.cumsum(classes == c)))
+                counts = np.where(valid, cumulated[np.clip(row_ends - first_day + 1, 0, None)]
+                                  - cumulated[row_starts - first_day], 0)
+                units += counts * multiplier
+                days += counts
+            discount = np.zeros(len(rows), dtype=np.float64)
+            for min_days, rate in table.long_rental_discounts:
+                discount[days >= min_days] = rate
+            costs[rows] = rates[rows] * units * (1.0 - discount)
+        return costs
+
+    def quote_many(self, daily_rates: Sequence[float], categories: Sequence[str],
+                   start_dates: Sequence, end_dates: Sequence):
+        """Prix de chaque ligne (tableau NumPy), comme quote() appelé ligne par ligne."""
+        import numpy as np
+        rates = np.asarray(daily_rates, dtype=np.float64)
+        codes = self._table_codes(np, categories, len(rates))
+        return self._costs_many(np, rates, codes, self._day_numbers(np, start_dates), self._day_numbers(np, end_dates))
+
+    def final_costs_many(self, daily_rates: Sequence[float], categories: Sequence[str], start_dates: Sequence,
+                         end_dates: Sequence, return_dates: Sequence):
+        """(coûts finaux, pénalités) de chaque ligne (tableaux NumPy), comme final_cost() ligne par ligne."""
+        import numpy as np
+        rates = np.asarray(daily_rates, dtype=np.float64)
+        codes = self._table_codes(np, categories, len(rates))
+        ends = self._day_numbers(np, end_dates)
+        returns = self._day_numbers(np, return_dates)
+        costs = self._costs_many(np, rates, codes, self._day_numbers(np, start_dates), returns)
+        days_late = np.maximum(returns - ends, 0)
+        penalties = np.zeros(len(rates), dtype=np.float64)
+        for code, table in enumerate([self.default] + list(self.tables.values())):
+            rows = np.flatnonzero(codes == code)
+            if not len(rows):
+                continue
+            penalty = np.zeros(len(rows), dtype=np.float64)
+            for i, (start, fee) in enumerate(table.late_fees):
+                covered = np.maximum(days_late[rows] - start + 1, 0)
+                if i + 1 < len(table.late_fees):
+                    covered = np.minimum(covered, table.late_fees[i + 1][0] - start)
+                penalty += covered * fee
+            penalties[rows] = penalty
+        return costs + penalties, penalties
+
+
+DEFAULT_PRICING = PricingEngine()
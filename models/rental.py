@@ -1,10 +1,18 @@
 import datetime
-from typing import Optional
+import sys
+from typing import Callable, Optional, Tuple
 from models.customer import Customer
 from models.vehicle import Vehicle
+from models.pricing import DEFAULT_PRICING, PricingEngine
+
+StatusListener = Callable[["Rental", str, str], None]
 
 class Rental:
+    __slots__ = ("id", "customer", "vehicle", "start_date", "end_date", "status", "final_billed_amount",
+                 "actual_return_date", "penalty_amount", "_status_listeners")
     _next_id = 1
+    # Grilles tarifaires utilisées par toutes les locations (voir models/pricing.py et RENTACAR_PRICING)
+    pricing: PricingEngine = DEFAULT_PRICING
 
     def __init__(self, customer: Customer, vehicle: Vehicle, start_date: datetime.date, end_date: datetime.date):
         self.id = Rental._next_id
@@ -14,20 +22,57 @@ class Rental:
         self.start_date = start_date
         self.end_date = end_date # Date de retour prévue
         self.status = "active" # Statut initial : active, completed, cancelled
-        self.is_active = True
         self.final_billed_amount: Optional[float] = None
         self.actual_return_date: Optional[datetime.date] = None
         self.penalty_amount: float = 0.0 
+        self._status_listeners: Tuple[StatusListener, ...] = ()
+
+    @classmethod
+    def restore(cls, rental_id: int, customer: Customer, vehicle: Vehicle, start_date: datetime.date,
+                end_date: datetime.date, status: str = "active", final_billed_amount: Optional[float] = None,
+                actual_return_date: Optional[datetime.date] = None, penalty_amount: float = 0.0) -> "Rental":
+        """
+        Recrée une location déjà enregistrée (stockage, sauvegarde) avec son ID d'origine.
+        Le compteur d'IDs est avancé au-delà de cet ID.
+        """
+        rental = cls.__new__(cls)
+        rental.id = rental_id
+        rental.customer = customer
+        rental.vehicle = vehicle
+        rental.start_date = start_date
+        rental.end_date = end_date
+        rental.status = sys.intern(status)
+        rental.final_billed_amount = final_billed_amount
+        rental.actual_return_date = actual_return_date
+        rental.penalty_amount = penalty_amount
+        rental._status_listeners = ()
+        if Rental._next_id <= rental_id:
+            Rental._next_id = rental_id + 1
+        return rental
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    def add_status_listener(self, listener: StatusListener):
+        """
+        Enregistre une fonction appelée avec (location, ancien statut, nouveau statut) à chaque changement.
+        Les abonnés sont gardés dans un tuple : passer toujours le même objet (méthode liée mise en cache)
+        évite d'allouer une liste et une méthode liée par location.
+        """
+        if listener not in self._status_listeners:
+            self._status_listeners += (listener,)
 
     def set_status(self, status: str):
-        self.status = status
-        self.is_active = (status == "active")
+        old_status = self.status
+        self.status = sys.intern(status)
+        for listener in self._status_listeners:
+            listener(self, old_status, status)
 
     def calculate_base_cost(self) -> float:
-        """Calcule le coût de base de la location basé sur la durée prévue."""
+        """Calcule le coût de base de la location basé sur la durée prévue (grille tarifaire de la catégorie)."""
         # Le coût de base est calculé sur la durée prévue initialement
-        duration_days = (self.end_date - self.start_date).days + 1
-        return self.vehicle.daily_rate * duration_days
+        return self.pricing.quote(self.vehicle.daily_rate, self.vehicle.category, self.start_date, self.end_date)
 
     def calculate_final_cost_on_return(self, return_date: datetime.date) -> float:
     
@@ -40,27 +85,10 @@ class Rental:
 
         self.actual_return_date = return_date
 
-        # Calculer le coût basé sur la durée effective pour le tarif journalier initial
-        effective_duration_days = (self.actual_return_date - self.start_date).days + 1
-        base_cost_effective_duration = self.vehicle.daily_rate * effective_duration_days
-
-        # --- LOGIQUE DE PÉNALITÉ DE RETARD ---
-        self.penalty_amount = 0.0 # Réinitialiser la pénalité avant calcul
-
-        # Si la date de retour effective est APRES la date de retour prévue
-        if self.actual_return_date > self.end_date:
-            # Calculer les jours de retard
-            # On ajoute 1 car si on rend le 2 au lieu du 1, c'est 1 jour de retard
-            days_late = (self.actual_return_date - self.end_date).days
-            
-            if days_late > 0:
-                # Définir le montant de la pénalité par jour de retard
-                # Vous pouvez ajuster cette valeur (ex: 20.0, 50.0, etc.)
-                PENALTY_PER_DAY = 20.0 
-                self.penalty_amount = days_late * PENALTY_PER_DAY
-
-        # Le coût final est le coût basé sur la durée effective + la pénalité
-        cost = base_cost_effective_duration + self.penalty_amount
+        # Coût de la durée effective selon la grille tarifaire, plus la pénalité des jours de retard
+        # (paliers late_fees de la grille ; par défaut 20 € par jour après la date de retour prévue)
+        cost, self.penalty_amount = self.pricing.final_cost(self.vehicle.daily_rate, self.vehicle.category,
+                                                            self.start_date, self.end_date, return_date)
 
         self.final_billed_amount = cost # Stocke le coût final
         return cost
@@ -1,7 +1,15 @@
 import datetime
+import sys
+from array import array
+
+# Statuts possibles : la valeur du dict est l'instance partagée de la chaîne
+VEHICLE_STATUSES = {status: status for status in ("available", "rented", "maintenance")}
 
 class Vehicle:
     #Classe de base pour représenter un véhicule dans le système.
+    # __slots__ : pas de __dict__ par instance, la flotte entière tient en mémoire à moindre coût
+    __slots__ = ("id", "brand", "model", "license_plate", "daily_rate", "category", "state", "status",
+                 "last_maintenance_date", "rental_history", "_is_available")
     _next_id = 1  # Compteur pour générer des IDs uniques pour tous les véhicules
 
     def __init__(self, brand: str, model: str, license_plate: str, daily_rate: float,
@@ -15,30 +23,65 @@ class Vehicle:
         self.id = Vehicle._next_id # L'ID est généré automatiquement
         Vehicle._next_id += 1      # Incrémente le compteur pour le prochain véhicule
 
-        self.brand = brand
-        self.model = model
+        # Les valeurs très répétées (catégorie, état, marque, modèle) sont internées : une seule chaîne partagée
+        self.brand = sys.intern(brand)
+        self.model = sys.intern(model)
         self.license_plate = license_plate
         self.daily_rate = daily_rate
-        self.category = category
-        self.state = state
+        self.category = sys.intern(category)
+        self.state = sys.intern(state)
         self.status = "available"  
         self.last_maintenance_date = None
-        self.rental_history = []
+        self.rental_history = array("I")  # IDs de location, entiers non signés compacts
+        self._is_available = True
+
+    @classmethod
+    def restore(cls, vehicle_id: int, brand: str, model: str, license_plate: str, daily_rate: float,
+                category: str, state: str, status: str = "available", last_maintenance_date=None,
+                is_available: bool = True) -> "Vehicle":
+        """
+        Recrée un véhicule déjà enregistré (stockage, sauvegarde) avec son ID d'origine,
+        sans repasser par les validations. Le compteur d'IDs est avancé au-delà de cet ID.
+        is_available : disponibilité enregistrée (un véhicule en maintenance reste indisponible).
+        """
+        vehicle = cls.__new__(cls)
+        vehicle.id = vehicle_id
+        vehicle.brand = sys.intern(brand)
+        vehicle.model = sys.intern(model)
+        vehicle.license_plate = license_plate
+        vehicle.daily_rate = daily_rate
+        vehicle.category = sys.intern(category)
+        vehicle.state = sys.intern(state)
+        vehicle.status = sys.intern(status)
+        vehicle.last_maintenance_date = last_maintenance_date
+        vehicle.rental_history = array("I")
+        vehicle._is_available = is_available
+        if Vehicle._next_id <= vehicle_id:
+            Vehicle._next_id = vehicle_id + 1
+        return vehicle
 
     def __str__(self):
         return (f"ID: {self.id}, Marque: {self.brand}, Modèle: {self.model}, "
                 f"Catégorie: {self.category}, Plaque: {self.license_plate}, "
                 f"Tarif/jour: {self.daily_rate}€, Statut: {self.status}, État: {self.state}")
 
+    @property
     def is_available(self) -> bool:
-        """Vérifie si le véhicule est disponible pour la location."""
-        return self.status == "available"
+        """
+        Vérifie si le véhicule peut être proposé à la location (selon son état, voir update_vehicle).
+        Le statut de location (self.status) est suivi séparément.
+        """
+        return self._is_available
+
+    @is_available.setter
+    def is_available(self, value: bool):
+        self._is_available = value
 
     def set_status(self, new_status: str):
         """Met à jour le statut du véhicule."""
-        if new_status not in ["available", "rented", "maintenance"]:
+        if new_status not in VEHICLE_STATUSES:
             raise ValueError("Statut de véhicule invalide.")
-        self.status = new_status
+        self.status = VEHICLE_STATUSES[new_status]
 
     def record_maintenance(self):
         """Enregistre une date de maintenance et met le véhicule en statut 'maintenance'."""
@@ -47,6 +90,7 @@ class Vehicle:
 
 class Car(Vehicle):
     """Représente une voiture."""
+    __slots__ = ("num_seats",)
     def __init__(self, brand: str, model: str, license_plate: str, daily_rate: float,
                  state: str, num_seats: int): 
         super().__init__(brand, model, license_plate, daily_rate, "Car", state) 
@@ -57,6 +101,7 @@ class Car(Vehicle):
 
 class Truck(Vehicle):
     """Représente un camion."""
+    __slots__ = ("cargo_capacity_kg",)
     def __init__(self, brand: str, model: str, license_plate: str, daily_rate: float,
                  state: str, cargo_capacity_kg: float): 
         super().__init__(brand, model, license_plate, daily_rate, "Truck", state)  
@@ -67,6 +112,7 @@ class Truck(Vehicle):
 
 class Motorcycle(Vehicle):
     """Représente une moto."""
+    __slots__ = ("engine_cc",)
     def __init__(self, brand: str, model: str, license_plate: str, daily_rate: float,
                  state: str, engine_cc: int): 
         super().__init__(brand, model, license_plate, daily_rate, "Motorcycle", state) 
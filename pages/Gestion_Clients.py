@@ -1,5 +1,8 @@
 import streamlit as st
 from core.car_rental_system import CarRentalSystem
+from core.importers import read_records
+from shared_system import get_agency_network, get_instrumentation, select_agency
+from paging_widgets import PICKER_RESULTS, page_offset, pager, search_picker
 from models.customer import Customer # Importation nécessaire si vous manipulez directement des objets Customer
 
 # Supprimez cette ligne ou celle qui suit si elle est en double
@@ -7,17 +10,26 @@ st.set_page_config(page_title="Gestion des Clients", page_icon="👥")
 # Supprimez cette ligne ou celle qui suit si elle est en double
 st.title("👥 Gestion des Clients")
 
-# --- Initialisation du système de location (indispensable) ---
-if "car_rental_system" not in st.session_state:
-    st.session_state.car_rental_system = CarRentalSystem()
-    # Optionnel : Ajoutez quelques clients pour la démonstration si l'app démarre ici
-    st.session_state.car_rental_system.add_customer("Alice", "Dupont", 28, "AD12345","alicedupont@gmail.com")
-    st.session_state.car_rental_system.add_customer("Bob", "Martin", 35, "BM67890", "bobmartin@gmail.com")
+# --- Système de l'agence choisie, partagé par toutes les sessions (voir shared_system.py) ---
+# Les ajouts, modifications et suppressions passent par le réseau : un client peut avoir une copie
+# dans chaque agence où il a loué, et son permis et son email sont uniques dans toutes les agences.
+agency_network = get_agency_network()
+agency = select_agency()
+car_rental_system: CarRentalSystem = agency_network.system(agency)
+instrumentation = get_instrumentation()  # Durées des phases d'affichage (page Performance)
 
-# Récupérez l'instance du système de location depuis session_state
-car_rental_system: CarRentalSystem = st.session_state.car_rental_system
+SORT_OPTIONS = {"id": "ID", "last_name": "Nom", "first_name": "Prénom", "age": "Âge", "email": "Email"}
 
-menu = ["Ajouter un client", "Afficher les clients", "Mettre à jour un client", "Supprimer un client"]
+
+def search_customers(text: str):
+    return car_rental_system.search_customers(text, PICKER_RESULTS)
+
+
+def customer_label(c: Customer) -> str:
+    return f"{c.first_name} {c.last_name} ({c.email}) - ID: {c.id}"
+
+
+menu = ["Ajouter un client", "Afficher les clients", "Mettre à jour un client", "Supprimer un client", "Importer des clients"]
 choice = st.sidebar.selectbox("Actions sur les clients", menu)
 
 # Utilisez l'instance déjà définie au début du script
@@ -36,45 +48,66 @@ if choice == "Ajouter un client":
         submitted = st.form_submit_button("Ajouter le client")
         if submitted:
             if first_name and last_name and email and age and driver_license_number:
-                customer = rental_system.add_customer(first_name, last_name, age, driver_license_number, email)
-                if customer:
+                try:
+                    customer = agency_network.add_customer(agency, first_name, last_name, age, driver_license_number,
+                                                           email)
+                except ValueError as e:  # Permis ou email déjà attribué (toutes agences), ou validation du client
+                    st.error(f"Le client n'a pas été ajouté : {e}")
+                else:
                     st.success(f"Client {customer.first_name} {customer.last_name} (ID: {customer.id}) ajouté avec succès.")
                     st.rerun()
-                else:
-                    st.error("Une erreur est survenue lors de l'ajout du client.")
             else:
                 st.warning("Veuillez remplir tous les champs obligatoires.")
 
 elif choice == "Afficher les clients":
     st.subheader("Liste de tous les clients")
-    customers = car_rental_system.get_all_customers()
+    # Seule la page affichée est lue et mise en forme, quel que soit le nombre de clients
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        search = st.text_input("Rechercher (nom, email, permis)")
+    with col2:
+        sort_by = st.selectbox("Trier par", list(SORT_OPTIONS), format_func=SORT_OPTIONS.get)
+        descending = st.checkbox("Ordre décroissant")
+    with col3:
+        page_size = st.selectbox("Clients par page", [25, 50, 100])
+
+    filters = {"search": search.strip()}
+    offset = page_offset("customers", page_size, (filters["search"], sort_by, descending, page_size))
+    with instrumentation.phase("Gestion Clients", "données"):
+        page = car_rental_system.list_customers(offset, page_size, sort_by, descending, filters)
+    customers = page.items
     if customers:
-        customer_data = []
-        for c in customers:
-            history_summary = f"{len(c.rentals_history)} locations"
-
-            customer_data.append({
-                "ID": c.id,
-                "Prénom": c.first_name,
-                "Nom": c.last_name,
-                "Email": c.email,
-                "Âge": c.age,
-                "Permis de Conduire": c.driver_license_number,
-                "Historique des Locations": history_summary
-            })
-        st.dataframe(customer_data, use_container_width=True)
+        with instrumentation.phase("Gestion Clients", "mise en forme"):
+            customer_data = []
+            for c in customers:
+                history_summary = f"{len(c.rentals_history)} locations"
+
+                customer_data.append({
+                    "ID": c.id,
+                    "Prénom": c.first_name,
+                    "Nom": c.last_name,
+                    "Email": c.email,
+                    "Âge": c.age,
+                    "Permis de Conduire": c.driver_license_number,
+                    "Historique des Locations": history_summary
+                })
+        with instrumentation.phase("Gestion Clients", "affichage"):
+            st.dataframe(customer_data, use_container_width=True)
+        pager("customers", page)
+    elif offset:
+        pager("customers", page)
+    elif filters["search"]:
+        st.info("Aucun client ne correspond à cette recherche.")
     else:
         st.info("Aucun client enregistré pour le moment.")
 
 elif choice == "Mettre à jour un client":
     st.subheader("Mettre à jour un client existant")
-    customers = car_rental_system.get_all_customers()
-    if customers:
-        customer_labels = {f"{c.first_name} {c.last_name} ({c.email}) - ID: {c.id}": c.id for c in customers}
-        selected_customer_label = st.selectbox("Sélectionnez le client à mettre à jour", list(customer_labels.keys()))
+    if car_rental_system.list_customers(limit=1).items:
+        selected_customer_id = search_picker("Sélectionnez le client à mettre à jour", "update_customer", search_customers,
+                                             customer_label)
 
-        if selected_customer_label:
-            selected_customer_id = customer_labels[selected_customer_label]
+        if selected_customer_id is not None:
             selected_customer = car_rental_system.find_customer(selected_customer_id)
 
             if selected_customer:
@@ -88,13 +121,15 @@ elif choice == "Mettre à jour un client":
                     update_submitted = st.form_submit_button("Mettre à jour")
                     if update_submitted:
                         if new_first_name and new_last_name and new_email:
-                            selected_customer.first_name = new_first_name
-                            selected_customer.last_name = new_last_name
-                            selected_customer.email = new_email
-                            selected_customer.age = new_age
-                            selected_customer.driver_license_number = new_driver_license_number
-                            st.success(f"Client ID {selected_customer_id} mis à jour.")
-                            st.rerun()
+                            try:
+                                # Toutes les copies du client sont modifiées (âge vérifié à la location partout)
+                                agency_network.update_customer(selected_customer_id, new_first_name, new_last_name,
+                                                               new_age, new_driver_license_number, new_email)
+                            except ValueError as e:  # Permis ou email déjà attribué à un autre client
+                                st.error(f"Le client n'a pas été modifié : {e}")
+                            else:
+                                st.success(f"Client ID {selected_customer_id} mis à jour.")
+                                st.rerun()
                         else:
                             st.error("Veuillez remplir tous les champs correctement.")
             else:
@@ -105,18 +140,16 @@ elif choice == "Mettre à jour un client":
 # Correction pour la suppression d'un client
 elif choice == "Supprimer un client":
     st.subheader("Supprimer un client")
-    customers = car_rental_system.get_all_customers()
-    if customers:
-        customer_labels = {f"{c.first_name} {c.last_name} ({c.email}) - ID: {c.id}": c.id for c in customers}
-        selected_customer_label = st.selectbox("Sélectionnez le client à supprimer", list(customer_labels.keys()))
+    if car_rental_system.list_customers(limit=1).items:
+        selected_customer_id = search_picker("Sélectionnez le client à supprimer", "remove_customer", search_customers,
+                                             customer_label)
 
-        if selected_customer_label:
-            selected_customer_id = customer_labels[selected_customer_label]
+        if selected_customer_id is not None:
             if st.button("Confirmer la suppression"):
                 # >> C'EST ICI QU'IL FAUT AJOUTER LA CONVERSION EXPLICITE <<
                 try:
                     customer_id_for_removal = int(selected_customer_id) # S'assurer que c'est un entier
-                    if car_rental_system.remove_customer(customer_id_for_removal):
+                    if agency_network.remove_customer(customer_id_for_removal):  # Dans toutes les agences
                         st.success(f"Client ID {customer_id_for_removal} supprimé avec succès.")
                         st.rerun()
                     else:
@@ -125,3 +158,15 @@ elif choice == "Supprimer un client":
                     st.error("Erreur de type : l'ID du client doit être un nombre entier.")
     else:
         st.info("Aucun client à supprimer.")
+
+elif choice == "Importer des clients":
+    st.subheader("Importer des clients depuis un fichier")
+    st.caption("Fichier CSV (avec ligne d'en-tête) ou JSONL. Colonnes attendues : first_name, last_name, age, driver_license_number, email.")
+    uploaded_file = st.file_uploader("Fichier à importer", type=["csv", "jsonl"])
+    if uploaded_file is not None and st.button("Lancer l'import"):
+        file_format = "jsonl" if uploaded_file.name.lower().endswith(".jsonl") else "csv"
+        report = agency_network.import_customers(agency, read_records(uploaded_file, file_format))
+        st.success(f"Import terminé : {report}.")
+        if report.rejected:
+            st.warning("Lignes rejetées (numéro d'enregistrement et motif) :")
+            st.dataframe([{"Ligne": line, "Erreur": message} for line, message in report.rejected], use_container_width=True)
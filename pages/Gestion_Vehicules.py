@@ -1,5 +1,8 @@
 import streamlit as st
 from core.car_rental_system import CarRentalSystem
+from core.importers import read_records
+from shared_system import get_agency_system, get_instrumentation
+from paging_widgets import PICKER_RESULTS, page_offset, pager, search_picker
 from models.vehicle import Vehicle 
 
 st.set_page_config(page_title="Gestion des Véhicules", page_icon="🚗")
@@ -8,22 +11,23 @@ st.title("🚗 Gestion des Véhicules")
 # --- Constantes pour les choix de catégorie et d'état ---
 VEHICLE_CATEGORIES = ["Voiture", "Camion", "Moto", "Bus"] 
 VEHICLE_STATES = ["disponible", "loué", "en maintenance", "hors service"] 
+SORT_OPTIONS = {"id": "ID", "brand": "Marque et modèle", "license_plate": "Plaque", "daily_rate": "Tarif journalier",
+                "category": "Catégorie", "state": "État"}
 
-# --- Initialisation du système de location ---
-if "car_rental_system" not in st.session_state:
-    st.session_state.car_rental_system = CarRentalSystem()
-    # Ajout des véhicules initiaux avec les catégories et états cohérents.
-   
-    st.session_state.car_rental_system.add_vehicle("Renault", "Clio", "EF-456-GH", 40.0, "Voiture", "disponible")
-    st.session_state.car_rental_system.add_vehicle("Peugeot", "308", "AB-123-CD", 55.0, "Voiture", "disponible")
-    st.session_state.car_rental_system.add_vehicle("Mercedes", "Sprinter", "FG-789-HI", 90.0, "Camion", "disponible")
-    st.session_state.car_rental_system.add_vehicle("Honda", "CB500F", "JK-456-LM", 30.0, "Moto", "en maintenance")
-    st.session_state.car_rental_system.add_vehicle("Tesla", "Model 3", "TS-123-LA", 120.0, "Véhicule", "disponible")
-
-# Récupérez l'instance du système de location depuis session_state
-car_rental_system: CarRentalSystem = st.session_state.car_rental_system
-
-menu = ["Ajouter un véhicule", "Afficher les véhicules", "Mettre à jour un véhicule", "Supprimer un véhicule"]
+# --- Système de l'agence choisie, partagé par toutes les sessions (voir shared_system.py) ---
+car_rental_system: CarRentalSystem = get_agency_system()
+instrumentation = get_instrumentation()  # Durées des phases d'affichage (page Performance)
+
+
+def search_vehicles(text: str):
+    return car_rental_system.search_vehicles(text, PICKER_RESULTS)
+
+
+def vehicle_label(v: Vehicle) -> str:
+    return f"{v.brand} {v.model} ({v.license_plate}) - ID: {v.id}"
+
+
+menu = ["Ajouter un véhicule", "Afficher les véhicules", "Mettre à jour un véhicule", "Supprimer un véhicule", "Importer des véhicules"]
 choice = st.sidebar.selectbox("Actions sur les véhicules", menu)
 
 if choice == "Ajouter un véhicule":
@@ -41,47 +45,70 @@ if choice == "Ajouter un véhicule":
         submitted = st.form_submit_button("Ajouter le véhicule")
         if submitted:
             if brand and model and license_plate and daily_rate > 0 and category and state: 
-                vehicle = car_rental_system.add_vehicle(brand, model, license_plate, daily_rate, category, state)
-                if vehicle:
+                try:
+                    vehicle = car_rental_system.add_vehicle(brand, model, license_plate, daily_rate, category, state)
+                except ValueError as e:  # Plaque déjà attribuée ou validation du véhicule
+                    st.error(f"Le véhicule n'a pas été ajouté : {e}")
+                else:
                     st.success(f"Véhicule {vehicle.brand} {vehicle.model} (ID: {vehicle.id}) ajouté avec succès.")
                     st.rerun()
-                else:
-                    st.error("Une erreur est survenue lors de l'ajout du véhicule. La plaque d'immatriculation existe peut-être déjà.")
             else:
                 st.warning("Veuillez remplir tous les champs obligatoires et s'assurer que le tarif est positif.")
 
 elif choice == "Afficher les véhicules":
     st.subheader("Liste de tous les véhicules")
-    vehicles = car_rental_system.get_all_vehicles() 
+    # Seule la page affichée est lue et mise en forme, quelle que soit la taille de la flotte
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        search = st.text_input("Rechercher (marque, modèle, plaque)")
+        sort_by = st.selectbox("Trier par", list(SORT_OPTIONS), format_func=SORT_OPTIONS.get)
+    with col2:
+        category_filter = st.selectbox("Catégorie", ["Toutes"] + VEHICLE_CATEGORIES)
+        descending = st.checkbox("Ordre décroissant")
+    with col3:
+        state_filter = st.selectbox("État", ["Tous"] + VEHICLE_STATES)
+        page_size = st.selectbox("Véhicules par page", [25, 50, 100])
+
+    filters = {"search": search.strip(), "category": "" if category_filter == "Toutes" else category_filter,
+               "state": "" if state_filter == "Tous" else state_filter}
+    offset = page_offset("vehicles", page_size, (tuple(filters.values()), sort_by, descending, page_size))
+    with instrumentation.phase("Gestion Véhicules", "données"):
+        page = car_rental_system.list_vehicles(offset, page_size, sort_by, descending, filters)
+    vehicles = page.items
 
     if vehicles:
-        vehicle_data = []
-        for v in vehicles:
-            # L'attribut 'Disponible' est déduit de l'attribut 'state'
-            est_disponible = "Oui" if v.state == "disponible" else "Non" 
-            vehicle_data.append({
-                "ID": v.id,
-                "Marque": v.brand,
-                "Modèle": v.model,
-                "Plaque": v.license_plate,
-                "Tarif/jour": f"{v.daily_rate:.2f}€",
-                "Disponible": est_disponible, 
-                "Catégorie": v.category,
-                "État": v.state         
-            })
-        st.dataframe(vehicle_data, use_container_width=True)
+        with instrumentation.phase("Gestion Véhicules", "mise en forme"):
+            vehicle_data = []
+            for v in vehicles:
+                # L'attribut 'Disponible' est déduit de l'attribut 'state'
+                est_disponible = "Oui" if v.state == "disponible" else "Non" 
+                vehicle_data.append({
+                    "ID": v.id,
+                    "Marque": v.brand,
+                    "Modèle": v.model,
+                    "Plaque": v.license_plate,
+                    "Tarif/jour": f"{v.daily_rate:.2f}€",
+                    "Disponible": est_disponible, 
+                    "Catégorie": v.category,
+                    "État": v.state         
+                })
+        with instrumentation.phase("Gestion Véhicules", "affichage"):
+            st.dataframe(vehicle_data, use_container_width=True)
+        pager("vehicles", page)
+    elif offset:
+        pager("vehicles", page)
+    elif any(filters.values()):
+        st.info("Aucun véhicule ne correspond à ces critères.")
     else:
         st.info("Aucun véhicule enregistré pour le moment.")
 
 elif choice == "Mettre à jour un véhicule":
     st.subheader("Mettre à jour un véhicule existant")
-    vehicles = car_rental_system.get_all_vehicles()
-    if vehicles:
-        vehicle_labels = {f"{v.brand} {v.model} ({v.license_plate}) - ID: {v.id}": v.id for v in vehicles}
-        selected_vehicle_label = st.selectbox("Sélectionnez le véhicule à mettre à jour", list(vehicle_labels.keys()))
+    if car_rental_system.list_vehicles(limit=1).items:
+        selected_vehicle_id = search_picker("Sélectionnez le véhicule à mettre à jour", "update_vehicle", search_vehicles,
+                                            vehicle_label)
 
-        if selected_vehicle_label:
-            selected_vehicle_id = vehicle_labels[selected_vehicle_label]
+        if selected_vehicle_id is not None:
             selected_vehicle = car_rental_system.find_vehicle(selected_vehicle_id)
 
             if selected_vehicle:
@@ -113,18 +140,15 @@ elif choice == "Mettre à jour un véhicule":
                     update_submitted = st.form_submit_button("Mettre à jour le véhicule")
                     if update_submitted:
                         if new_brand and new_model and new_license_plate and new_daily_rate > 0:
-                            selected_vehicle.brand = new_brand
-                            selected_vehicle.model = new_model
-                            selected_vehicle.license_plate = new_license_plate
-                            selected_vehicle.daily_rate = new_daily_rate
-                            selected_vehicle.category = new_category
-                            
-                            # C'est ici que nous mettons à jour l'état et déduisons l'attribut is_available
-                            selected_vehicle.state = new_state
-                            selected_vehicle.is_available = (new_state == "disponible") # is_available est synchronisé avec l'état
-
-                            st.success(f"Véhicule ID {selected_vehicle_id} mis à jour avec succès.")
-                            st.rerun()
+                            # update_vehicle met à jour l'état et synchronise is_available avec celui-ci
+                            try:
+                                car_rental_system.update_vehicle(selected_vehicle_id, new_brand, new_model, new_daily_rate,
+                                                                 new_license_plate, new_state, new_category)
+                            except ValueError as e:  # Plaque déjà attribuée à un autre véhicule
+                                st.error(f"Le véhicule n'a pas été modifié : {e}")
+                            else:
+                                st.success(f"Véhicule ID {selected_vehicle_id} mis à jour avec succès.")
+                                st.rerun()
                         else:
                             st.error("Veuillez remplir tous les champs correctement.")
             else:
@@ -134,13 +158,11 @@ elif choice == "Mettre à jour un véhicule":
 
 elif choice == "Supprimer un véhicule":
     st.subheader("Supprimer un véhicule")
-    vehicles = car_rental_system.get_all_vehicles()
-    if vehicles:
-        vehicle_labels = {f"{v.brand} {v.model} ({v.license_plate}) - ID: {v.id}": v.id for v in vehicles}
-        selected_vehicle_label = st.selectbox("Sélectionnez le véhicule à supprimer", list(vehicle_labels.keys()))
+    if car_rental_system.list_vehicles(limit=1).items:
+        selected_vehicle_id = search_picker("Sélectionnez le véhicule à supprimer", "remove_vehicle", search_vehicles,
+                                            vehicle_label)
 
-        if selected_vehicle_label:
-            selected_vehicle_id = vehicle_labels[selected_vehicle_label]
+        if selected_vehicle_id is not None:
             if st.button("Confirmer la suppression"):
                 try:
                     vehicle_id_for_removal = int(selected_vehicle_id)
@@ -153,3 +175,15 @@ elif choice == "Supprimer un véhicule":
                     st.error("Erreur de type : l'ID du véhicule doit être un nombre entier.")
     else:
         st.info("Aucun véhicule à supprimer pour le moment.")
+
+elif choice == "Importer des véhicules":
+    st.subheader("Importer des véhicules depuis un fichier")
+    st.caption("Fichier CSV (avec ligne d'en-tête) ou JSONL. Colonnes attendues : brand, model, license_plate, daily_rate, category, state.")
+    uploaded_file = st.file_uploader("Fichier à importer", type=["csv", "jsonl"])
+    if uploaded_file is not None and st.button("Lancer l'import"):
+        file_format = "jsonl" if uploaded_file.name.lower().endswith(".jsonl") else "csv"
+        report = car_rental_system.import_vehicles(read_records(uploaded_file, file_format))
+        st.success(f"Import terminé : {report}.")
+        if report.rejected:
+            st.warning("Lignes rejetées (numéro d'enregistrement et motif) :")
+            st.dataframe([{"Ligne": line, "Erreur": message} for line, message in report.rejected], use_container_width=True)
@@ -1,58 +1,29 @@
 import streamlit as st
 from core.car_rental_system import CarRentalSystem
+from shared_system import get_agency_system, get_instrumentation
 import datetime
 
 st.set_page_config(page_title="Locations en Cours", page_icon="📑")
 
 st.title("📑 Locations en Cours")
 
-# Assurez-vous que le système de location est bien initialisé dans session_state
-if 'car_rental_system' not in st.session_state:
-    st.session_state.car_rental_system = CarRentalSystem()
+# Système de l'agence choisie, partagé par toutes les sessions (voir shared_system.py)
+rental_system: CarRentalSystem = get_agency_system()
+instrumentation = get_instrumentation()  # Durées des phases d'affichage (page Performance)
 
-rental_system: CarRentalSystem = st.session_state.car_rental_system
+# Tableau et libellés mis en cache par le système : reconstruits seulement après un changement
+with instrumentation.phase("Locations en cours", "données"):
+    rental_data = rental_system.get_projection("active_rentals")
 
-current_rentals = rental_system.get_current_rentals()
-
-if current_rentals:
+if rental_data:
     st.subheader("Liste des locations actives")
 
-    # Préparer les données pour affichage
-    rental_data = []
-    for rental in current_rentals:
-        # Convertir en int car find_customer attend un int, et customer.id est une string
-        customer = rental_system.find_customer(int(rental.customer.id))
-        # Convertir en int car find_vehicle attend un int, et vehicle.id est une string
-        vehicle = rental_system.find_vehicle(int(rental.vehicle.id))
-
-        customer_name = f"{customer.first_name} {customer.last_name}" if customer else "N/A"
-        vehicle_info = f"{vehicle.brand} {vehicle.model} ({vehicle.license_plate})" if vehicle else "N/A"
-
-        rental_data.append({
-            "ID Location": rental.id, 
-            "Client": customer_name,
-            "Véhicule": vehicle_info,
-            "Date Début": rental.start_date.strftime("%Y-%m-%d"),
-            "Date Fin Prévue": rental.end_date.strftime("%Y-%m-%d"),
-            "Coût Estimé": f"{rental.get_total_cost():.2f} €" 
-        })
-
-    st.dataframe(rental_data, use_container_width=True)
+    with instrumentation.phase("Locations en cours", "affichage"):
+        st.dataframe(rental_data, use_container_width=True)
 
     st.subheader("Terminer une location")
     
-    rentals_to_end_options = {}
-    for r in current_rentals:
-        # Assurez-vous que le client et le véhicule sont trouvés pour éviter des erreurs ici
-        customer_for_display = rental_system.find_customer(int(r.customer.id))
-        vehicle_for_display = rental_system.find_vehicle(int(r.vehicle.id))
-        
-        customer_name_display = customer_for_display.last_name if customer_for_display else "N/A"
-        vehicle_plate_display = vehicle_for_display.license_plate if vehicle_for_display else "N/A"
-
-        label = f"Location ID: {r.id} - Client: {customer_name_display} - Véhicule: {vehicle_plate_display}"
-        rentals_to_end_options[label] = r.id
-
+    rentals_to_end_options = rental_system.get_projection("active_rental_choices")
 
     if rentals_to_end_options:
         selected_rental_label = st.selectbox("Sélectionnez la location à terminer", list(rentals_to_end_options.keys()))
@@ -74,8 +45,35 @@ if current_rentals:
                     st.error("La date de retour effective ne peut pas être antérieure à la date de début de location.")
             else:
                 st.error("Location non trouvée ou déjà terminée.")
+
+        st.subheader("Terminer en lot")
+        # Clôture de fin de journée : un seul traitement pour toutes les locations cochées
+        selected_labels = st.multiselect("Locations à terminer", list(rentals_to_end_options.keys()))
+        batch_return_date = st.date_input("Date de retour effective du lot", datetime.date.today(), key="batch_return_date")
+
+        if st.button("Terminer la sélection", disabled=not selected_labels):
+            st.session_state["batch_return_results"] = rental_system.end_rentals_batch(
+                [(rentals_to_end_options[label], batch_return_date) for label in selected_labels])
+            st.rerun()  # Les tableaux ci-dessus ne doivent plus montrer les locations terminées
     else:
         st.info("Aucune location à terminer.")
 
 else:
     st.info("Aucune location en cours pour le moment.")
+
+# Résultat du dernier lot, affiché après le rafraîchissement (même quand plus aucune location n'est en cours)
+batch_results = st.session_state.pop("batch_return_results", None)
+if batch_results:
+    ended = [result for result in batch_results if result.error is None]
+    if ended:
+        st.success(f"{len(ended)} location(s) terminée(s) en lot. Total facturé : "
+                   f"{sum(result.final_cost for result in ended):.2f} € "
+                   f"(dont pénalités : {sum(result.penalty for result in ended):.2f} €)")
+    for result in batch_results:
+        if result.error:
+            st.error(result.error)
+    st.dataframe([{"ID Location": result.rental_id,
+                   "Coût Final": f"{result.final_cost:.2f} €" if result.final_cost is not None else "N/A",
+                   "Pénalité": f"{result.penalty:.2f} €",
+                   "Statut": "Terminée" if result.error is None else "Refusée"} for result in batch_results],
+                 use_container_width=True)
@@ -2,49 +2,93 @@ import streamlit as st
 import datetime
 # Assurez-vous d'importer car_rental_system depuis le bon chemin si ce n'est pas déjà fait
 from core.car_rental_system import CarRentalSystem
+from shared_system import get_agency_network, select_agency
+from paging_widgets import PICKER_RESULTS, search_picker
 
-# Initialiser le système de location dans st.session_state si ce n'est pas déjà fait
-if 'car_rental_system' not in st.session_state:
-    st.session_state.car_rental_system = CarRentalSystem()
-car_rental_system: CarRentalSystem = st.session_state.car_rental_system
+# Système de l'agence choisie, partagé par toutes les sessions (voir shared_system.py)
+agency_network = get_agency_network()
+agency = select_agency()
+car_rental_system: CarRentalSystem = agency_network.system(agency)
 
 
 st.title("Créer une nouvelle location")
 
 # --- Formulaire de création de location ---
 
-# Récupérer les clients pour le sélecteur
-customers_for_select = {f"{c.first_name} {c.last_name} (ID: {c.id}, Âge: {c.age})": c.id for c in car_rental_system.customers.values()}
-selected_customer_label = st.selectbox("Sélectionner un client", options=list(customers_for_select.keys()))
-customer_id_input = customers_for_select.get(selected_customer_label)
-
-# Récupérer les véhicules disponibles
-available_vehicles = car_rental_system.get_available_vehicles()
-vehicles_for_select = {f"{v.brand} {v.model} ({v.category}, Tarif: {v.daily_rate}€/jour)": v.id for v in available_vehicles}
-selected_vehicle_label = st.selectbox("Sélectionner un véhicule disponible", options=list(vehicles_for_select.keys()))
-vehicle_id_input = vehicles_for_select.get(selected_vehicle_label)
+# Sélecteur de client avec recherche à la frappe (nom, email, permis), sans charger tous les clients.
+# Les clients de toutes les agences sont proposés : un client peut louer dans une autre agence que la sienne.
+customer_id_input = search_picker("Sélectionner un client", "rental_customer",
+                                  lambda text: agency_network.search_customers(text, PICKER_RESULTS),
+                                  lambda c: f"{c.first_name} {c.last_name} (ID: {c.id}, Âge: {c.age})")
 
 # Champs de date
 start_date_input = st.date_input("Date de début", datetime.date.today())
 end_date_input = st.date_input("Date de fin", datetime.date.today() + datetime.timedelta(days=1))
 
+# Réservation d'un véhicule précis, ou d'une catégorie : le système attribue alors le véhicule
+# qui remplit le mieux le calendrier (book_category)
+BY_CATEGORY = "Par catégorie (véhicule attribué automatiquement)"
+booking_mode = st.radio("Mode de réservation", ["Choisir un véhicule", BY_CATEGORY], horizontal=True)
+
+# Filtres optionnels de la recherche de disponibilité
+VEHICLE_CATEGORIES = ["Toutes", "Voiture", "Véhicule", "Camion", "Moto", "Bus"]
+col_category, col_rate = st.columns(2)
+with col_category:
+    category_filter = st.selectbox("Catégorie", VEHICLE_CATEGORIES if booking_mode != BY_CATEGORY else VEHICLE_CATEGORIES[1:])
+with col_rate:
+    max_rate_filter = st.number_input("Tarif journalier maximum (€, 0 = sans limite)", min_value=0.0, value=0.0)
+
+if booking_mode == BY_CATEGORY:
+    if st.button("Confirmer la location"):
+        if customer_id_input is not None:
+            new_rental, error_message = agency_network.book_category(
+                agency, customer_id_input, category_filter, start_date_input, end_date_input,
+                max_daily_rate=max_rate_filter or None)
+            if new_rental:
+                st.success(f"Location {new_rental.id} créée : {new_rental.vehicle.brand} {new_rental.vehicle.model} "
+                           f"({new_rental.vehicle.license_plate}) attribué à {new_rental.customer.first_name} {new_rental.customer.last_name}.")
+            else:
+                st.error(error_message)
+        else:
+            st.warning("Veuillez sélectionner un client.")
+else:
+    # Récupérer les véhicules réellement libres sur la période choisie (et autorisés pour l'âge du client)
+    MAX_VEHICLE_CHOICES = 500
+    available_vehicles = [vehicle for _, vehicle in agency_network.find_available(
+        start_date_input, end_date_input,
+        category=None if category_filter == "Toutes" else category_filter,
+        max_daily_rate=max_rate_filter or None,
+        customer_id=customer_id_input,
+        limit=MAX_VEHICLE_CHOICES,
+        agencies=[agency],
+    )]
+    # Devis de chaque véhicule pour la période, calculés en une fois (grilles tarifaires de Rental.pricing)
+    quotes = car_rental_system.quote_many((v.id, start_date_input, end_date_input) for v in available_vehicles)
+    vehicles_for_select = {f"{v.brand} {v.model} ({v.category}, Tarif: {v.daily_rate}€/jour, Devis: {quote:.2f} €) - ID: {v.id}": v.id
+                           for v, quote in zip(available_vehicles, quotes) if quote is not None}
+    selected_vehicle_label = st.selectbox("Sélectionner un véhicule disponible", options=list(vehicles_for_select.keys()))
+    vehicle_id_input = vehicles_for_select.get(selected_vehicle_label)
+    if len(available_vehicles) == MAX_VEHICLE_CHOICES:
+        st.caption(f"Seuls les {MAX_VEHICLE_CHOICES} véhicules les moins chers sont proposés : affinez les filtres pour en voir d'autres.")
+    elif not available_vehicles:
+        st.info("Aucun véhicule libre pour ces dates et ces critères.")
 
-if st.button("Confirmer la location"):
-    if customer_id_input is not None and vehicle_id_input is not None: # Vérifier que les IDs sont bien sélectionnés
-        # Appeler la méthode create_rental modifiée
-        # Nous nous attendons maintenant à un tuple (Rental ou None, Message d'erreur ou None)
-        new_rental, error_message = car_rental_system.create_rental(
-            customer_id_input, vehicle_id_input, start_date_input, end_date_input
-        )
+    if st.button("Confirmer la location"):
+        if customer_id_input is not None and vehicle_id_input is not None: # Vérifier que les IDs sont bien sélectionnés
+            # Appeler la méthode create_rental modifiée
+            # Nous nous attendons maintenant à un tuple (Rental ou None, Message d'erreur ou None)
+            new_rental, error_message = agency_network.create_rental(
+                customer_id_input, vehicle_id_input, start_date_input, end_date_input
+            )
 
-        if new_rental:
-            st.success(f"Location {new_rental.id} de {new_rental.vehicle.brand} {new_rental.vehicle.model} pour {new_rental.customer.first_name} {new_rental.customer.last_name} créée avec succès!")
-            st.rerun() # Rafraîchir pour mettre à jour les listes
+            if new_rental:
+                st.success(f"Location {new_rental.id} de {new_rental.vehicle.brand} {new_rental.vehicle.model} pour {new_rental.customer.first_name} {new_rental.customer.last_name} créée avec succès!")
+                st.rerun() # Rafraîchir pour mettre à jour les listes
+            else:
+                # Afficher l'erreur retournée par la fonction create_rental
+                st.error(error_message)
         else:
-            # Afficher l'erreur retournée par la fonction create_rental
-            st.error(error_message)
-    else:
-        st.warning("Veuillez sélectionner un client et un véhicule.")
+            st.warning("Veuillez sélectionner un client et un véhicule.")
 
 # Optionnel : Afficher la liste des locations existantes ou les véhicules disponibles après création
 st.subheader("Locations Actuelles")
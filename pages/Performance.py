@@ -0,0 +1,60 @@
+import os
+import runpy
+
+import streamlit as st
+from core.instrumentation import profile
+from shared_system import get_instrumentation
+
+st.set_page_config(page_title="Performance", page_icon="⏱️")
+
+st.title("⏱️ Performance")
+
+# Mesures partagées par toutes les sessions (voir shared_system.py et core/instrumentation.py)
+instrumentation = get_instrumentation()
+
+enabled = st.toggle("Instrumentation active", value=instrumentation.enabled,
+                    help="Mesure chaque appel au système de location et les phases d'affichage des pages. "
+                         "Désactivée, elle ne coûte presque rien.")
+if enabled != instrumentation.enabled:
+    if enabled:
+        instrumentation.enable()
+    else:
+        instrumentation.disable()
+
+rows = instrumentation.rows()
+col1, col2 = st.columns(2)
+with col1:
+    if st.button("Réinitialiser les mesures"):
+        instrumentation.reset()
+        st.rerun()
+with col2:
+    st.download_button("Exporter en CSV", instrumentation.to_csv(), file_name="performance.csv",
+                       mime="text/csv", disabled=not rows)
+
+st.subheader("Opérations mesurées")
+if rows:
+    st.caption("Percentiles calculés sur les derniers appels de chaque opération ; "
+               "« Éléments parcourus » : taille de la collection balayée ou de la liste retournée.")
+    st.dataframe(rows, use_container_width=True)
+elif instrumentation.enabled:
+    st.info("Aucune mesure pour le moment : naviguez dans l'application puis revenez sur cette page.")
+else:
+    st.info("Activez l'instrumentation pour commencer les mesures.")
+
+st.markdown("---")
+st.subheader("Profil d'un affichage (cProfile)")
+pages_dir = os.path.dirname(os.path.abspath(__file__))
+page_files = sorted(name for name in os.listdir(pages_dir)
+                    if name.endswith(".py") and name != os.path.basename(__file__))
+page_file = st.selectbox("Page à profiler", page_files, format_func=lambda name: name[:-3].replace("_", " "))
+if st.button("Profiler un affichage de cette page"):
+    # La page s'exécute une fois ici, sous cProfile, avec l'état de la session courante
+    with st.expander("Rendu de la page profilée", expanded=False):
+        _, report = profile(lambda: runpy.run_path(os.path.join(pages_dir, page_file), run_name="__main__"))
+    st.session_state["performance_profile"] = (page_file, report)
+
+if "performance_profile" in st.session_state:
+    profiled_page, report = st.session_state["performance_profile"]
+    st.caption(f"Dernier profil : {profiled_page} (fonctions triées par temps cumulé)")
+    st.code(report, language=None)
+    st.download_button("Télécharger le profil", report, file_name=f"profil_{profiled_page[:-3]}.txt", mime="text/plain")
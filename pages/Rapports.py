@@ -1,54 +1,45 @@
 import streamlit as st
-from core.car_rental_system import CarRentalSystem
+from core.car_rental_system import CarRentalSystem, OCCUPANCY_DAYS
+from shared_system import get_agency_network, get_instrumentation, select_agency
+from core.agency_network import AgencyNetwork
+from core.analytics import global_indicators, revenue_by_month_and_category, summary_by_category
+import altair as alt
+from typing import Union
 import datetime # Importation utile pour les formats de date si nécessaire, bien que strftime soit suffisant
 
 st.set_page_config(page_title="Rapports", page_icon="📈")
 
 st.title("📈 Rapports")
 
-if 'car_rental_system' not in st.session_state:
-    st.session_state.car_rental_system = CarRentalSystem()
-
-rental_system: CarRentalSystem = st.session_state.car_rental_system
+# Système de l'agence choisie, ou réseau de toutes les agences (mêmes méthodes de rapport, résultats
+# consolidés en interrogeant les agences en parallèle), partagés par toutes les sessions (voir shared_system.py)
+agency_network = get_agency_network()
+agency = select_agency(allow_all=True)
+rental_system: Union[CarRentalSystem, AgencyNetwork] = agency_network if agency is None else agency_network.system(agency)
+instrumentation = get_instrumentation()  # Durées des phases d'affichage (page Performance)
 
 report_type = st.sidebar.selectbox("Choisissez un type de rapport",
-                                    ["Véhicules disponibles", "Locations en cours", "Chiffre d'affaires", "Statistiques"])
+                                    ["Véhicules disponibles", "Locations en cours", "Chiffre d'affaires", "Statistiques", "Analyses",
+                                     "Occupation"])
 
 if report_type == "Véhicules disponibles":
     st.subheader("Véhicules disponibles")
-    available_vehicles = rental_system.get_available_vehicles()
-    if available_vehicles:
-        data = [{"ID": v.id, "Marque": v.brand, "Modèle": v.model,
-                 "Plaque": v.license_plate, "Tarif Journalier": f"{v.daily_rate:.2f} €"} for v in available_vehicles]
-        st.dataframe(data, use_container_width=True)
+    # Tableaux mis en cache par le système (get_projection) : reconstruits seulement après un changement
+    with instrumentation.phase("Rapports", "données"):
+        data = rental_system.get_projection("available_vehicles")
+    if data:
+        with instrumentation.phase("Rapports", "affichage"):
+            st.dataframe(data, use_container_width=True)
     else:
         st.info("Tous les véhicules sont actuellement loués ou aucun véhicule n'est enregistré.")
 
 elif report_type == "Locations en cours":
     st.subheader("Locations en cours")
-    current_rentals = rental_system.get_current_rentals()
-    if current_rentals:
-        rental_data = []
-        for rental in current_rentals:
-            # Accéder à l'ID du client via l'objet customer embarqué dans rental
-            # et le convertir en int pour la méthode find_customer si nécessaire.
-            customer = rental_system.find_customer(int(rental.customer.id))
-            # Accéder à l'ID du véhicule via l'objet vehicle embarqué dans rental
-            # et le convertir en int pour la méthode find_vehicle si nécessaire.
-            vehicle = rental_system.find_vehicle(int(rental.vehicle.id))
-
-            customer_name = f"{customer.first_name} {customer.last_name}" if customer else "N/A"
-            vehicle_info = f"{vehicle.brand} {vehicle.model} ({vehicle.license_plate})" if vehicle else "N/A"
-
-            rental_data.append({
-                "ID Location": rental.id, # CORRECTION 3: Utiliser rental.id
-                "Client": customer_name,
-                "Véhicule": vehicle_info,
-                "Date Début": rental.start_date.strftime("%Y-%m-%d"),
-                "Date Fin Prévue": rental.end_date.strftime("%Y-%m-%d"),
-                "Coût Estimé": f"{rental.get_total_cost():.2f} €" 
-            })
-        st.dataframe(rental_data, use_container_width=True)
+    with instrumentation.phase("Rapports", "données"):
+        rental_data = rental_system.get_projection("active_rentals")
+    if rental_data:
+        with instrumentation.phase("Rapports", "affichage"):
+            st.dataframe(rental_data, use_container_width=True)
     else:
         st.info("Aucune location en cours.")
 
@@ -57,45 +48,62 @@ elif report_type == "Chiffre d'affaires":
     total_revenue = rental_system.calculate_total_revenue()
     st.success(f"Le chiffre d'affaires total à ce jour est de : **{total_revenue:.2f} €**")
 
+    # Chiffre d'affaires d'une période, par date de retour effective (index des sommes cumulées du système)
+    revenue_bounds = rental_system.get_revenue_bounds()
+    if revenue_bounds:
+        st.subheader("Chiffre d'affaires par période")
+        period_col, category_col = st.columns(2)
+        period = period_col.date_input("Période (date de retour)", value=revenue_bounds)
+        category_label = category_col.selectbox("Catégorie", ["Toutes"] + rental_system.get_revenue_categories())
+        category = None if category_label == "Toutes" else category_label
+        if isinstance(period, (list, tuple)) and len(period) == 2:
+            period_start, period_end = period
+            with instrumentation.phase("Rapports", "données"):
+                period_revenue = rental_system.revenue_between(period_start, period_end, category)
+                monthly = rental_system.revenue_by_month(period_start, period_end, category)
+            st.metric(f"Du {period_start.strftime('%d/%m/%Y')} au {period_end.strftime('%d/%m/%Y')}",
+                      f"{period_revenue:.2f} €")
+            monthly_rows = [{"Mois": month.strftime("%Y-%m"), "Chiffre d'affaires": revenue} for month, revenue in monthly]
+            with instrumentation.phase("Rapports", "affichage"):
+                st.bar_chart(monthly_rows, x="Mois", y="Chiffre d'affaires")
+            if agency is None:
+                st.dataframe([{"Agence": name, "Chiffre d'affaires": f"{amount:.2f} €"} for name, amount
+                              in agency_network.revenue_by_agency(period_start, period_end, category).items()],
+                             use_container_width=True)
+        else:
+            st.info("Choisissez une date de début et une date de fin.")
+
     # Historique des locations terminées
     st.markdown("---")
     st.subheader("Détail des locations terminées")
-    # is_active est une propriété, pas une méthode
-    completed_rentals = [r for r in rental_system.get_all_rentals() if not r.is_active]
-    if completed_rentals:
-        rental_data = []
-        for rental in completed_rentals:
-            #  Accéder à l'ID du client via l'objet customer embarqué dans rental
-            customer = rental_system.find_customer(int(rental.customer.id))
-            #  Accéder à l'ID du véhicule via l'objet vehicle embarqué dans rental
-            vehicle = rental_system.find_vehicle(int(rental.vehicle.id))
-
-            customer_name = f"{customer.first_name} {customer.last_name}" if customer else "N/A"
-            vehicle_info = f"{vehicle.brand} {vehicle.model} ({vehicle.license_plate})" if vehicle else "N/A"
-
-            rental_data.append({
-                "ID Location": rental.id, # CORRECTION 7: Utiliser rental.id
-                "Client": customer_name,
-                "Véhicule": vehicle_info,
-                "Date Début": rental.start_date.strftime("%Y-%m-%d"),
-                "Date Fin Prévue": rental.end_date.strftime("%Y-%m-%d"),
-                "Date Retour Eff.": rental.actual_return_date.strftime("%Y-%m-%d") if rental.actual_return_date else "N/A", 
-                "Coût Final": f"{rental.final_billed_amount:.2f} €" if rental.final_billed_amount is not None else "N/A" 
-            })
-        st.dataframe(rental_data, use_container_width=True)
+    with instrumentation.phase("Rapports", "données"):
+        rental_data = rental_system.get_projection("completed_rentals")
+    if rental_data:
+        with instrumentation.phase("Rapports", "affichage"):
+            st.dataframe(rental_data, use_container_width=True)
     else:
         st.info("Aucune location terminée enregistrée.")
 
 elif report_type == "Statistiques":
     st.subheader("Statistiques globales")
 
+    stats = rental_system.get_rental_statistics()
     col1, col2 = st.columns(2)
     with col1:
         st.metric("Total Véhicules", len(rental_system.get_all_vehicles()))
         st.metric("Total Clients", len(rental_system.get_all_customers()))
+        st.metric("Total Pénalités", f"{stats['total_penalites']:.2f} €")
     with col2:
-        st.metric("Locations Actives", len(rental_system.get_current_rentals()))
-        st.metric("Locations Terminées", len([r for r in rental_system.get_all_rentals() if not r.is_active]))
+        st.metric("Locations Actives", stats["locations_actives"])
+        st.metric("Locations Terminées", stats["locations_terminees"])
+        st.metric("Locations Annulées", stats["locations_annulees"])
+
+    if stats["chiffre_affaires_par_categorie"]:
+        st.markdown("---")
+        st.subheader("Chiffre d'affaires par catégorie")
+        category_data = [{"Catégorie": category, "Chiffre d'affaires": f"{revenue:.2f} €"}
+                         for category, revenue in stats["chiffre_affaires_par_categorie"].items()]
+        st.dataframe(category_data, use_container_width=True)
 
     st.markdown("---")
     st.subheader("Disponibilité des véhicules")
@@ -106,3 +114,77 @@ elif report_type == "Statistiques":
         st.progress(available_count / total_count, text=f"{available_count} véhicules disponibles sur {total_count}")
     else:
         st.info("Aucun véhicule enregistré pour calculer la disponibilité.")
+
+elif report_type == "Analyses":
+    st.subheader("Analyses de l'activité")
+    with instrumentation.phase("Rapports", "données"):
+        # Projection en colonnes gardée par agence, reconstruite quand ses locations changent
+        columns = agency_network.rental_columns(agency)
+
+    if len(columns) == 0:
+        st.info("Aucune location enregistrée pour le moment.")
+    else:
+        indicators = global_indicators(columns)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Durée moyenne prévue", f"{indicators['average_duration']} j")
+        with col2:
+            st.metric("Taux de retours en retard", f"{indicators['late_rate']} %" if indicators["late_rate"] is not None else "N/A")
+        with col3:
+            st.metric("Part des pénalités", f"{indicators['penalty_share']} %" if indicators["penalty_share"] is not None else "N/A")
+
+        st.markdown("---")
+        st.subheader("Chiffre d'affaires par mois et par catégorie")
+        monthly_rows = revenue_by_month_and_category(columns)
+        if monthly_rows:
+            st.bar_chart(monthly_rows, x="Mois", y="Chiffre d'affaires", color="Catégorie")
+            st.dataframe(monthly_rows, use_container_width=True)
+        else:
+            st.info("Aucune location terminée et facturée.")
+
+        st.markdown("---")
+        st.subheader("Indicateurs par catégorie")
+        st.dataframe(summary_by_category(columns), use_container_width=True)
+
+elif report_type == "Occupation":
+    st.subheader("Calendrier d'occupation de la flotte")
+    start_col, days_col = st.columns(2)
+    occupancy_start = start_col.date_input("Premier jour", datetime.date.today())
+    occupancy_days = days_col.slider("Nombre de jours", 7, 180, OCCUPANCY_DAYS)
+
+    # Calendrier véhicules x jours tenu à jour par le système à chaque réservation, annulation ou retour
+    with instrumentation.phase("Rapports", "données"):
+        heatmap_rows = rental_system.get_occupancy_heatmap(occupancy_start, occupancy_days)
+        utilization = rental_system.get_vehicle_utilization(occupancy_start, occupancy_days)
+
+    if not heatmap_rows:
+        st.info("Aucun véhicule enregistré.")
+    else:
+        with instrumentation.phase("Rapports", "affichage"):
+            chart_rows = [dict(row, Jour=row["Jour"].isoformat()) for row in heatmap_rows]
+            heatmap = alt.Chart(alt.Data(values=chart_rows)).mark_rect().encode(
+                x=alt.X("Jour:T", title="Jour"),
+                y=alt.Y("Catégorie:N", title="Catégorie"),
+                color=alt.Color("Occupation (%):Q", scale=alt.Scale(domain=[0, 100], scheme="orangered")),
+                tooltip=["Jour:T", "Catégorie:N", "Libres:Q", "Flotte:Q", "Occupation (%):Q"],
+            )
+            st.altair_chart(heatmap, use_container_width=True)
+
+            st.subheader("Véhicules libres par jour")
+            free_rows = {}
+            for row in heatmap_rows:
+                free_rows.setdefault(row["Jour"], {"Jour": row["Jour"]})[row["Catégorie"]] = row["Libres"]
+            st.dataframe(list(free_rows.values()), use_container_width=True)
+
+            st.subheader("Réservations par catégorie")
+            st.caption("Les réservations faites par catégorie et pas encore commencées peuvent changer de véhicule "
+                       "(même catégorie, même tarif) pour remplir d'abord les véhicules déjà occupés.")
+            if st.button("Réoptimiser l'attribution des véhicules"):
+                summary = rental_system.reoptimize_category_bookings()
+                st.success(f"{summary['deplacees']} réservation(s) déplacée(s) sur {summary['reservations']} : "
+                           f"{summary['vehicules_avant']} véhicule(s) utilisé(s) avant, {summary['vehicules_apres']} après.")
+
+            st.subheader("Utilisation par véhicule")
+            st.dataframe([{"ID": vehicle.id, "Véhicule": f"{vehicle.brand} {vehicle.model} ({vehicle.license_plate})",
+                           "Catégorie": vehicle.category, "Utilisation (%)": round(usage, 1)}
+                          for vehicle, usage in utilization], use_container_width=True)
@@ -0,0 +1,58 @@
+# paging_widgets.py
+# Composants Streamlit communs aux listes paginées (CarRentalSystem.list_vehicles / list_customers) :
+# navigation entre les pages et sélecteur avec recherche, qui ne chargent jamais tout le catalogue.
+from typing import Callable, Optional, Tuple
+
+import streamlit as st
+from core.catalog_index import Page
+
+PICKER_RESULTS = 50  # Nombre maximum de propositions dans un sélecteur avec recherche
+
+
+def page_offset(key: str, page_size: int, query: Tuple) -> int:
+    """
+    Position de la page courante de la liste `key`. On revient à la première page
+    quand la requête (filtres, tri, taille de page) change.
+    """
+    if st.session_state.get(f"{key}_query") != query:
+        st.session_state[f"{key}_query"] = query
+        st.session_state[f"{key}_page"] = 0
+    return st.session_state.get(f"{key}_page", 0) * page_size
+
+
+def pager(key: str, page: Page):
+    """Boutons Précédent / Suivant et position dans la liste, sous le tableau de la page."""
+    number = page.offset // page.limit
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if st.button("◀ Précédent", key=f"{key}_previous", disabled=number == 0):
+            st.session_state[f"{key}_page"] = number - 1
+            st.rerun()
+    with col2:
+        shown = f"{page.offset + 1}–{page.offset + len(page.items)}" if page.items else "0"
+        if page.total is not None:
+            pages = max(1, -(-page.total // page.limit))
+            st.caption(f"Page {number + 1} sur {pages} · éléments {shown} sur {page.total}")
+        else:
+            st.caption(f"Page {number + 1} · éléments {shown}")
+    with col3:
+        if st.button("Suivant ▶", key=f"{key}_next", disabled=not page.has_more):
+            st.session_state[f"{key}_page"] = number + 1
+            st.rerun()
+
+
+def search_picker(label: str, key: str, search: Callable[[str], Page], format_item: Callable[[object], str]) -> Optional[int]:
+    """
+    Sélecteur avec recherche : un champ texte filtre le catalogue (au plus PICKER_RESULTS propositions).
+    Retourne l'ID de l'élément choisi, ou None si aucun ne correspond.
+    """
+    text = st.text_input("Rechercher", key=f"{key}_search",
+                         help="Nom, plaque, email... Laisser vide pour les premiers éléments.")
+    page = search(text.strip())
+    if not page.items:
+        st.info("Aucun résultat pour cette recherche.")
+        return None
+    labels = {item.id: format_item(item) for item in page.items}
+    if page.has_more:
+        st.caption(f"{page.limit} premiers résultats : précisez la recherche pour en voir d'autres.")
+    return st.selectbox(label, list(labels), format_func=labels.get, key=f"{key}_choice")
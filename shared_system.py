@@ -0,0 +1,68 @@
+# shared_system.py
+# Instance unique du réseau d'agences (un CarRentalSystem par agence) pour tout le processus Streamlit.
+# Toutes les sessions (onglets, guichets) travaillent sur la même flotte : une réservation faite
+# dans une session est immédiatement visible dans les autres, et deux sessions ne peuvent pas
+# réserver le même véhicule sur la même période (verrous de CarRentalSystem).
+import os
+from typing import Optional
+
+import streamlit as st
+from core.agency_network import AgencyNetwork
+from core.car_rental_system import CarRentalSystem
+from core.instrumentation import Instrumentation
+from core.system_factory import create_agency_network
+
+ALL_AGENCIES = "Toutes les agences"
+
+
+@st.cache_resource
+def get_agency_network() -> AgencyNetwork:
+    """
+    Réseau partagé : créé au premier appel, puis le même objet pour toutes les sessions.
+    Agences : RENTACAR_AGENCIES (noms séparés par des virgules), une seule par défaut.
+    Si RENTACAR_API_PORT est défini, l'API JSON (api/server.py) est servie sur ce port,
+    dans le même processus et sur le système de la première agence : Streamlit n'est qu'un client parmi d'autres.
+    """
+    network = create_agency_network()
+    api_port = os.environ.get("RENTACAR_API_PORT")
+    if api_port:
+        from api.server import start_in_thread
+        start_in_thread(network.systems()[0], os.environ.get("RENTACAR_API_HOST", "127.0.0.1"), int(api_port))
+    return network
+
+
+def get_rental_system() -> CarRentalSystem:
+    """Système de la première agence (la seule sans RENTACAR_AGENCIES)."""
+    return get_agency_network().systems()[0]
+
+
+def select_agency(allow_all: bool = False) -> Optional[str]:
+    """
+    Filtre « Agence » de la barre latérale, affiché seulement s'il y a plusieurs agences.
+    Retourne l'agence choisie, ou None pour « Toutes les agences » (proposé si allow_all).
+    """
+    agencies = get_agency_network().agencies()
+    if len(agencies) == 1:
+        return agencies[0]
+    options = [ALL_AGENCIES] + agencies if allow_all else agencies
+    choice = st.sidebar.selectbox("Agence", options, key="agency_all" if allow_all else "agency")
+    return None if choice == ALL_AGENCIES else choice
+
+
+def get_agency_system() -> CarRentalSystem:
+    """Système de l'agence choisie dans la barre latérale (pages de gestion et de réservation)."""
+    return get_agency_network().system(select_agency())
+
+
+@st.cache_resource
+def get_instrumentation() -> Instrumentation:
+    """
+    Mesures des appels aux systèmes des agences et des phases d'affichage des pages (page Performance).
+    Désactivées par défaut ; RENTACAR_INSTRUMENTATION=1 les active dès le démarrage.
+    """
+    instrumentation = Instrumentation()
+    for system in get_agency_network().systems():
+        instrumentation.attach(system)
+    if os.environ.get("RENTACAR_INSTRUMENTATION"):
+        instrumentation.enable()
+    return instrumentation
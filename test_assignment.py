@@ -0,0 +1,121 @@
+# test_assignment.py
+# Tests pytest de assign_bookings : l'attribution retournée est toujours réalisable (aucun chevauchement,
+# ni entre réservations déplacées, ni avec les réservations fixes) ; la réoptimisation du système ne
+# l'applique que si elle fait mieux que l'attribution actuelle.
+import datetime
+import io
+import random
+from contextlib import redirect_stdout
+
+import pytest
+
+from core.assignment import assign_bookings
+from core.car_rental_system import CarRentalSystem
+from core.sqlite_storage import SqliteStorage
+
+
+def _overlaps(first, second) -> bool:
+    return first[0] < second[1] and first[1] > second[0]  # Règle de create_rental
+
+
+def _assert_feasible(requests, vehicles, fixed, assignment):
+    assert set(assignment) == {request_id for request_id, _, _, _ in requests}
+    assert set(assignment.values()) <= set(vehicles)
+    for vehicle_id in vehicles:
+        periods = [(start, end) for request_id, start, end, _ in requests if assignment[request_id] == vehicle_id]
+        periods += fixed.get(vehicle_id, [])
+        for i, first in enumerate(periods):
+            assert not any(_overlaps(first, second) for second in periods[i + 1:])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_assignment_is_feasible(seed):
+    rng = random.Random(seed)
+    vehicles = list(range(1, rng.randint(2, 12)))
+    fixed = {}
+    for vehicle_id in vehicles:
+        day = rng.randint(1, 10)
+        for _ in range(rng.randint(0, 3)):
+            length = rng.randint(1, 5)
+            fixed.setdefault(vehicle_id, []).append((day, day + length))
+            day += length + rng.randint(0, 6)
+    # Réservations réattribuables placées sans chevauchement sur leur véhicule actuel : une solution existe
+    requests = []
+    for vehicle_id in vehicles:
+        day = max((end for _, end in fixed.get(vehicle_id, [])), default=1)
+        for _ in range(rng.randint(0, 4)):
+            length = rng.randint(0, 4)
+            requests.append((len(requests) + 1, day, day + length, vehicle_id))
+            day += length + rng.randint(0, 3)
+
+    assignment = assign_bookings(requests, vehicles, fixed)
+    assert assignment is not None
+    _assert_feasible(requests, vehicles, fixed, assignment)
+
+
+def test_packs_bookings_on_fewer_vehicles():
+    requests = [(1, 10, 12, 1), (2, 12, 15, 2), (3, 15, 20, 3)]  # Consécutives, sur trois véhicules
+    assignment = assign_bookings(requests, [1, 2, 3], {})
+    _assert_feasible(requests, [1, 2, 3], {}, assignment)
+    assert len(set(assignment.values())) == 1
+
+
+def test_fixed_booking_blocks_vehicle():
+    requests = [(1, 10, 15, 1)]
+    assignment = assign_bookings(requests, [1, 2], {1: [(12, 13)]})
+    assert assignment == {1: 2}
+
+
+def test_no_room_returns_none():
+    requests = [(1, 10, 15, 1), (2, 11, 14, 2)]
+    assert assign_bookings(requests, [1, 2], {2: [(12, 13)]}) is None
+
+
+# 12, 69, 212 et 264 : tirages où l'attribution gloutonne seule utilise plus de véhicules qu'avant
+@pytest.mark.parametrize("seed", [0, 1, 2, 12, 69, 212, 264])
+def test_reoptimization_never_spreads_bookings(seed):
+    rng = random.Random(seed)
+    system = CarRentalSystem()
+    customer = system.add_customer("Jean", "Dupont", 40, f"AS-L{seed}", f"as{seed}@example.com")
+    vehicles = [system.add_vehicle("Iveco", "Daily", f"AS-{seed}-{i}", 80.0, "Bus", "disponible") for i in range(6)]
+    first_day = datetime.date.today() + datetime.timedelta(days=1)
+    with redirect_stdout(io.StringIO()):
+        for _ in range(40):
+            start = first_day + datetime.timedelta(days=rng.randrange(1, 40))
+            rental, _ = system.create_rental(customer.id, rng.choice(vehicles).id, start,
+                                             start + datetime.timedelta(days=rng.randrange(1, 5)))
+            if rental and rng.random() < 0.7:
+                system._category_bookings.add(rental.id)  # Comme une réservation faite par book_category
+        summary = system.reoptimize_category_bookings()
+        again = system.reoptimize_category_bookings()
+
+    assert summary["vehicules_apres"] <= summary["vehicules_avant"]
+    assert again["deplacees"] == 0
+    for vehicle in vehicles:
+        periods = [(r.start_date, r.end_date) for r in system.get_current_rentals() if r.vehicle.id == vehicle.id]
+        for i, first in enumerate(periods):
+            assert not any(_overlaps(first, second) for second in periods[i + 1:])
+
+
+def test_reoptimization_respects_stored_history(tmp_path):
+    path = str(tmp_path / "rentacar.db")
+    system = CarRentalSystem(SqliteStorage(path))
+    customer = system.add_customer("Jean", "Dupont", 40, "AS-L-DB", "asdb@example.com")
+    first, second = [system.add_vehicle("Iveco", "Daily", f"AS-DB-{i}", 80.0, "Bus", "disponible") for i in range(2)]
+    with redirect_stdout(io.StringIO()):
+        stored, _ = system.create_rental(customer.id, first.id, datetime.date(2030, 5, 3), datetime.date(2030, 5, 5))
+        system.end_rental(stored.id, datetime.date(2030, 5, 5))
+        system.storage.close()
+
+        # Après redémarrage, la location terminée n'est plus qu'en base
+        system = CarRentalSystem(SqliteStorage(path))
+        flexible, _ = system.create_rental(customer.id, first.id, datetime.date(2030, 5, 1), datetime.date(2030, 5, 3))
+        blocked, _ = system.create_rental(customer.id, second.id, datetime.date(2030, 5, 3), datetime.date(2030, 5, 5))
+        system._category_bookings.update((flexible.id, blocked.id))
+        # Le premier véhicule est le meilleur ajustement pour la seconde réservation, mais la location
+        # terminée y occupe déjà la période
+        summary = system.reoptimize_category_bookings()
+    system.storage.close()
+
+    assert summary["deplacees"] == 0
+    assert (flexible.vehicle.id, blocked.vehicle.id) == (first.id, second.id)
@@ -0,0 +1,68 @@
+# test_booking_index.py
+# Tests pytest de BookingIndex : chevauchements et trous du calendrier d'un véhicule.
+import datetime
+
+import pytest
+
+from core.booking_index import BookingIndex
+from models.customer import Customer
+from models.rental import Rental
+from models.vehicle import Vehicle
+
+D = datetime.date
+
+
+@pytest.fixture
+def index():
+    """Réservations du 10 au 12 et du 20 au 25 janvier 2025 sur un même véhicule."""
+    customer = Customer("Jean", "Dupont", 30, "IDX-1", "idx@example.com")
+    vehicle = Vehicle("Renault", "Clio", "IDX-001", 50.0, "Véhicule", "disponible")
+    index = BookingIndex()
+    for start, end in ((D(2025, 1, 20), D(2025, 1, 25)), (D(2025, 1, 10), D(2025, 1, 12))):
+        index.add(Rental(customer, vehicle, start, end))
+    return index
+
+
+@pytest.mark.parametrize("start, end, expected_start", [
+    (D(2025, 1, 11), D(2025, 1, 11), D(2025, 1, 10)),  # À l'intérieur
+    (D(2025, 1, 8), D(2025, 1, 11), D(2025, 1, 10)),  # Déborde à gauche
+    (D(2025, 1, 24), D(2025, 1, 28), D(2025, 1, 20)),  # Déborde à droite
+    (D(2025, 1, 1), D(2025, 1, 31), D(2025, 1, 20)),  # Englobe les deux
+    (D(2025, 1, 12), D(2025, 1, 20), None),  # Entre les deux : retour et départ le même jour
+    (D(2025, 1, 1), D(2025, 1, 10), None),
+    (D(2025, 1, 25), D(2025, 2, 1), None),
+])
+def test_find_overlap(index, start, end, expected_start):
+    rental = index.find_overlap(start, end)
+    assert (rental.start_date if rental else None) == expected_start
+
+
+def test_find_overlap_matches_pairwise_rule(index):
+    # Même règle que l'ancienne boucle de create_rental : début1 < fin2 et fin1 > début2
+    rentals = index.rentals()
+    for first in range(0, 40):
+        for length in range(0, 8):
+            start = D(2025, 1, 1) + datetime.timedelta(first)
+            end = start + datetime.timedelta(length)
+            expected = [r for r in rentals if start < r.end_date and end > r.start_date]
+            found = index.find_overlap(start, end)
+            assert (found is None) == (not expected)
+            assert found is None or found in expected
+
+
+def test_gap_around(index):
+    assert index.gap_around(D(2025, 1, 14), D(2025, 1, 16)) == (D(2025, 1, 12), D(2025, 1, 20))
+    assert index.gap_around(D(2025, 1, 12), D(2025, 1, 20)) == (D(2025, 1, 12), D(2025, 1, 20))
+    assert index.gap_around(D(2025, 1, 1), D(2025, 1, 5)) == (None, D(2025, 1, 10))
+    assert index.gap_around(D(2025, 1, 26), D(2025, 1, 30)) == (D(2025, 1, 25), None)
+    assert index.gap_around(D(2025, 1, 11), D(2025, 1, 14)) is None
+    assert BookingIndex().gap_around(D(2025, 1, 1), D(2025, 1, 2)) == (None, None)
+
+
+def test_shorten_and_remove_free_the_period(index):
+    rental = index.find_overlap(D(2025, 1, 21), D(2025, 1, 21))
+    index.shorten(rental, D(2025, 1, 22))  # Retour anticipé
+    assert index.find_overlap(D(2025, 1, 22), D(2025, 1, 24)) is None
+    assert index.remove(rental)
+    assert index.find_overlap(D(2025, 1, 20), D(2025, 1, 21)) is None
+    assert len(index) == 1
@@ -0,0 +1,53 @@
+# test_importers.py
+# Tests pytest des imports en masse : une ligne mal typée est rejetée avec son numéro, sans interrompre l'import.
+import pytest
+
+from core.car_rental_system import CarRentalSystem
+from core.importers import build_customer, build_vehicle
+
+
+def _vehicle(**changes) -> dict:
+    record = {"brand": "Renault", "model": "Clio", "license_plate": "IM-001", "daily_rate": "50",
+              "category": "Véhicule", "state": "disponible"}
+    record.update(changes)
+    return record
+
+
+def _customer(**changes) -> dict:
+    record = {"first_name": "Jean", "last_name": "Dupont", "age": 30, "driver_license_number": "IM-L1",
+              "email": "im1@example.com"}
+    record.update(changes)
+    return record
+
+
+@pytest.mark.parametrize("record", [None, [], "texte", _vehicle(brand=1), _vehicle(model=None),
+                                    _vehicle(license_plate=["IM"]), _vehicle(daily_rate="cher"),
+                                    {"brand": "Renault"}])
+def test_build_vehicle_rejects_mistyped_records(record):
+    with pytest.raises(ValueError):
+        build_vehicle(record)
+
+
+@pytest.mark.parametrize("record", [None, _customer(first_name=5), _customer(email={"a": 1}), _customer(age="âgé")])
+def test_build_customer_rejects_mistyped_records(record):
+    with pytest.raises(ValueError):
+        build_customer(record)
+
+
+def test_numbers_may_be_text_or_numbers():
+    assert build_vehicle(_vehicle(daily_rate=42)).daily_rate == 42.0
+    assert build_vehicle(_vehicle(daily_rate=" 42.5 ")).daily_rate == 42.5
+    assert build_customer(_customer(age="31")).age == 31
+
+
+def test_import_keeps_going_after_bad_lines():
+    system = CarRentalSystem()
+    records = [_vehicle(license_plate="IM-101"), None, _vehicle(license_plate="IM-102", brand=7),
+               _vehicle(license_plate="IM-101"), _vehicle(license_plate="IM-103")]
+    report = system.import_vehicles(records)
+    assert report.imported == 2
+    assert [line for line, _ in report.rejected] == [2, 3, 4]
+    assert sorted(vehicle.license_plate for vehicle in system.get_all_vehicles()) == ["IM-101", "IM-103"]
+
+    report = system.import_customers([_customer(), _customer(driver_license_number="IM-L2", last_name=None)])
+    assert (report.imported, [line for line, _ in report.rejected]) == (1, [2])
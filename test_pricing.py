@@ -0,0 +1,54 @@
+# test_pricing.py
+# Tests pytest des grilles tarifaires : le calcul en lot (NumPy) donne les mêmes montants que le calcul
+# location par location.
+import datetime
+import random
+
+import pytest
+
+from models.pricing import DEFAULT_PRICING, PricingEngine, RateTable, Season
+
+np = pytest.importorskip("numpy")
+D = datetime.date
+
+
+def _engine(rng: random.Random) -> PricingEngine:
+    def table():
+        seasons = [Season((rng.randint(1, 12), rng.randint(1, 28)), (rng.randint(1, 12), rng.randint(1, 28)),
+                          rng.choice([0.8, 1.15, 2.0])) for _ in range(rng.randint(0, 3))]
+        return RateTable(rng.choice([1.0, 1.2]), seasons,
+                         [(rng.randint(1, 10), rng.choice([0.05, 0.1])) for _ in range(rng.randint(0, 2))],
+                         sorted({rng.randint(1, 6): rng.choice([0.0, 20.0, 35.5]) for _ in range(2)}.items()))
+    return PricingEngine({"Camion": table(), "Moto": table()}, table())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_scalar(seed):
+    rng = random.Random(seed)
+    engine = _engine(rng)
+    count = 300
+    rates = [round(rng.uniform(10, 200), 2) for _ in range(count)]
+    categories = [rng.choice(["Camion", "Moto", "Voiture"]) for _ in range(count)]
+    starts = [D(2024, 1, 1) + datetime.timedelta(rng.randint(0, 700)) for _ in range(count)]
+    ends = [start + datetime.timedelta(rng.randint(-2, 40)) for start in starts]  # Quelques périodes invalides
+    returns = [start + datetime.timedelta(rng.randint(0, 50)) for start in starts]
+
+    quotes = engine.quote_many(rates, categories, starts, ends)
+    costs, penalties = engine.final_costs_many(rates, categories, starts, ends, returns)
+    for row in range(count):
+        assert quotes[row] == engine.quote(rates[row], categories[row], starts[row], ends[row])
+        cost, penalty = engine.final_cost(rates[row], categories[row], starts[row], ends[row], returns[row])
+        assert (costs[row], penalties[row]) == (cost, penalty)
+
+
+def test_batch_row_starting_after_every_end():
+    # Une ligne invalide qui commence après la dernière fin du lot ne doit pas sortir du calendrier
+    starts = [D(2024, 1, 1), D(2024, 6, 1)]
+    ends = [D(2024, 1, 2), D(2024, 3, 1)]
+    quotes = DEFAULT_PRICING.quote_many([10.0, 10.0], ["Voiture"] * 2, starts, ends)
+    assert quotes.tolist() == [DEFAULT_PRICING.quote(10.0, "Voiture", start, end) for start, end in zip(starts, ends)]
+    assert quotes[1] == 0.0
+
+
+def test_empty_batch():
+    assert len(DEFAULT_PRICING.quote_many([], [], [], [])) == 0
@@ -0,0 +1,49 @@
+# test_rentals_batch.py
+# Tests pytest de create_rentals_batch : conflits à l'intérieur d'un lot, dans l'ordre du calendrier
+# (par défaut) ou dans l'ordre d'arrivée (arrival_order, utilisé par l'API).
+import datetime
+import io
+import random
+from contextlib import redirect_stdout
+
+import pytest
+
+from core.car_rental_system import CarRentalSystem
+
+D = datetime.date
+
+
+def _system(vehicles: int = 1):
+    system = CarRentalSystem()
+    customer = system.add_customer("Jean", "Dupont", 40, "RB-L1", "rb1@example.com")
+    vehicle_ids = [system.add_vehicle("Renault", "Clio", f"RB-{i:03d}", 50.0, "Voiture", "disponible").id
+                   for i in range(vehicles)]
+    return system, customer.id, vehicle_ids
+
+
+@pytest.mark.parametrize("arrival_order, winner", [(False, 1), (True, 0)])
+def test_batch_conflict_winner(arrival_order, winner):
+    system, customer_id, (vehicle_id,) = _system()
+    requests = [(customer_id, vehicle_id, D(2030, 1, 5), D(2030, 1, 10)),
+                (customer_id, vehicle_id, D(2030, 1, 1), D(2030, 1, 6))]
+    with redirect_stdout(io.StringIO()):
+        results = system.create_rentals_batch(requests, arrival_order=arrival_order)
+    assert [rental is not None for rental, _ in results] == [position == winner for position in range(2)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_arrival_order_matches_one_by_one(seed):
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(60):
+        start = D(2030, 1, 1) + datetime.timedelta(days=rng.randrange(40))
+        requests.append((rng.randrange(3), start, start + datetime.timedelta(days=rng.randrange(0, 6))))
+
+    batch_system, customer_id, vehicles = _system(3)
+    one_by_one, other_customer_id, other_vehicles = _system(3)
+    with redirect_stdout(io.StringIO()):
+        batch = batch_system.create_rentals_batch(
+            [(customer_id, vehicles[vehicle], start, end) for vehicle, start, end in requests], arrival_order=True)
+        expected = [one_by_one.create_rental(other_customer_id, other_vehicles[vehicle], start, end)
+                    for vehicle, start, end in requests]
+    assert [rental is not None for rental, _ in batch] == [rental is not None for rental, _ in expected]
@@ -0,0 +1,148 @@
+# test_storage.py
+# Tests pytest des stockages persistants (SQLite, journal, instantané) : un système rouvert sur le même
+# stockage retrouve ses données, comme après un redémarrage du processus.
+import datetime
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from core.car_rental_system import CarRentalSystem
+from core.journal_storage import JournalStorage
+from core.snapshot import load_snapshot, save_snapshot
+from core.sqlite_storage import SqliteStorage
+from models.customer import Customer
+from models.rental import Rental
+from models.vehicle import Vehicle
+
+D = datetime.date
+
+
+@pytest.fixture(params=["sqlite", "journal"])
+def reopen(request, tmp_path, monkeypatch):
+    """Fonction qui ouvre un système sur le stockage ; les compteurs d'IDs repartent de 1 à chaque ouverture."""
+    opened = []
+
+    def open_system() -> CarRentalSystem:
+        for system in opened:
+            system.storage.close()
+        for model in (Vehicle, Customer, Rental):
+            monkeypatch.setattr(model, "_next_id", 1)  # Nouveau processus
+        storage = SqliteStorage(str(tmp_path / "rentacar.db")) if request.param == "sqlite" else JournalStorage(str(tmp_path))
+        opened.append(CarRentalSystem(storage))
+        return opened[-1]
+
+    yield open_system
+    opened[-1].storage.close()
+
+
+def test_round_trip(reopen):
+    system = reopen()
+    vehicle = system.add_vehicle("Renault", "Clio", "ST-001", 50.0, "Véhicule", "disponible")
+    customer = system.add_customer("Jean", "Dupont", 30, "ST-L1", "st1@example.com")
+    finished, _ = system.create_rental(customer.id, vehicle.id, D(2024, 1, 1), D(2024, 1, 3))
+    system.end_rental(finished.id, D(2024, 1, 5))
+    active, _ = system.create_rental(customer.id, vehicle.id, D(2024, 2, 1), D(2024, 2, 4))
+    statistics = system.get_rental_statistics()
+
+    system = reopen()
+    assert system.find_vehicle(vehicle.id).license_plate == "ST-001"
+    assert system.find_customer(customer.id).email == "st1@example.com"
+    restored = system.find_rental(finished.id)
+    assert (restored.status, restored.actual_return_date, restored.final_billed_amount, restored.penalty_amount) == (
+        "completed", D(2024, 1, 5), finished.final_billed_amount, finished.penalty_amount)
+    assert [rental.id for rental in system.get_current_rentals()] == [active.id]
+    assert system.get_rental_statistics() == statistics
+    # La réservation rechargée bloque toujours sa période
+    rental, error = system.create_rental(customer.id, vehicle.id, D(2024, 2, 2), D(2024, 2, 3))
+    assert rental is None and error
+    assert list(system.find_customer(customer.id).rentals_history) == [finished.id, active.id]
+    later, _ = system.create_rental(customer.id, vehicle.id, D(2024, 3, 1), D(2024, 3, 2))
+    assert list(system.find_customer(customer.id).rentals_history) == [finished.id, active.id, later.id]
+
+
+def test_removed_ids_are_not_reused(reopen):
+    system = reopen()
+    kept = system.add_vehicle("Renault", "Clio", "ST-101", 50.0, "Véhicule", "disponible")
+    removed = system.add_vehicle("Peugeot", "208", "ST-102", 50.0, "Véhicule", "disponible")
+    customer = system.add_customer("Jean", "Dupont", 30, "ST-L2", "st2@example.com")
+    old_customer = system.add_customer("Anne", "Martin", 40, "ST-L3", "st3@example.com")
+    rental, _ = system.create_rental(customer.id, removed.id, D(2024, 1, 1), D(2024, 1, 3))
+    system.end_rental(rental.id, D(2024, 1, 3))
+    assert system.remove_vehicle(removed.id)
+    assert system.remove_customer(old_customer.id)
+
+    system = reopen()
+    vehicle = system.add_vehicle("Citroën", "C3", "ST-103", 50.0, "Véhicule", "disponible")
+    new_customer = system.add_customer("Paul", "Durand", 35, "ST-L4", "st4@example.com")
+    assert vehicle.id not in (kept.id, removed.id)
+    assert new_customer.id not in (customer.id, old_customer.id)
+    # L'historique garde le véhicule supprimé
+    assert system.find_rental(rental.id).vehicle.license_plate == "ST-102"
+
+    system = reopen()
+    assert system.find_rental(rental.id).vehicle.license_plate == "ST-102"
+    assert system.find_vehicle(vehicle.id).license_plate == "ST-103"
+
+
+def test_availability_survives_restart(reopen):
+    system = reopen()
+    vehicle = system.add_vehicle("Renault", "Clio", "ST-201", 50.0, "Véhicule", "disponible")
+    system.update_vehicle(vehicle.id, "Renault", "Clio", 50.0, "ST-201", "en maintenance", "Véhicule")
+    assert not system.find_vehicle(vehicle.id).is_available
+
+    system = reopen()
+    assert not system.find_vehicle(vehicle.id).is_available
+    assert vehicle.id not in [v.id for v in system.get_available_vehicles()]
+
+
+def test_category_bookings_survive_restart(reopen):
+    system = reopen()
+    customer = system.add_customer("Jean", "Dupont", 30, "ST-L250", "st250@example.com")
+    for i in range(2):
+        system.add_vehicle("Renault", "Trafic", f"ST-25{i}", 70.0, "Utilitaire", "disponible")
+    with redirect_stdout(io.StringIO()):
+        kept, _ = system.book_category(customer.id, "Utilitaire", D(2030, 3, 1), D(2030, 3, 4))
+        ended, _ = system.book_category(customer.id, "Utilitaire", D(2030, 3, 1), D(2030, 3, 4))
+        system.end_rental(ended.id, D(2030, 3, 4))
+
+    system = reopen()
+    assert system.get_category_bookings() == [kept.id]  # Une location terminée n'est plus réattribuable
+    if isinstance(system.storage, JournalStorage):
+        system.storage.snapshot()  # Les réservations par catégorie passent aussi dans l'instantané
+        system = reopen()
+        assert system.get_category_bookings() == [kept.id]
+
+
+def _history_then_cancel(system: CarRentalSystem, customer_id: int, vehicle_id: int):
+    """Reprise après redémarrage : annule la location active X, la location terminée Y reste dans le stockage."""
+    active = system.get_current_rentals()[0]
+    assert system.cancel_rental(active.id)
+    return system.create_rental(customer_id, vehicle_id, D(2030, 1, 5), D(2030, 1, 11))
+
+
+def _history(system: CarRentalSystem):
+    vehicle = system.add_vehicle("Renault", "Clio", "ST-301", 50.0, "Véhicule", "disponible")
+    customer = system.add_customer("Jean", "Dupont", 30, "ST-L301", "st301@example.com")
+    finished, _ = system.create_rental(customer.id, vehicle.id, D(2030, 1, 1), D(2030, 1, 10))  # Y
+    system.end_rental(finished.id, D(2030, 1, 10))
+    system.create_rental(customer.id, vehicle.id, D(2030, 1, 10), D(2030, 1, 15))  # X
+    return customer.id, vehicle.id
+
+
+def test_cancelled_rental_does_not_hide_stored_history(reopen):
+    system = reopen()
+    with redirect_stdout(io.StringIO()):
+        customer_id, vehicle_id = _history(system)
+        system = reopen()
+        rental, error = _history_then_cancel(system, customer_id, vehicle_id)
+    assert rental is None and error
+
+
+def test_cancelled_rental_does_not_hide_snapshot_history(tmp_path):
+    system = CarRentalSystem()
+    with redirect_stdout(io.StringIO()):
+        customer_id, vehicle_id = _history(system)
+        save_snapshot(system, str(tmp_path / "systeme.snap"))
+        rental, error = _history_then_cancel(load_snapshot(str(tmp_path / "systeme.snap")), customer_id, vehicle_id)
+    assert rental is None and error
@@ -0,0 +1,16 @@
+# test_system_factory.py
+# Tests pytest des clés de stockage des agences (RENTACAR_AGENCIES) : deux agences ne partagent jamais
+# leurs fichiers.
+import pytest
+
+from core.system_factory import _agency_storage_keys
+
+
+def test_storage_keys_fold_accents():
+    assert _agency_storage_keys(["Île Nord", "Paris", "%%"]) == {"Île Nord": "ile-nord", "Paris": "paris", "%%": "3"}
+
+
+@pytest.mark.parametrize("names", [["Paris Nord", "paris-nord"], ["Ile", "Île"]])
+def test_colliding_storage_keys_are_refused(names):
+    with pytest.raises(ValueError):
+        _agency_storage_keys(names)